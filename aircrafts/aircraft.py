@@ -11,6 +11,12 @@ PRESSURE_DELTA = randint(-1500, 1500)
 
 
 class Aircraft:
+    __slots__ = (
+        'callsign', '_position', 'speed', 'is_on_ground', 'squawk_code',
+        'transponder_mode', 'flightplan', 'pitch', 'bank', 'heading',
+        'is_flying', 'store_id',
+    )
+
     def __init__(
         self,
         callsign: str,
@@ -21,6 +27,8 @@ class Aircraft:
         transponder_mode: TransponderMode = TransponderMode.STANDBY,
         flightplan: Flightplan | None = None,
     ):
+        # id in the aircraft store, once registered
+        self.store_id: int | None = None
         self.callsign = callsign
         self.position = position
         self.speed = speed
@@ -34,6 +42,19 @@ class Aircraft:
         self.heading = Bearing(0)
         self.is_flying = False
 
+    @property
+    def position(self) -> Position | None:
+        return self._position
+
+    @position.setter
+    def position(self, position: Position | None):
+        if self.store_id is None:
+            self._position = position
+            return
+        # registered aircraft keep their coordinates in the store
+        self._position.set_coordinates(position.latitude, position.longitude)
+        self._position.altitude_ = position.altitude_
+
     def set_position(self, position: Position):
         self.position = position
         return self
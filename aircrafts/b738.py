@@ -3,6 +3,7 @@ from utils.physics import Speed
 
 
 class B738 (BotAircraft):
+    __slots__ = ()
     icao_name = 'B738'
     type = 'M'
     mtow = 70530
@@ -3,17 +3,17 @@ from enum import Enum
 from logging import getLogger
 from math import isclose, radians, tan
 
-from geopy.distance import Distance, distance as distance_between
-
-from db.models import TaxiPath, Parking, RunwayEnd, ProcedureLegType
+from db.models import Parking, RunwayEnd, ProcedureLegType
 from utils.geo import (
     get_bearing_distance,
     fix_radial_distance,
     get_mag_var_by_position,
 )
 from utils.bearing import Bearing
+from utils.distance import Distance, ZERO_DISTANCE
 from utils.flightplan import Flightplan
 from utils.leg import Leg
+from utils.motion import MotionBatch
 from utils.unit import lbs_to_kg
 from utils.physics import get_acceleration_by_newton_2th, Speed
 from helpers import get_displacement_by_seconds, get_fix_by_ident
@@ -21,9 +21,26 @@ from messages.PilotPositionUpdateMessage import TransponderMode
 from messages.Position import Position
 from messages.TextMessage import TextMessage
 from aircrafts.aircraft import Aircraft
+from aircrafts.store import Path, aircraft_store
 
 logger = getLogger(__name__)
 
+# shared by every aircraft in every tick, the unit types are immutable
+UNLIMITED_DISTANCE = Distance(nautical=999999)
+ZERO_SPEED = Speed(0)
+PUSHBACK_SPEED = Speed(knots=5)
+LINEUP_SPEED = Speed(knots=15)
+TAXI_SPEED = Speed(knots=30)
+VACATE_RUNWAY_SPEED = Speed(knots=60)
+SPEED_LIMIT_ALTITUDE = Distance(feet=10000)
+SPEED_LIMIT_BELOW_10000FT = Speed(knots=240)
+MAX_SPEED_BELOW_10000FT = Speed(knots=250)
+INITIAL_CLIMB_ALTITUDE = Distance(feet=2500)
+INITIAL_CLIMB_ROC = Speed(fpm=5000)
+CLIMB_ROC_BELOW_10000FT = Speed(fpm=2500)
+ALTITUDE_TOLERANCE = Distance(feet=100)
+DME_LEG_TARGET_ALTITUDE = Distance(feet=3000)
+
 
 def normalize_flight_level(flight_level: int):
     return str(flight_level).zfill(3)
@@ -33,7 +50,7 @@ def normalize_cruise_speed(flight_level: int):
     return str(flight_level).zfill(4)
 
 
-def combine_legs(*legs_list: list[Leg]):
+def combine_legs(*legs_list: list[Leg] | tuple[Leg, ...]):
     legs: list[Leg] = []
     for legs_ in legs_list:
         if len(legs) == 0:
@@ -57,6 +74,14 @@ class AircraftStatus(Enum):
 
 
 class BotAircraft(Aircraft):
+    __slots__ = (
+        'legs', 'sid_legs', 'star_legs', 'approach_legs', 'tod',
+        'speed_limit', 'target_altitude', 'pushback_path', 'taxi_path',
+        'vacatable_taxi_paths', 'departure_path', 'expect_runway_end',
+        'parking', 'status', 'is_intercept_ils', 'motion',
+        'takeoff_acceleration', 'decend_acceleration', 'retard_acceleration',
+        'on_pushback_completed',
+    )
     icao_name: str
     type: str
     mtow: int
@@ -68,8 +93,6 @@ class BotAircraft(Aircraft):
     drag_coefficient: float
     aircraft_type: str
     vr: Speed
-    taxi_path: list[TaxiPath]
-    status: AircraftStatus
 
     def __init__(
         self,
@@ -112,7 +135,9 @@ class BotAircraft(Aircraft):
                             sid_end_approach_leg.fix_ident, sid_end_approach_leg.fix_region)
                         sid_end_leg = Leg.from_procedure_leg(
                             sid_end_approach_leg,
-                            fix
+                            fix,
+                            laty=None if fix is None else fix.laty,
+                            lonx=None if fix is None else fix.lonx
                         )
                         enroute_legs = flightplan.get_legs(sid_end_leg)
             else:
@@ -133,14 +158,16 @@ class BotAircraft(Aircraft):
         self.tod: tuple[Distance, Leg] | None = None
         self.speed_limit = speed_limit
         self.target_altitude = target_altitude
-        self.pushback_path: list[Position] = []
-        self.taxi_path: list[Position] = []
-        self.vacatable_taxi_paths: dict[str, list[Position]] = {}
-        self.departure_path: list[Position] = []
+        self.pushback_path: Path = aircraft_store.paths.add([])
+        self.taxi_path: Path = aircraft_store.paths.add([])
+        self.vacatable_taxi_paths: dict[str, Path] = {}
+        self.departure_path: Path = aircraft_store.paths.add([])
         self.expect_runway_end: RunwayEnd | None = None
         self.parking: Parking | None = None
         self.status = AircraftStatus.NOT_DELIVERED
         self.is_intercept_ils = False
+        # movements of the current tick
+        self.motion: MotionBatch | None = None
 
         self.takeoff_acceleration = get_acceleration_by_newton_2th(
             lbs_to_kg(self.to1),
@@ -178,7 +205,7 @@ class BotAircraft(Aircraft):
 
     def start_pushback(self, pushback_path: list[Position] | None = None):
         if pushback_path is not None:
-            self.pushback_path = pushback_path
+            self.pushback_path = aircraft_store.paths.add(pushback_path)
         self.status = AircraftStatus.APPROVED_PUSHBACK_STARTUP
         return self
 
@@ -188,19 +215,25 @@ class BotAircraft(Aircraft):
         self.status = AircraftStatus.APPROVED_TAXI_TO_RWY
         return self
 
+    def set_vacatable_taxi_paths(self, vacatable_taxi_paths: dict[str, list[Position]]):
+        self.vacatable_taxi_paths = {
+            name: aircraft_store.paths.add(path) for name, path in vacatable_taxi_paths.items()
+        }
+        return self
+
     def set_departure_path(self, departure_path: list[Position]):
-        self.departure_path = departure_path
+        self.departure_path = aircraft_store.paths.add(departure_path)
         return self
 
     def start_lineup_wait(self, departure_path: list[Position] | None = None):
         if departure_path is not None:
-            self.departure_path = departure_path
+            self.departure_path = aircraft_store.paths.add(departure_path)
         self.status = AircraftStatus.LINEUP_WAIT
         return self
 
     def start_departure(self, departure_path: list[Position] | None = None):
         if departure_path is not None:
-            self.departure_path = departure_path
+            self.departure_path = aircraft_store.paths.add(departure_path)
         self.status = AircraftStatus.CLEARED_TAKEOFF
         return self
 
@@ -210,7 +243,7 @@ class BotAircraft(Aircraft):
 
     def start_land(self, vacated_taxi_path: list[Position] | None = None):
         if vacated_taxi_path is not None:
-            self.taxi_path = vacated_taxi_path
+            self.taxi_path = aircraft_store.paths.add(vacated_taxi_path)
         self.status = AircraftStatus.CLEARED_LAND
         return self
 
@@ -222,7 +255,7 @@ class BotAircraft(Aircraft):
         self.target_altitude = target_altitude
         return self
 
-    def set_sid_legs(self, sid_legs: list[Leg]):
+    def set_sid_legs(self, sid_legs: list[Leg] | tuple[Leg, ...]):
         self.sid_legs = sid_legs
         self.legs = combine_legs(
             sid_legs,
@@ -233,15 +266,20 @@ class BotAircraft(Aircraft):
         )
         return self
 
-    def set_approach_legs(self, approach_legs: list[Leg]):
+    def set_approach_legs(self, approach_legs: list[Leg] | tuple[Leg, ...]):
         old_legs = combine_legs(self.star_legs, self.approach_legs)
         self.remove_continuously_end_legs(old_legs)
 
         self.approach_legs = approach_legs
-        self.legs = approach_legs
+        # the legs may be shared with other aircrafts
+        self.legs = list(approach_legs)
         return self
 
-    def set_star_n_approach_legs(self, star_legs: list[Leg], approach_legs: list[Leg]):
+    def set_star_n_approach_legs(
+        self,
+        star_legs: list[Leg] | tuple[Leg, ...],
+        approach_legs: list[Leg] | tuple[Leg, ...]
+    ):
         old_legs = combine_legs(self.star_legs, self.approach_legs)
         self.remove_continuously_end_legs(old_legs)
 
@@ -277,6 +315,29 @@ class BotAircraft(Aircraft):
     def to_next_leg(self):
         self.legs.pop(0)
 
+    def move(self, bearing: Bearing, distance: Distance):
+        """
+        Move along the bearing, in the motion batch of the tick when there
+        is one and the aircraft is in the store.
+        """
+        if self.motion is None or self.store_id is None:
+            new_position = fix_radial_distance(self.position, bearing, distance)
+            self.position.set_coordinates(
+                new_position.latitude,
+                new_position.longitude,
+            )
+            return
+        self.motion.add(self.store_id, bearing.degrees, distance.meters)
+
+    def get_mag_var(self) -> float:
+        """
+        Magnetic variation at the aircraft, from the lookup of the tick
+        when there is one and the aircraft is in the store.
+        """
+        if self.motion is None or self.store_id is None:
+            return get_mag_var_by_position(self.position)
+        return self.motion.get_mag_var(self.store_id)
+
     def pushback(self, after_time: timedelta):
         if self.position is None:
             return
@@ -289,19 +350,15 @@ class BotAircraft(Aircraft):
             self.pushback_path[0]
         )
         self.heading = bearing
-        self.speed = Speed(knots=5)
+        self.speed = PUSHBACK_SPEED
 
         distance: Distance = self.speed * after_time
         if distance_to_leg < distance:
             self.pushback_path.pop(0)
 
-        new_position = fix_radial_distance(self.position, bearing, distance)
-        self.position.set_coordinates(
-            new_position.latitude,
-            new_position.longitude,
-        )
+        self.move(bearing, distance)
 
-    def taxi_to_hold_short(self, after_time: timedelta, speed: Speed = Speed(knots=30)):
+    def taxi_to_hold_short(self, after_time: timedelta, speed: Speed = TAXI_SPEED):
         if self.position is None:
             return
 
@@ -320,18 +377,14 @@ class BotAircraft(Aircraft):
             distance_to_leg
         )
         if distance_to_leg <= distance:
+            next_position = self.taxi_path.pop(0)
             self.position.set_coordinates(
-                self.taxi_path[0].latitude,
-                self.taxi_path[0].longitude,
+                next_position.latitude,
+                next_position.longitude,
             )
-            self.taxi_path.pop(0)
             return
 
-        new_position = fix_radial_distance(self.position, bearing, distance)
-        self.position.set_coordinates(
-            new_position.latitude,
-            new_position.longitude,
-        )
+        self.move(bearing, distance)
 
     def taxi_to_start_n_takeoff(self, after_time: timedelta):
         if self.position is None:
@@ -366,7 +419,7 @@ class BotAircraft(Aircraft):
             self.departure_path[0]
         )
         self.heading = bearing
-        self.speed = Speed(knots=15)
+        self.speed = LINEUP_SPEED
 
         distance: Distance = min(
             self.speed * after_time,
@@ -375,21 +428,17 @@ class BotAircraft(Aircraft):
         if distance_to_leg <= distance:
             self.departure_path.pop(0)
 
-        new_position = fix_radial_distance(self.position, bearing, distance)
-        self.position.set_coordinates(
-            new_position.latitude,
-            new_position.longitude,
-        )
+        self.move(bearing, distance)
 
     def update_speed(self, after_time: timedelta, flightplan: Flightplan, position: Position):
         speed_limit = flightplan.cruise_speed if self.speed_limit is None else self.speed_limit
-        if position.altitude_ < Distance(feet=10000):
+        if position.altitude_ < SPEED_LIMIT_ALTITUDE:
             # if altitude below 10000ft, speed limit to 250 knots
             speed_limit = min(
                 speed_limit,
-                Speed(knots=240)
+                SPEED_LIMIT_BELOW_10000FT
             )
-        distance = Distance(nautical=0)
+        distance = ZERO_DISTANCE
         if isclose(self.speed.knots, speed_limit.knots, abs_tol=2):
             distance = self.speed * after_time
         if self.speed < speed_limit:
@@ -442,18 +491,18 @@ class BotAircraft(Aircraft):
             elif target_leg.speed_limit is None:
                 self.set_speed_limit(None)
 
-        bearing, distance_to_leg = self.heading, Distance(nautical=999999)
+        bearing, distance_to_leg = self.heading, UNLIMITED_DISTANCE
         if target_leg is not None:
             if target_leg.procedure_leg_type == ProcedureLegType.HEADING_TO_ALTITUDE_TERMINATION:
-                mag_var = get_mag_var_by_position(self.position)
+                mag_var = self.get_mag_var()
                 bearing = target_leg.course + Bearing(mag_var)
                 self.set_target_altitude(target_leg.min_altitude_limit)
-                distance_to_leg = Distance(0)
+                distance_to_leg = ZERO_DISTANCE
             elif target_leg.procedure_leg_type == ProcedureLegType.HEADING_TO_DME_DISTANCE_TERMINATION:
-                mag_var = get_mag_var_by_position(self.position)
+                mag_var = self.get_mag_var()
                 bearing = target_leg.course + Bearing(mag_var)
-                self.set_target_altitude(Distance(feet=3000))
-                distance_to_leg = Distance(0)
+                self.set_target_altitude(DME_LEG_TARGET_ALTITUDE)
+                distance_to_leg = ZERO_DISTANCE
             else:
                 bearing, distance_to_leg = get_bearing_distance(
                     self.position,
@@ -481,10 +530,10 @@ class BotAircraft(Aircraft):
         #         )
 
         # if altitude below 10000ft, speed limit to 250 knots
-        if self.position.altitude_ < Distance(feet=10000):
+        if self.position.altitude_ < SPEED_LIMIT_ALTITUDE:
             self.speed = min(
                 self.speed,
-                Speed(knots=250)
+                MAX_SPEED_BELOW_10000FT
             )
 
         if self.is_on_ground is True:
@@ -494,8 +543,8 @@ class BotAircraft(Aircraft):
                     self.is_on_ground = False
             else:
                 # landed
-                self.set_speed_limit(Speed(knots=30))
-                if self.speed < Speed(knots=60) and self.status == AircraftStatus.CLEARED_LAND:
+                self.set_speed_limit(TAXI_SPEED)
+                if self.speed < VACATE_RUNWAY_SPEED and self.status == AircraftStatus.CLEARED_LAND:
                     self.status = AircraftStatus.VACATE_RUNWAY
 
                     if len(self.taxi_path) == 0:
@@ -519,10 +568,10 @@ class BotAircraft(Aircraft):
             if self.target_altitude is None:
                 # keep cruise altitude
                 roc = self.climb_roc
-                if self.position.altitude_ < Distance(feet=2500):
-                    roc = Speed(fpm=5000)
-                elif self.position.altitude_ < Distance(feet=10000):
-                    roc = Speed(fpm=2500)
+                if self.position.altitude_ < INITIAL_CLIMB_ALTITUDE:
+                    roc = INITIAL_CLIMB_ROC
+                elif self.position.altitude_ < SPEED_LIMIT_ALTITUDE:
+                    roc = CLIMB_ROC_BELOW_10000FT
                 if self.position.altitude_ < self.flightplan.cruise_altitude:
                     added_altitude = min(
                         roc * after_time,
@@ -551,7 +600,7 @@ class BotAircraft(Aircraft):
             if target_leg is None and self.position.altitude_ <= self.target_altitude:
                 self.is_on_ground = True
                 self.position.set_altitude(self.target_altitude)
-                self.set_speed_limit(Speed(knots=0))
+                self.set_speed_limit(ZERO_SPEED)
 
         distance = self.update_speed(
             after_time,
@@ -561,13 +610,13 @@ class BotAircraft(Aircraft):
 
         if distance_to_leg < distance:
             if target_leg.procedure_leg_type == ProcedureLegType.HEADING_TO_ALTITUDE_TERMINATION:
-                if self.position.altitude_ >= (target_leg.min_altitude_limit - Distance(feet=100)):
+                if self.position.altitude_ >= (target_leg.min_altitude_limit - ALTITUDE_TOLERANCE):
                     self.to_next_leg()
             elif target_leg.procedure_leg_type == ProcedureLegType.HEADING_TO_DME_DISTANCE_TERMINATION:
                 ils = self.expect_runway_end.ils
-                distance_to_dme = distance_between(
-                    (self.position.latitude, self.position.longitude),
-                    (ils.dme_laty, ils.dme_lonx)
+                _, distance_to_dme = get_bearing_distance(
+                    self.position,
+                    Position(ils.dme_laty, ils.dme_lonx)
                 )
                 if distance_to_dme > Distance(nautical=target_leg.procedure_leg.distance):
                     self.to_next_leg()
@@ -576,19 +625,14 @@ class BotAircraft(Aircraft):
                     altitude = self.position.altitude_
                     self.position.set_altitude(
                         max(
-                            target_leg.min_altitude_limit or Distance(feet=0),
-                            min(altitude, target_leg.max_altitude_limit or Distance(
-                                feet=999999))
+                            target_leg.min_altitude_limit or ZERO_DISTANCE,
+                            min(altitude, target_leg.max_altitude_limit or UNLIMITED_DISTANCE)
                         )
                     )
 
                 self.to_next_leg()
 
-        new_position = fix_radial_distance(self.position, bearing, distance)
-        self.position.set_coordinates(
-            new_position.latitude,
-            new_position.longitude,
-        )
+        self.move(bearing, distance)
 
     def ils_approach(self, after_time: timedelta):
         # If intercepted ILS, should has expect runway end
@@ -628,18 +672,15 @@ class BotAircraft(Aircraft):
         altitude = altitude_to_ground + touch_down_position.altitude_
         self.position.set_altitude(altitude)
 
-        new_position = fix_radial_distance(self.position, bearing, distance)
-        self.position.set_coordinates(
-            new_position.latitude,
-            new_position.longitude,
-        )
-
-        # touch down
+        # touch down, instead of moving past the touchdown point
         if distance > distance_to_leg:
             self.position = touch_down_position.copy()
             self.is_intercept_ils = False
             self.is_on_ground = True
             self.legs = []
+            return
+
+        self.move(bearing, distance)
 
     def holding(self, after_time: timedelta):
         pass
@@ -650,7 +691,8 @@ class BotAircraft(Aircraft):
     # TODO: calculate TOD
     # TODO: adjust roc by leg restriction
     # TODO: support smooth turn
-    def update_status(self, after_time: timedelta):
+    def update_status(self, after_time: timedelta, motion: MotionBatch | None = None):
+        self.motion = motion
         if self.status == AircraftStatus.APPROVED_PUSHBACK_STARTUP:
             self.pushback(after_time)
         elif self.status == AircraftStatus.APPROVED_TAXI_TO_RWY:
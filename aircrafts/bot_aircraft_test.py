@@ -0,0 +1,55 @@
+import unittest
+from datetime import timedelta
+
+from aircrafts.b738 import B738
+from aircrafts.bot_aircraft import AircraftStatus
+from aircrafts.store import AircraftStore
+from messages.Position import Position
+from utils.distance import Distance
+from utils.motion import MotionBatch
+from utils.physics import Speed
+
+TOUCH_DOWN_POSITION = Position(25.0, 121.001, Distance(feet=100))
+
+
+class FakeLocLine:
+    def project_point(self, point):
+        return point
+
+
+class FakeRunwayEnd:
+    loc_line = FakeLocLine()
+    touch_down_position = TOUCH_DOWN_POSITION
+
+
+class FakeLeg:
+    glide_slope_angle = -3.0
+    is_missed = False
+
+
+class TestBotAircraft(unittest.TestCase):
+
+    def test_touch_down_in_motion_batch(self):
+        store = AircraftStore()
+        motion = MotionBatch(store)
+        aircraft = B738(
+            'CAL1',
+            Position(25.0, 121.0, Distance(feet=300)),
+            speed=Speed(knots=140)
+        )
+        aircraft.set_expect_runway_end(FakeRunwayEnd())
+        aircraft.legs = [FakeLeg()]
+        aircraft.is_intercept_ils = True
+        aircraft.set_status(AircraftStatus.CLEARED_LAND)
+        store.add(aircraft)
+
+        # 144 m in 2 seconds, the touchdown point is 100 m away
+        aircraft.update_status(timedelta(seconds=2), motion)
+        motion.flush()
+        self.assertTrue(aircraft.is_on_ground)
+        self.assertEqual(aircraft.position.longitude, TOUCH_DOWN_POSITION.longitude)
+        self.assertEqual(aircraft.position.latitude, TOUCH_DOWN_POSITION.latitude)
+
+
+if __name__ == '__main__':
+    unittest.main()
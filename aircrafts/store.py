@@ -0,0 +1,268 @@
+"""
+Aircraft state in flat arrays.
+
+The coordinates of the registered aircraft live in contiguous arrays
+indexed by a stable aircraft id. The motion batch moves them in place and
+the aircraft read them through their StoredPosition, so there is a single
+copy of them. Paths are ranges into shared point arrays instead of lists
+of Position objects.
+"""
+import weakref
+from typing import Iterable
+
+import numpy as np
+
+from aircrafts.aircraft import Aircraft
+from messages.Position import Position
+from utils.distance import Distance
+
+INITIAL_AIRCRAFT_CAPACITY = 64
+INITIAL_PATH_CAPACITY = 1024
+
+
+class Path:
+    """
+    The points of a path, consumed from the front like a list.
+    """
+    __slots__ = ('store', 'start', 'end', 'head', '__weakref__')
+
+    def __init__(self, store: 'PathStore', start: int, end: int):
+        self.store = store
+        self.start = start
+        self.end = end
+        # the first point, read every tick until it is reached
+        self.head: Position | None = None
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __bool__(self):
+        return self.end > self.start
+
+    def __getitem__(self, index: int) -> Position:
+        length = self.end - self.start
+        if index < 0:
+            index += length
+        if index < 0 or index >= length:
+            raise IndexError('path index out of range')
+        if index == 0:
+            if self.head is None:
+                self.head = self.store.get_position(self.start)
+            return self.head
+        return self.store.get_position(self.start + index)
+
+    def __iter__(self):
+        for index in range(self.start, self.end):
+            yield self.store.get_position(index)
+
+    def __add__(self, other: Iterable[Position]) -> 'Path':
+        return self.store.add([*self, *other])
+
+    def __repr__(self):  # pragma: no cover
+        return f'Path({len(self)} points)'
+
+    def pop(self, index: int = -1) -> Position:
+        position = self[index]
+        if index == 0:
+            self.start += 1
+            self.head = None
+        elif index == -1 or index == len(self) - 1:
+            self.end -= 1
+        else:
+            raise IndexError('only the ends of a path can be popped')
+        return position
+
+
+class PathStore:
+    """
+    Points of all the paths in shared arrays. Space left by consumed
+    points and dropped paths is reclaimed by compacting the live paths when
+    the arrays are full.
+    """
+
+    def __init__(self, capacity: int = INITIAL_PATH_CAPACITY):
+        self.latitudes = np.empty(capacity, dtype=np.float64)
+        self.longitudes = np.empty(capacity, dtype=np.float64)
+        # meters, NaN without altitude
+        self.altitudes = np.empty(capacity, dtype=np.float64)
+        self.size = 0
+        self.paths: weakref.WeakSet[Path] = weakref.WeakSet()
+
+    @property
+    def capacity(self):
+        return len(self.latitudes)
+
+    def get_position(self, index: int) -> Position:
+        altitude = self.altitudes.item(index)
+        return Position(
+            self.latitudes.item(index),
+            self.longitudes.item(index),
+            None if altitude != altitude else Distance.from_meters(altitude)
+        )
+
+    def add(self, positions: Iterable[Position]) -> Path:
+        positions = list(positions)
+        count = len(positions)
+        if count == 0:
+            # nothing to keep, empty paths aren't tracked
+            return Path(self, 0, 0)
+        self._reserve(count)
+        start = self.size
+        end = start + count
+        self.latitudes[start:end] = [p.latitude for p in positions]
+        self.longitudes[start:end] = [p.longitude for p in positions]
+        self.altitudes[start:end] = [
+            np.nan if p.altitude_ is None else p.altitude_.meters for p in positions
+        ]
+        self.size = end
+        path = Path(self, start, end)
+        self.paths.add(path)
+        return path
+
+    def _reserve(self, count: int):
+        if self.size + count <= self.capacity:
+            return
+        live = sum(len(path) for path in self.paths) + count
+        capacity = self.capacity
+        # leave room to grow before the next compaction
+        while live * 2 > capacity:
+            capacity *= 2
+        self._compact(capacity)
+
+    def _compact(self, capacity: int):
+        latitudes = np.empty(capacity, dtype=np.float64)
+        longitudes = np.empty(capacity, dtype=np.float64)
+        altitudes = np.empty(capacity, dtype=np.float64)
+        offset = 0
+        for path in list(self.paths):
+            count = len(path)
+            latitudes[offset:offset + count] = self.latitudes[path.start:path.end]
+            longitudes[offset:offset + count] = self.longitudes[path.start:path.end]
+            altitudes[offset:offset + count] = self.altitudes[path.start:path.end]
+            path.start = offset
+            path.end = offset + count
+            offset += count
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+        self.altitudes = altitudes
+        self.size = offset
+
+
+class StoredPosition(Position):
+    """
+    Position of a registered aircraft. The coordinates are read from and
+    written to the store arrays.
+    """
+
+    def __new__(cls, store: 'AircraftStore', aircraft_id: int, altitude: Distance | None = None):
+        return object.__new__(cls)
+
+    def __init__(self, store: 'AircraftStore', aircraft_id: int, altitude: Distance | None = None):
+        self.store = store
+        self.aircraft_id = aircraft_id
+        self.altitude = 0.0
+        self.altitude_ = altitude
+
+    @property
+    def latitude(self) -> float:
+        return self.store.latitudes.item(self.aircraft_id)
+
+    @latitude.setter
+    def latitude(self, latitude: float):
+        self.store.latitudes[self.aircraft_id] = latitude
+
+    @property
+    def longitude(self) -> float:
+        return self.store.longitudes.item(self.aircraft_id)
+
+    @longitude.setter
+    def longitude(self, longitude: float):
+        self.store.longitudes[self.aircraft_id] = longitude
+
+
+class AircraftStore:
+    """
+    Stable integer ids for the aircraft and their coordinates in
+    structure-of-arrays layout. The aircraft objects stay the side table of
+    the other fields (flightplan, legs, status).
+    """
+
+    def __init__(self, capacity: int = INITIAL_AIRCRAFT_CAPACITY):
+        self.latitudes = np.full(capacity, np.nan)
+        self.longitudes = np.full(capacity, np.nan)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.aircraft: list[Aircraft | None] = [None] * capacity
+        self.free_ids: list[int] = []
+        self.size = 0
+        self.paths = PathStore()
+
+    def __len__(self):
+        return self.size - len(self.free_ids)
+
+    @property
+    def capacity(self):
+        return len(self.aircraft)
+
+    def add(self, aircraft: Aircraft) -> int:
+        """
+        Register the aircraft, which then keeps its coordinates in the
+        arrays.
+        """
+        if aircraft.store_id is not None:
+            return aircraft.store_id
+        position = aircraft.position
+        if position is None:
+            raise ValueError(f'{aircraft.callsign} has no position')
+        if len(self.free_ids) != 0:
+            aircraft_id = self.free_ids.pop()
+        else:
+            if self.size == self.capacity:
+                self._grow(self.capacity * 2)
+            aircraft_id = self.size
+            self.size += 1
+        self.latitudes[aircraft_id] = position.latitude
+        self.longitudes[aircraft_id] = position.longitude
+        self.active[aircraft_id] = True
+        self.aircraft[aircraft_id] = aircraft
+        aircraft.position = StoredPosition(self, aircraft_id, position.altitude_)
+        aircraft.store_id = aircraft_id
+        return aircraft_id
+
+    def remove(self, aircraft: Aircraft):
+        aircraft_id = aircraft.store_id
+        if aircraft_id is None or self.aircraft[aircraft_id] is not aircraft:
+            return
+        position = aircraft.position.copy()
+        aircraft.store_id = None
+        aircraft.position = position
+        self.aircraft[aircraft_id] = None
+        self.active[aircraft_id] = False
+        self.latitudes[aircraft_id] = np.nan
+        self.longitudes[aircraft_id] = np.nan
+        self.free_ids.append(aircraft_id)
+
+    def get(self, aircraft_id: int) -> Aircraft | None:
+        if aircraft_id < 0 or aircraft_id >= self.size:
+            return None
+        return self.aircraft[aircraft_id]
+
+    def _grow(self, capacity: int):
+        extra = capacity - self.capacity
+        self.latitudes = np.concatenate((self.latitudes, np.full(extra, np.nan)))
+        self.longitudes = np.concatenate((self.longitudes, np.full(extra, np.nan)))
+        self.active = np.concatenate((self.active, np.zeros(extra, dtype=bool)))
+        self.aircraft.extend([None] * extra)
+
+    def snapshot(self) -> dict[str, np.ndarray]:
+        """
+        Copies of the coordinates of the active aircraft, with their ids.
+        """
+        ids = np.flatnonzero(self.active[:self.size])
+        return {
+            'ids': ids,
+            'latitudes': self.latitudes[ids],
+            'longitudes': self.longitudes[ids],
+        }
+
+
+aircraft_store = AircraftStore()
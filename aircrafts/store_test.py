@@ -0,0 +1,98 @@
+import unittest
+
+from aircrafts.aircraft import Aircraft
+from aircrafts.store import AircraftStore, PathStore
+from messages.Position import Position
+from utils.distance import Distance
+
+
+def create_positions(count: int, longitude: float = 121.0):
+    return [Position(25.0, longitude + i * 0.001) for i in range(count)]
+
+
+class TestPathStore(unittest.TestCase):
+
+    def test_path(self):
+        paths = PathStore()
+        path = paths.add([Position(25.0, 121.0, Distance(feet=100)), Position(25.1, 121.1)])
+        self.assertEqual(len(path), 2)
+        self.assertEqual(path[0].altitude_.feet, 100)
+        self.assertIsNone(path[-1].altitude_)
+        self.assertEqual(path.pop(0).latitude, 25.0)
+        self.assertEqual(path[0].longitude, 121.1)
+        self.assertIs(path[0], path[0])
+        path.pop(0)
+        self.assertFalse(path)
+        with self.assertRaises(IndexError):
+            path[0]
+
+    def test_extend(self):
+        paths = PathStore()
+        path = paths.add(create_positions(2))
+        path += create_positions(1, 122.0)
+        self.assertEqual([p.longitude for p in path], [121.0, 121.001, 122.0])
+
+    def test_compact(self):
+        paths = PathStore(capacity=8)
+        kept = paths.add(create_positions(4))
+        kept.pop(0)
+        for _ in range(10):
+            paths.add(create_positions(4, 130.0))
+        # dropped paths are reclaimed instead of growing for each of them
+        self.assertEqual(paths.capacity, 16)
+        self.assertEqual([p.longitude for p in kept], [121.001, 121.002, 121.003])
+
+
+class TestAircraftStore(unittest.TestCase):
+
+    def test_stable_ids(self):
+        store = AircraftStore(capacity=2)
+        aircraft = [Aircraft(f'CAL{i}', Position(25.0, 121.0)) for i in range(3)]
+        ids = [store.add(a) for a in aircraft]
+        self.assertEqual(ids, [0, 1, 2])
+        store.remove(aircraft[1])
+        self.assertIsNone(aircraft[1].store_id)
+        self.assertIsNone(store.get(1))
+        self.assertIs(store.get(2), aircraft[2])
+        self.assertEqual(store.add(Aircraft('EVA1', Position(25.0, 121.0))), 1)
+        self.assertEqual(len(store), 3)
+
+    def test_stored_position(self):
+        store = AircraftStore()
+        aircraft = Aircraft('CAL1', Position(25.0, 121.0, Distance(feet=5000)))
+        store.add(aircraft)
+        aircraft.position.set_coordinates(25.5, 121.5)
+        self.assertEqual(store.latitudes[0], 25.5)
+        store.longitudes[0] = 122.0
+        self.assertEqual(aircraft.position.longitude, 122.0)
+        self.assertAlmostEqual(aircraft.position.altitude_.feet, 5000)
+        # the stored position is kept, its values replaced
+        stored_position = aircraft.position
+        aircraft.set_position(Position(24.0, 120.0))
+        self.assertIs(aircraft.position, stored_position)
+        self.assertEqual(store.latitudes[0], 24.0)
+        self.assertIsNone(aircraft.position.altitude_)
+
+        store.remove(aircraft)
+        self.assertIsNot(aircraft.position, stored_position)
+        self.assertEqual(aircraft.position.latitude, 24.0)
+        aircraft.position.set_coordinates(0, 0)
+        self.assertNotEqual(store.latitudes[0], 0)
+
+    def test_snapshot(self):
+        store = AircraftStore()
+        first = Aircraft('CAL1', Position(25.0, 121.0))
+        second = Aircraft('CAL2', Position(24.0, 120.0))
+        store.add(first)
+        store.add(second)
+        store.remove(second)
+        snapshot = store.snapshot()
+        self.assertEqual(snapshot['ids'].tolist(), [0])
+        self.assertEqual(snapshot['latitudes'].tolist(), [25.0])
+        # copies, not views
+        snapshot['latitudes'][0] = 0
+        self.assertEqual(store.latitudes[0], 25.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
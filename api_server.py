@@ -2,21 +2,24 @@ from uuid import uuid1
 from typing import Literal, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
-from geopy.distance import Distance
+from utils.distance import Distance
 from fastapi import FastAPI, HTTPException
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 
-from training_server import training_server, TrainingController
+from aircrafts.bot_aircraft import BotAircraft
+from db.executor import db_executor
+from db.init import detach
+from training_server import training_server, TrainingController, get_sid, get_vacate_paths, get_bay
 from helpers import (
-    get_sid_approach_names_by_airport_ident,
     get_parkings_by_airport_ident,
     get_parking_by_parking_id,
-    get_approach_approaches_by_airport_ident
 )
 from utils.preset_flightplans import b738_config, flightplans
-from utils.flightplan import Flightplan
+from utils.flightplan import Flightplan, route_legs_cache
 from utils.connection import Connection
+from utils.procedure_catalogue import procedure_catalogues
+from utils.ground_graph import ground_graphs
 
 app = FastAPI()
 
@@ -49,30 +52,33 @@ class CamelModel(BaseModel):
 
 
 @app.get('/airports/{airport_ident}/sids')
-def get_sids(airport_ident: str):
-    return [sid.fix_ident for sid in get_sid_approach_names_by_airport_ident(airport_ident)]
+async def get_sids(airport_ident: str):
+    catalogue = await db_executor.run(procedure_catalogues.get, airport_ident)
+    return [sid.fix_ident for sid in catalogue.sids]
 
 
 @app.get('/airports/{airport_ident}/approaches')
-def get_approaches(airport_ident: str):
+async def get_approaches(airport_ident: str):
+    catalogue = await db_executor.run(procedure_catalogues.get, airport_ident)
     return [
         {
             'id': app.approach_id,
             'name': app.arinc_name,
             'runwayName': app.runway_name,
             'type': app.type
-        } for app in get_approach_approaches_by_airport_ident(airport_ident) if app.type in ('ILS', 'LOC')
+        } for app in catalogue.approaches if app.type in ('ILS', 'LOC')
     ]
 
 
 @app.get('/airports/{airport_ident}/parkings')
-def get_parkings(airport_ident: str):
+async def get_parkings(airport_ident: str):
+    parkings = await db_executor.run(get_parkings_by_airport_ident, airport_ident)
     return [
         {
             'id': p.parking_id,
             'name': p.full_name,
             'type': p.type_description
-        } for p in get_parkings_by_airport_ident(airport_ident)
+        } for p in parkings
     ]
 
 
@@ -86,8 +92,38 @@ def get_preset_flightplans():
     } for fp in flightplans]
 
 
+# the routes reading or changing the connections are async, so they run on
+# the event loop shared with the FSD server instead of the threadpool. Their
+# database lookups run in the database executor.
+@app.get('/metrics')
+async def get_metrics():
+    tick_scheduler = training_server.tick_scheduler
+    return {
+        'tick': tick_scheduler.metrics.to_dict() if tick_scheduler is not None else None,
+        'parsedMessagesPerSecond': training_server.parsed_messages.rate,
+        'parsedMessages': training_server.parsed_messages.total,
+        'commands': TrainingController.metrics.to_dict(),
+        'routeLegsCache': route_legs_cache.to_dict(),
+        'connections': [{
+            'id': str(conn.id),
+            'callsign': conn.callsign,
+            'isPaused': conn.is_paused,
+            'queueDepth': conn.queue_depth,
+            'writeBufferSize': conn.transport.get_write_buffer_size(),
+        } for conn in list(training_server.connections.values()) if conn.transport is not None],
+    }
+
+
+def check_not_sharded():
+    # the front-end only keeps stand-ins of the bots simulated by the shard
+    # workers, which are instructed over FSD text messages
+    if training_server.shards is not None:
+        raise HTTPException(status_code=409, detail='Not available with shards')
+
+
 @app.get('/aircrafts')
-def get_aircrafts():
+async def get_aircrafts():
+    check_not_sharded()
     connections = [conn for conn in training_server.connections.values()]
     return [{
         'id': conn.id,
@@ -113,7 +149,7 @@ def get_aircrafts():
         'isOnGround': conn.aircraft.is_on_ground,
         'isGoAround': conn.aircraft.legs[0].is_missed if len(conn.aircraft.legs) else None,
         'status': conn.aircraft.status
-    } for conn in connections if conn.aircraft is not None]
+    } for conn in connections if isinstance(conn.aircraft, BotAircraft)]
 
 
 class AircraftFlightplan(CamelModel):
@@ -132,8 +168,7 @@ class AircraftBody(CamelModel):
     arrival_airport: Optional[str | None] = Field(None)
 
 
-@app.post('/aircrafts')
-def create_aircraft(form: AircraftBody):
+def generate_aircraft(form: AircraftBody) -> BotAircraft | None:
     flightplan = Flightplan(
         departure_airport=form.flightplan.departure,
         arrival_airport=form.flightplan.arrival,
@@ -160,6 +195,22 @@ def create_aircraft(form: AircraftBody):
             approach_id=form.approach_id,
         )
 
+    if aircraft is not None:
+        # generated in the database executor, read from the event loop
+        detach([
+            row for row in (
+                aircraft.parking,
+                aircraft.expect_runway_end,
+                *(leg.procedure_leg for leg in aircraft.legs),
+            ) if row is not None
+        ])
+    return aircraft
+
+
+@app.post('/aircrafts')
+async def create_aircraft(form: AircraftBody):
+    check_not_sharded()
+    aircraft = await db_executor.run(generate_aircraft, form)
     if aircraft is None:
         raise HTTPException(status_code=400, detail='Error')
 
@@ -172,31 +223,34 @@ def create_aircraft(form: AircraftBody):
     conn.aircraft = aircraft
     conn.callsign = aircraft.callsign
     conn.type = 'PILOT'
-    training_server.connections[conn.id] = conn
+    training_server.add_connection(conn)
 
     return {'id': conn.id, 'callsign': aircraft.callsign}
 
 
 def get_connection_and_controller(aircraft_id: str):
+    check_not_sharded()
     conn = training_server.connections.get(aircraft_id)
     if conn is None:
         raise HTTPException(status_code=404, detail='Not found')
-    controller = TrainingController(
-        conn,
-        training_server.connections
-    )
     return (
         conn,
-        controller
+        conn.controller
     )
 
 
+async def load_ground_graph(conn: Connection):
+    parking = conn.aircraft.parking if isinstance(conn.aircraft, BotAircraft) else None
+    if parking is not None:
+        await db_executor.run(ground_graphs.get, parking.airport_id)
+
+
 class Aircraft(CamelModel):
     target_altitude: int
 
 
 @app.put('/aircrafts/{aircraft_id}')
-def update_aircraft(aircraft_id: str, aircraft: Aircraft):
+async def update_aircraft(aircraft_id: str, aircraft: Aircraft):
     target_conn, controller = get_connection_and_controller(aircraft_id)
     controller.change_altitude(
         target_conn,
@@ -206,7 +260,7 @@ def update_aircraft(aircraft_id: str, aircraft: Aircraft):
 
 
 @app.delete('/aircrafts/{aircraft_id}')
-def delete_aircraft(aircraft_id: str):
+async def delete_aircraft(aircraft_id: str):
     target_conn, controller = get_connection_and_controller(aircraft_id)
     controller.shutdown(target_conn)
     return {}
@@ -219,8 +273,12 @@ class ClearanceDelivery(CamelModel):
 
 
 @app.post('/aircrafts/{aircraft_id}/clearance-delivery')
-def clearance_delivery(aircraft_id: str, form: ClearanceDelivery):
+async def clearance_delivery(aircraft_id: str, form: ClearanceDelivery):
     target_conn, controller = get_connection_and_controller(aircraft_id)
+    aircraft = target_conn.aircraft
+    if isinstance(aircraft, BotAircraft) and aircraft.flightplan is not None:
+        # load the catalogue and compile the SID for the controller
+        await db_executor.run(get_sid, aircraft.flightplan.departure_airport, form.sid_name)
     controller.delivered(
         target_conn,
         form.sid_name,
@@ -232,8 +290,9 @@ def clearance_delivery(aircraft_id: str, form: ClearanceDelivery):
 
 
 @app.post('/aircrafts/{aircraft_id}/startup-pushback-approved')
-def startup_pushback_approved(aircraft_id: str):
+async def startup_pushback_approved(aircraft_id: str):
     target_conn, controller = get_connection_and_controller(aircraft_id)
+    await load_ground_graph(target_conn)
     controller.pushback_approved(target_conn)
     return {}
 
@@ -243,21 +302,22 @@ class Taxi(CamelModel):
 
 
 @app.post('/aircrafts/{aircraft_id}/taxi')
-def taxi(aircraft_id: str, taxi: Taxi):
+async def taxi(aircraft_id: str, taxi: Taxi):
     target_conn, controller = get_connection_and_controller(aircraft_id)
+    await load_ground_graph(target_conn)
     controller.taxi_approved(target_conn, taxi.taxi_path)
     return {}
 
 
 @app.post('/aircrafts/{aircraft_id}/lineup-and-wait')
-def lineup_and_wait(aircraft_id: str):
+async def lineup_and_wait(aircraft_id: str):
     target_conn, controller = get_connection_and_controller(aircraft_id)
     controller.lineup_and_wait(target_conn)
     return {}
 
 
 @app.post('/aircrafts/{aircraft_id}/cleared-takeoff')
-def cleared_takeoff(aircraft_id: str):
+async def cleared_takeoff(aircraft_id: str):
     target_conn, controller = get_connection_and_controller(aircraft_id)
     controller.cleared_takeoff(target_conn)
     return {}
@@ -268,9 +328,17 @@ class ClearedLandBody(CamelModel):
 
 
 @app.post('/aircrafts/{aircraft_id}/cleared-land')
-def cleared_land(aircraft_id: str, cleared_land_body: ClearedLandBody):
+async def cleared_land(aircraft_id: str, cleared_land_body: ClearedLandBody):
     target_conn, controller = get_connection_and_controller(aircraft_id)
-    controller.cleared_land(target_conn)
+    aircraft = target_conn.aircraft
+    if not isinstance(aircraft, BotAircraft) or aircraft.flightplan is None:
+        return {}
+    vacate_paths = await db_executor.run(
+        get_vacate_paths,
+        aircraft.flightplan.arrival_airport,
+        aircraft.expect_runway_end
+    )
+    controller.cleared_land(target_conn, vacate_paths)
     return {}
 
 
@@ -280,11 +348,15 @@ class Taxi2BayBody(CamelModel):
 
 
 @app.post('/aircrafts/{aircraft_id}/taxi-to-bay')
-def taxi_to_bay(aircraft_id: str, taxi_to_bay_body: Taxi2BayBody):
+async def taxi_to_bay(aircraft_id: str, taxi_to_bay_body: Taxi2BayBody):
     target_conn, controller = get_connection_and_controller(aircraft_id)
-    controller.taxi_to_bay(
-        target_conn,
-        taxi_to_bay_body.taxi_path,
-        taxi_to_bay_body.parking_id,
+    aircraft = target_conn.aircraft
+    if not isinstance(aircraft, BotAircraft) or aircraft.flightplan is None:
+        return {}
+    bay = await db_executor.run(
+        get_bay,
+        aircraft.flightplan.arrival_airport,
+        taxi_to_bay_body.parking_id
     )
+    controller.taxi_to_bay(target_conn, taxi_to_bay_body.taxi_path, bay)
     return {}
@@ -0,0 +1,156 @@
+from logging import getLogger
+
+from sqlalchemy.orm import Session, aliased, scoped_session
+
+from db.init import session
+from db.models import Airway, Fix, Waypoint
+from db.navdata import navdata
+
+logger = getLogger(__name__)
+
+
+class AirwayFragment:
+    """
+    Waypoints of a continuous airway fragment in sequence order.
+    `directions[i]` is the direction of the segment from waypoint i to
+    waypoint i + 1. F: forward only, B: backward only, N: both, X: no
+    segment between them.
+    """
+
+    def __init__(self, airway_name: str, fragment_no: int):
+        self.airway_name = airway_name
+        self.fragment_no = fragment_no
+        self.waypoint_ids: list[int] = []
+        self.idents: list[str] = []
+        self.latys: list[float] = []
+        self.lonxs: list[float] = []
+        self.directions: list[str] = []
+        # waypoint_id -> index in the fragment
+        self.indexes: dict[int, int] = {}
+        self.ident_indexes: dict[str, list[int]] = {}
+
+    def append(self, waypoint_id: int, ident: str, laty: float, lonx: float):
+        self.indexes.setdefault(waypoint_id, len(self.waypoint_ids))
+        self.ident_indexes.setdefault(ident, []).append(len(self.waypoint_ids))
+        self.waypoint_ids.append(waypoint_id)
+        self.idents.append(ident)
+        self.latys.append(laty)
+        self.lonxs.append(lonx)
+
+    def get_index(self, fix: Fix) -> int | None:
+        waypoint_id = getattr(fix, 'waypoint_id', None)
+        if waypoint_id is not None:
+            return self.indexes.get(waypoint_id)
+        # VORs and NDBs on airways
+        indexes = self.ident_indexes.get(fix.ident)
+        return None if indexes is None else indexes[0]
+
+    def get_slice(self, from_index: int, to_index: int) -> list[int] | None:
+        """
+        Indexes from one waypoint to another, both included, or None when
+        the direction of a segment doesn't allow it.
+        """
+        if from_index <= to_index:
+            if any(d in ('B', 'X') for d in self.directions[from_index:to_index]):
+                return None
+            return list(range(from_index, to_index + 1))
+        if any(d in ('F', 'X') for d in self.directions[to_index:from_index]):
+            return None
+        return list(range(from_index, to_index - 1, -1))
+
+
+class AirwayIndex:
+    """
+    Airways kept in memory as ordered waypoint arrays, so the waypoints
+    between two fixes of an airway are a slice. Airways are loaded by name
+    on first use, from the navdata snapshot when it has them, or all at
+    once with `load`.
+    """
+
+    def __init__(self, db_session: Session | scoped_session = session):
+        self.session = db_session
+        self.airways: dict[str, list[AirwayFragment]] = {}
+
+    def _query(self):
+        from_waypoint = aliased(Waypoint)
+        to_waypoint = aliased(Waypoint)
+        return self.session.query(
+            Airway.airway_name,
+            Airway.airway_fragment_no,
+            Airway.direction,
+            Airway.from_waypoint_id,
+            from_waypoint.ident,
+            Airway.from_laty,
+            Airway.from_lonx,
+            Airway.to_waypoint_id,
+            to_waypoint.ident,
+            Airway.to_laty,
+            Airway.to_lonx,
+        ).join(
+            from_waypoint, Airway.from_waypoint_id == from_waypoint.waypoint_id
+        ).join(
+            to_waypoint, Airway.to_waypoint_id == to_waypoint.waypoint_id
+        ).order_by(
+            Airway.airway_name,
+            Airway.airway_fragment_no,
+            Airway.sequence_no
+        )
+
+    def load(self, airway_name: str | None = None):
+        rows = None
+        if airway_name is not None:
+            self.airways[airway_name] = []
+            if navdata.snapshot is not None:
+                rows = navdata.snapshot.get_airway_rows(airway_name)
+        if rows is None:
+            rows = self._query()
+            if airway_name is not None:
+                rows = rows.filter(Airway.airway_name == airway_name)
+
+        fragment: AirwayFragment | None = None
+        for (
+            name, fragment_no, direction,
+            from_id, from_ident, from_laty, from_lonx,
+            to_id, to_ident, to_laty, to_lonx
+        ) in rows:
+            if fragment is None or fragment.airway_name != name or fragment.fragment_no != fragment_no:
+                fragment = AirwayFragment(name, fragment_no)
+                fragment.append(from_id, from_ident, from_laty, from_lonx)
+                self.airways.setdefault(name, []).append(fragment)
+            elif fragment.waypoint_ids[-1] != from_id:
+                # gap in the fragment, continue from the new waypoint
+                fragment.append(from_id, from_ident, from_laty, from_lonx)
+                fragment.directions.append('X')
+            fragment.directions.append(direction or 'N')
+            fragment.append(to_id, to_ident, to_laty, to_lonx)
+
+    def get_fragments(self, airway_name: str) -> list[AirwayFragment]:
+        if airway_name not in self.airways:
+            self.load(airway_name)
+        return self.airways[airway_name]
+
+    def get_waypoints_between(self, airway_name: str, from_fix: Fix | None, to_fix_name: str):
+        """
+        Waypoints along the airway from a fix to another, both included.
+        Empty when the fixes aren't on the airway.
+        """
+        if from_fix is None:
+            return None, []
+        for fragment in self.get_fragments(airway_name):
+            from_index = fragment.get_index(from_fix)
+            if from_index is None:
+                continue
+            for to_index in fragment.ident_indexes.get(to_fix_name, []):
+                if to_index == from_index:
+                    continue
+                indexes = fragment.get_slice(from_index, to_index)
+                if indexes is not None:
+                    return fragment, indexes
+        return None, []
+
+    def clear(self):
+        self.airways.clear()
+
+
+airway_index = AirwayIndex()
+navdata.on_reload(airway_index.clear)
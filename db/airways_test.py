@@ -0,0 +1,85 @@
+import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from db.models import Airway, Waypoint
+from db.airways import AirwayIndex
+
+IDENTS = ['AAAAA', 'BBBBB', 'CCCCC', 'DDDDD', 'EEEEE']
+
+
+def create_airway(airway_id: int, sequence_no: int, from_id: int, to_id: int, direction='N'):
+    return Airway(
+        airway_id=airway_id, airway_name='W6', airway_type='V',
+        airway_fragment_no=1, sequence_no=sequence_no, direction=direction,
+        from_waypoint_id=from_id, to_waypoint_id=to_id,
+        from_laty=float(from_id), from_lonx=120.0,
+        to_laty=float(to_id), to_lonx=120.0,
+        left_lonx=120.0, right_lonx=120.0, top_laty=0.0, bottom_laty=0.0,
+    )
+
+
+def create_session(directions=('N', 'N', 'N', 'N')):
+    engine = create_engine('sqlite://')
+    Waypoint.__table__.create(engine)
+    Airway.__table__.create(engine)
+    db_session = Session(engine)
+    db_session.add_all([
+        Waypoint(waypoint_id=i + 1, ident=ident, region='RC',
+                 laty=float(i + 1), lonx=120.0)
+        for i, ident in enumerate(IDENTS)
+    ])
+    db_session.add_all([
+        create_airway(i + 1, i + 1, i + 1, i + 2, direction)
+        for i, direction in enumerate(directions)
+    ])
+    db_session.commit()
+    return db_session
+
+
+class TestAirwayIndex(unittest.TestCase):
+
+    def test_load_fragment(self):
+        index = AirwayIndex(create_session())
+        fragments = index.get_fragments('W6')
+        self.assertEqual(len(fragments), 1)
+        self.assertEqual(fragments[0].idents, IDENTS)
+        self.assertEqual(fragments[0].waypoint_ids, [1, 2, 3, 4, 5])
+        self.assertEqual(fragments[0].latys, [1.0, 2.0, 3.0, 4.0, 5.0])
+
+    def test_waypoints_between_both_directions(self):
+        db_session = create_session()
+        index = AirwayIndex(db_session)
+        from_fix = db_session.get(Waypoint, 2)
+        fragment, indexes = index.get_waypoints_between('W6', from_fix, 'DDDDD')
+        self.assertEqual([fragment.idents[i] for i in indexes],
+                         ['BBBBB', 'CCCCC', 'DDDDD'])
+        fragment, indexes = index.get_waypoints_between('W6', from_fix, 'AAAAA')
+        self.assertEqual([fragment.idents[i] for i in indexes],
+                         ['BBBBB', 'AAAAA'])
+
+    def test_respect_direction(self):
+        db_session = create_session(('F', 'F', 'F', 'F'))
+        index = AirwayIndex(db_session)
+        fragment, indexes = index.get_waypoints_between(
+            'W6', db_session.get(Waypoint, 4), 'BBBBB')
+        self.assertIsNone(fragment)
+        self.assertEqual(indexes, [])
+        fragment, indexes = index.get_waypoints_between(
+            'W6', db_session.get(Waypoint, 2), 'EEEEE')
+        self.assertEqual(len(indexes), 4)
+
+    def test_unknown_airway_or_fix(self):
+        db_session = create_session()
+        index = AirwayIndex(db_session)
+        self.assertEqual(index.get_waypoints_between(
+            'A1', db_session.get(Waypoint, 1), 'BBBBB'), (None, []))
+        self.assertEqual(index.get_waypoints_between(
+            'W6', db_session.get(Waypoint, 1), 'XXXXX'), (None, []))
+        self.assertEqual(index.get_waypoints_between(
+            'W6', None, 'BBBBB'), (None, []))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, TypeVar
+
+from db.init import POOL_SIZE, remove_sessions
+
+T = TypeVar('T')
+
+# leave a pooled connection for the event loop thread
+MAX_WORKERS = POOL_SIZE - 1
+# seconds a worker waits for the others to take their share of the shutdown
+SHUTDOWN_TIMEOUT = 5
+
+
+class DatabaseExecutor:
+    """
+    Runs blocking lookups in a bounded pool of threads, so the event loop
+    doesn't wait on disk for them. Every worker thread keeps its own
+    sessions until the executor is shut down.
+    """
+
+    def __init__(self, max_workers: int = MAX_WORKERS):
+        self.max_workers = max_workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._worker_count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                self.max_workers,
+                thread_name_prefix='db',
+                initializer=self._on_worker_started
+            )
+        return self._executor
+
+    def _on_worker_started(self):
+        with self._lock:
+            self._worker_count += 1
+
+    async def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor,
+            partial(func, *args, **kwargs)
+        )
+
+    def shutdown(self):
+        """
+        Close the sessions of every worker and stop the workers.
+        """
+        if self._executor is None:
+            return
+        executor = self._executor
+        self._executor = None
+        with self._lock:
+            worker_count = self._worker_count
+            self._worker_count = 0
+        if worker_count != 0:
+            # the sessions are thread local, the barrier makes every worker
+            # take one of the tasks
+            barrier = threading.Barrier(worker_count)
+            for _ in range(worker_count):
+                executor.submit(_remove_worker_sessions, barrier)
+        executor.shutdown(wait=True)
+
+
+def _remove_worker_sessions(barrier: threading.Barrier):
+    try:
+        barrier.wait(SHUTDOWN_TIMEOUT)
+    except threading.BrokenBarrierError:
+        pass
+    remove_sessions()
+
+
+db_executor = DatabaseExecutor()
@@ -0,0 +1,43 @@
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch
+
+from db.executor import DatabaseExecutor
+
+
+class TestDatabaseExecutor(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.executor = DatabaseExecutor(max_workers=2)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    async def test_run_in_worker_thread(self):
+        thread_name = await self.executor.run(lambda: threading.current_thread().name)
+        self.assertTrue(thread_name.startswith('db'))
+
+    async def test_arguments(self):
+        self.assertEqual(await self.executor.run(divmod, 7, 2), (3, 1))
+        self.assertEqual(await self.executor.run(int, '11', base=2), 3)
+
+    async def test_shutdown_removes_worker_sessions(self):
+        # keep both workers busy at once so that two threads are started
+        barrier = threading.Barrier(2)
+        await asyncio.gather(
+            self.executor.run(barrier.wait, 5),
+            self.executor.run(barrier.wait, 5),
+        )
+        thread_names = []
+        with patch(
+            'db.executor.remove_sessions',
+            lambda: thread_names.append(threading.current_thread().name)
+        ):
+            self.executor.shutdown()
+        self.assertEqual(len(set(thread_names)), 2)
+        self.assertTrue(all(name.startswith('db') for name in thread_names))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,98 @@
-from sqlalchemy import create_engine
+from typing import Iterable, TypeVar
+
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+NAVIGRAPH_DATABASE = 'little_navmap_navigraph.sqlite'
+MSFS_DATABASE = 'little_navmap_msfs.sqlite'
+
+# connections kept open per database, enough for the event loop thread and
+# the database executor
+POOL_SIZE = 8
+# extra connections opened on demand by any other thread, closed again when
+# they are returned
+POOL_MAX_OVERFLOW = 40
+
+# the databases are only read, so let SQLite map them into memory and cache
+# more pages
+SQLITE_PRAGMAS = (
+    ('query_only', 'ON'),
+    ('mmap_size', 256 * 1024 * 1024),
+    # negative values are in KiB
+    ('cache_size', -64 * 1024),
+)
+
+
+def create_read_only_engine(path: str) -> Engine:
+    engine = create_engine(
+        f'sqlite:///{path}',
+        pool_size=POOL_SIZE,
+        max_overflow=POOL_MAX_OVERFLOW,
+        connect_args={'check_same_thread': False},
+    )
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS:
+            cursor.execute(f'PRAGMA {name} = {value}')
+        cursor.close()
+
+    return engine
 
-engine = create_engine('sqlite:///little_navmap_navigraph.sqlite').connect()
-session = Session(engine)
 
-engine = create_engine('sqlite:///little_navmap_msfs.sqlite').connect()
-msfs_session = Session(engine)
+def create_scoped_session(engine: Engine) -> scoped_session:
+    """
+    One session per thread. Loaded objects are never expired since nothing
+    is written.
+    """
+    return scoped_session(sessionmaker(bind=engine, expire_on_commit=False))
+
+
+engine = create_read_only_engine(NAVIGRAPH_DATABASE)
+session = create_scoped_session(engine)
+
+msfs_engine = create_read_only_engine(MSFS_DATABASE)
+msfs_session = create_scoped_session(msfs_engine)
 
 Base = declarative_base()
+
+T = TypeVar('T')
+
+
+def remove_sessions():
+    """
+    Close the sessions of the current thread and return their connections
+    to the pools.
+    """
+    session.remove()
+    msfs_session.remove()
+
+
+def detach(objects: Iterable[T]) -> list[T]:
+    """
+    Expunge the objects, and the related objects loaded with them, from
+    the sessions that loaded them. Objects kept in a shared cache are read
+    from any thread, so they must not hold on to a thread's session; their
+    unloaded relationships raise instead of lazy loading.
+    """
+    objects = list(objects)
+    pending = list(objects)
+    while len(pending) != 0:
+        state = inspect(pending.pop())
+        if state.session is None:
+            continue
+        state.session.expunge(state.object)
+        for relationship in state.mapper.relationships:
+            if relationship.key in state.unloaded:
+                continue
+            related = state.dict.get(relationship.key)
+            if related is None:
+                continue
+            if relationship.uselist:
+                pending.extend(related)
+            else:
+                pending.append(related)
+    return objects
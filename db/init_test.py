@@ -0,0 +1,92 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from sqlalchemy import Column, ForeignKey, Integer, create_engine, inspect, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, declarative_base, joinedload, relationship
+from sqlalchemy.orm.exc import DetachedInstanceError
+
+from db.init import create_read_only_engine, create_scoped_session, detach
+
+ModelBase = declarative_base()
+
+
+class Procedure(ModelBase):
+    __tablename__ = 'procedure'
+    procedure_id = Column(Integer, primary_key=True)
+    legs = relationship('ProcedureLeg', back_populates='procedure')
+
+
+class ProcedureLeg(ModelBase):
+    __tablename__ = 'procedure_leg'
+    procedure_leg_id = Column(Integer, primary_key=True)
+    procedure_id = Column(Integer, ForeignKey('procedure.procedure_id'))
+    procedure = relationship('Procedure', back_populates='legs')
+
+
+class TestReadOnlyEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'navdata.sqlite')
+        self.engine = create_read_only_engine(self.path)
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.directory.cleanup()
+
+    def test_pragmas(self):
+        with self.engine.connect() as connection:
+            self.assertEqual(connection.execute(text('PRAGMA query_only')).scalar(), 1)
+            self.assertEqual(connection.execute(text('PRAGMA cache_size')).scalar(), -64 * 1024)
+
+    def test_read_only(self):
+        with self.engine.connect() as connection:
+            with self.assertRaises(OperationalError):
+                connection.execute(text('CREATE TABLE waypoint (waypoint_id INTEGER)'))
+
+    def test_session_per_thread(self):
+        session = create_scoped_session(self.engine)
+        sessions = []
+        thread = threading.Thread(target=lambda: sessions.append(session()))
+        thread.start()
+        thread.join()
+        self.assertIs(session(), session())
+        self.assertIsNot(sessions[0], session())
+        session.remove()
+
+
+class TestDetach(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine('sqlite://')
+        ModelBase.metadata.create_all(self.engine)
+        with Session(self.engine) as db_session:
+            db_session.add(Procedure(procedure_id=1, legs=[
+                ProcedureLeg(procedure_leg_id=1),
+                ProcedureLeg(procedure_leg_id=2),
+            ]))
+            db_session.commit()
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def test_detach_loaded_relationships(self):
+        with Session(self.engine) as db_session:
+            procedures = detach(
+                db_session.query(Procedure).options(joinedload(Procedure.legs)).all()
+            )
+            self.assertEqual(len(db_session.identity_map), 0)
+        procedure = procedures[0]
+        self.assertTrue(inspect(procedure).detached)
+        self.assertEqual([leg.procedure_leg_id for leg in procedure.legs], [1, 2])
+        self.assertTrue(inspect(procedure.legs[0]).detached)
+        # not loaded with them, no session to load it from
+        with self.assertRaises(DetachedInstanceError):
+            procedure.legs[0].procedure
+
+
+if __name__ == '__main__':
+    unittest.main()
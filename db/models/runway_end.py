@@ -2,7 +2,7 @@ from typing import TYPE_CHECKING, Optional
 
 from sqlalchemy import Column, Integer, String, Float
 from sqlalchemy.orm import relationship, Mapped
-from geopy.distance import Distance
+from utils.distance import Distance
 from skspatial.objects import Point, Line, Vector
 
 from db.init import Base
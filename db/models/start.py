@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING
 
-from geopy.distance import Distance
+from utils.distance import Distance
 from sqlalchemy import Column, Integer, String, Float, ForeignKey
 from sqlalchemy.orm import relationship, Mapped
 
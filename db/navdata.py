@@ -0,0 +1,184 @@
+from logging import getLogger
+from typing import Callable, TypeVar
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, scoped_session
+
+from db.init import session, detach
+from db.models import Fix, Waypoint, Vor, Ndb
+from db.snapshot import NavdataSnapshot
+
+logger = getLogger(__name__)
+
+F = TypeVar('F', Waypoint, Vor, Ndb)
+
+# latitude and longitude of the south-west and north-east corners
+BoundingBox = tuple[float, float, float, float]
+
+
+class FixTable:
+    """
+    Fixes of one table keyed by (ident, region), in database order.
+    """
+
+    def __init__(self, model: type[Fix]):
+        self.model = model
+        self.by_ident_region: dict[tuple[str, str], list[Fix]] = {}
+        self.by_ident: dict[str, list[Fix]] = {}
+        # by primary key, detached from the session of the thread loading
+        # them since every thread reads them
+        self.fixes: dict[tuple, Fix] = {}
+
+    def add(self, fix: Fix):
+        identity = tuple(inspect(fix).mapper.primary_key_from_instance(fix))
+        if identity in self.fixes:
+            return
+        detach([fix])
+        self.fixes[identity] = fix
+        self.by_ident_region.setdefault((fix.ident, fix.region), []).append(fix)
+        self.by_ident.setdefault(fix.ident, []).append(fix)
+
+    def clear(self):
+        self.by_ident_region.clear()
+        self.by_ident.clear()
+        self.fixes.clear()
+
+
+class NavdataRepository:
+    """
+    Waypoints, VORs and NDBs kept in memory, so resolving procedure and
+    airway fixes doesn't query the database.
+
+    `load` preloads the fixes of some regions and/or a bounding box, or
+    everything when neither is given. In lazy mode the fixes of a region
+    are loaded on its first lookup, and lookups without a region load the
+    ident once.
+    """
+
+    def __init__(self, db_session: Session | scoped_session = session, lazy: bool = True):
+        self.session = db_session
+        self.lazy = lazy
+        self.tables = {model: FixTable(model) for model in (Waypoint, Ndb, Vor)}
+        self.loaded_regions: set[str] = set()
+        self.loaded_idents: set[str] = set()
+        self.is_fully_loaded = False
+        self._scopes: list[tuple[set[str] | None, BoundingBox | None]] = []
+        self._reload_listeners: list[Callable[[], None]] = []
+        self.snapshot: NavdataSnapshot | None = None
+
+    def use_snapshot(self, snapshot: NavdataSnapshot):
+        """
+        Take the fixes of the snapshot instead of querying their regions.
+        """
+        self.snapshot = snapshot
+        self._load_snapshot()
+
+    def _load_snapshot(self):
+        for model, table in self.tables.items():
+            for fix in self.snapshot.get_fixes(model):
+                table.add(fix)
+        self.loaded_regions.update(self.snapshot.regions)
+
+    def load(self, regions: set[str] | None = None, bbox: BoundingBox | None = None):
+        self._scopes.append((regions, bbox))
+        self._load(regions, bbox)
+
+    def _load(self, regions: set[str] | None, bbox: BoundingBox | None):
+        if regions is not None and bbox is None:
+            regions = regions - self.loaded_regions
+            if len(regions) == 0:
+                return
+        for model, table in self.tables.items():
+            query = self.session.query(model)
+            if regions is not None:
+                query = query.filter(model.region.in_(regions))
+            if bbox is not None:
+                min_latitude, min_longitude, max_latitude, max_longitude = bbox
+                query = query.filter(
+                    model.laty.between(min_latitude, max_latitude),
+                    model.lonx.between(min_longitude, max_longitude),
+                )
+            for fix in query:
+                table.add(fix)
+
+        if bbox is not None:
+            # only part of the regions is loaded
+            return
+        if regions is None:
+            self.is_fully_loaded = True
+        else:
+            self.loaded_regions.update(regions)
+
+    def _ensure_region(self, region: str):
+        if not self.lazy or self.is_fully_loaded or region in self.loaded_regions:
+            return
+        logger.debug('Load navdata of region %s', region)
+        self._load({region}, None)
+
+    def _ensure_ident(self, ident: str):
+        if not self.lazy or self.is_fully_loaded or ident in self.loaded_idents:
+            return
+        for model, table in self.tables.items():
+            for fix in self.session.query(model).filter(model.ident == ident):
+                table.add(fix)
+        self.loaded_idents.add(ident)
+
+    def _get(self, model: type[F], ident: str, region: str | None = None) -> list[F]:
+        if region is None:
+            self._ensure_ident(ident)
+            return self.tables[model].by_ident.get(ident, [])
+        self._ensure_region(region)
+        return self.tables[model].by_ident_region.get((ident, region), [])
+
+    def get_waypoints(self, ident: str, region: str) -> list[Waypoint]:
+        return self._get(Waypoint, ident, region)
+
+    def get_vors(self, ident: str, region: str) -> list[Vor]:
+        return self._get(Vor, ident, region)
+
+    def get_ndbs(self, ident: str, region: str) -> list[Ndb]:
+        return self._get(Ndb, ident, region)
+
+    def get_waypoint_by_id(self, waypoint_id: int) -> Waypoint | None:
+        if self.snapshot is not None:
+            waypoint = self.snapshot.get_waypoint(waypoint_id)
+            if waypoint is not None:
+                return waypoint
+        waypoint = self.tables[Waypoint].fixes.get((waypoint_id,))
+        if waypoint is not None:
+            return waypoint
+        return self.session.get(Waypoint, waypoint_id)
+
+    def get_fix(self, ident: str, region: str | None = None) -> Fix | None:
+        """
+        Prefer waypoints, then NDBs, then VORs.
+        """
+        for model in self.tables:
+            fixes = self._get(model, ident, region)
+            if len(fixes) != 0:
+                return fixes[0]
+        return None
+
+    def on_reload(self, listener: Callable[[], None]):
+        self._reload_listeners.append(listener)
+
+    def reload(self):
+        """
+        Drop every cached fix and load the same scopes again, e.g. after
+        the database is updated.
+        """
+        for table in self.tables.values():
+            table.clear()
+        self.loaded_regions.clear()
+        self.loaded_idents.clear()
+        self.is_fully_loaded = False
+        self.session.expire_all()
+        if self.snapshot is not None:
+            self._load_snapshot()
+        for regions, bbox in self._scopes:
+            self._load(regions, bbox)
+        for listener in self._reload_listeners:
+            listener()
+
+
+navdata = NavdataRepository()
@@ -0,0 +1,114 @@
+import unittest
+
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.orm import Session
+
+from db.models import Waypoint, Vor
+from db.navdata import NavdataRepository
+
+
+def create_session():
+    engine = create_engine('sqlite://')
+    Waypoint.__table__.create(engine)
+    Vor.__table__.create(engine)
+    with engine.begin() as conn:
+        # the bgl_file table referenced by ndb isn't mapped
+        conn.exec_driver_sql(
+            'CREATE TABLE ndb (ndb_id INTEGER PRIMARY KEY, file_id INTEGER, '
+            'airport_id INTEGER, ident VARCHAR(5), region VARCHAR(2), '
+            'airport_ident VARCHAR(4), type VARCHAR(15), name VARCHAR(50), '
+            'frequency INTEGER, range INTEGER, mag_var FLOAT, altitude INTEGER, '
+            'lonx FLOAT, laty FLOAT)'
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO ndb (ndb_id, file_id, ident, region, name, frequency, mag_var, lonx, laty) "
+            "VALUES (1, 1, 'TNN', 'RC', 'TAINAN', 380, 0, 120.2, 22.95)"
+        )
+    db_session = Session(engine)
+    db_session.add_all([
+        Waypoint(waypoint_id=1, ident='BOCCA', region='RC',
+                 laty=24.9, lonx=121.0),
+        Waypoint(waypoint_id=2, ident='BOCCA', region='RJ',
+                 laty=35.0, lonx=139.0),
+        Waypoint(waypoint_id=3, ident='TNN', region='RC',
+                 laty=23.0, lonx=120.2),
+        Vor(vor_id=1, ident='TNN', region='RC', laty=22.95, lonx=120.2),
+        Vor(vor_id=2, ident='APU', region='RC', laty=22.5, lonx=120.5),
+    ])
+    db_session.commit()
+    return engine, db_session
+
+
+class TestNavdataRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.engine, self.session = create_session()
+        self.queries = 0
+
+        def count_query(*args):
+            self.queries += 1
+        event.listen(self.engine, 'before_cursor_execute', count_query)
+
+    def test_lookup_preloaded_region_without_query(self):
+        navdata = NavdataRepository(self.session, lazy=False)
+        navdata.load({'RC'})
+        self.queries = 0
+        self.assertEqual(
+            [w.waypoint_id for w in navdata.get_waypoints('BOCCA', 'RC')], [1])
+        self.assertEqual(
+            [v.vor_id for v in navdata.get_vors('TNN', 'RC')], [1])
+        self.assertEqual(
+            [n.ndb_id for n in navdata.get_ndbs('TNN', 'RC')], [1])
+        self.assertEqual(navdata.get_waypoints('BOCCA', 'RJ'), [])
+        self.assertEqual(self.queries, 0)
+
+    def test_lazy_region_loading(self):
+        navdata = NavdataRepository(self.session)
+        self.assertEqual(
+            [w.waypoint_id for w in navdata.get_waypoints('BOCCA', 'RJ')], [2])
+        queries = self.queries
+        navdata.get_waypoints('BOCCA', 'RJ')
+        navdata.get_vors('BOCCA', 'RJ')
+        self.assertEqual(self.queries, queries)
+        self.assertEqual(navdata.loaded_regions, {'RJ'})
+
+    def test_bbox_loading(self):
+        navdata = NavdataRepository(self.session, lazy=False)
+        navdata.load(bbox=(20, 118, 27, 123))
+        self.assertEqual(
+            [w.waypoint_id for w in navdata.get_waypoints('BOCCA', 'RC')], [1])
+        self.assertEqual(navdata.get_waypoints('BOCCA', 'RJ'), [])
+
+    def test_get_fix_prefers_waypoint(self):
+        navdata = NavdataRepository(self.session)
+        fix = navdata.get_fix('TNN', 'RC')
+        self.assertIsInstance(fix, Waypoint)
+        fix = navdata.get_fix('APU')
+        self.assertIsInstance(fix, Vor)
+        self.assertIsNone(navdata.get_fix('XXXXX'))
+
+    def test_fixes_detached(self):
+        navdata = NavdataRepository(self.session, lazy=False)
+        navdata.load({'RC'})
+        waypoint = navdata.get_waypoints('BOCCA', 'RC')[0]
+        self.assertTrue(inspect(waypoint).detached)
+        self.queries = 0
+        self.assertIs(navdata.get_waypoint_by_id(1), waypoint)
+        self.assertEqual(self.queries, 0)
+
+    def test_reload(self):
+        navdata = NavdataRepository(self.session, lazy=False)
+        navdata.load({'RC'})
+        reloaded = []
+        navdata.on_reload(lambda: reloaded.append(True))
+        self.session.add(
+            Waypoint(waypoint_id=4, ident='NEWFX', region='RC', laty=24.0, lonx=121.0))
+        self.session.commit()
+        self.assertEqual(navdata.get_waypoints('NEWFX', 'RC'), [])
+        navdata.reload()
+        self.assertEqual(len(navdata.get_waypoints('NEWFX', 'RC')), 1)
+        self.assertEqual(reloaded, [True])
+
+
+if __name__ == '__main__':
+    unittest.main()
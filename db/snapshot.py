@@ -0,0 +1,372 @@
+"""
+Compact binary snapshot of the navdata used by the server, built offline
+from the Little Navmap databases and opened with mmap at startup.
+
+    python -m db.snapshot navdata.snapshot 'RC*'
+
+The file is a header, a directory of sections and the sections. Every
+table is a section of fixed size little-endian records. Strings are
+indexes into a shared string section, missing integers are INT_NONE and
+missing floats are NaN. Airport ground tables are sorted by airport, with
+an index section to decode the rows of one airport only.
+"""
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+from logging import getLogger
+from typing import Any
+
+from sqlalchemy import Float, Integer, or_
+from sqlalchemy.orm import Session, scoped_session
+
+from db.models import Airport, Airway, Ndb, Parking, Start, TaxiPath, Vor, Waypoint
+
+logger = getLogger(__name__)
+
+SNAPSHOT_PATH = 'navdata.snapshot'
+
+MAGIC = b'NAVSNAP\0'
+VERSION = 1
+# magic, version, number of sections
+HEADER = struct.Struct('<8sII')
+# name, offset, size, number of records
+SECTION = struct.Struct('<16sQQI')
+# airport_id, first record, number of records
+AIRPORT_INDEX = struct.Struct('<qII')
+
+INT_NONE = -(2 ** 63)
+STRING_NONE = 0xFFFFFFFF
+
+FIX_COLUMNS = ('ident', 'region', 'airport_ident', 'type', 'lonx', 'laty')
+
+
+class SnapshotTable:
+    """
+    Layout of the records of a table, a subset of the columns of a model.
+    """
+
+    def __init__(self, name: str, model: type, columns: tuple[str, ...]):
+        self.name = name
+        self.model = model
+        self.columns = columns
+        self.kinds = []
+        for column in columns:
+            column_type = model.__table__.c[column].type
+            if isinstance(column_type, Integer):
+                self.kinds.append('i')
+            elif isinstance(column_type, Float):
+                self.kinds.append('f')
+            else:
+                self.kinds.append('s')
+        self.record = struct.Struct(
+            '<' + ''.join({'i': 'q', 'f': 'd', 's': 'I'}[k] for k in self.kinds))
+
+    def encode(self, row, strings: 'StringPool') -> bytes:
+        values = []
+        for column, kind in zip(self.columns, self.kinds):
+            value = getattr(row, column)
+            if kind == 'i':
+                values.append(INT_NONE if value is None else value)
+            elif kind == 'f':
+                values.append(math.nan if value is None else value)
+            else:
+                values.append(strings.add(value))
+        return self.record.pack(*values)
+
+    def decode(self, data, strings: list[str]) -> list[dict[str, Any]]:
+        rows = []
+        for values in self.record.iter_unpack(data):
+            row = {}
+            for column, kind, value in zip(self.columns, self.kinds, values):
+                if kind == 'i':
+                    row[column] = None if value == INT_NONE else value
+                elif kind == 'f':
+                    row[column] = None if math.isnan(value) else value
+                else:
+                    row[column] = None if value == STRING_NONE else strings[value]
+            rows.append(row)
+        return rows
+
+
+WAYPOINT_TABLE = SnapshotTable('waypoint', Waypoint, (
+    'waypoint_id', 'airport_id', 'arinc_type', 'num_victor_airway',
+    'num_jet_airway', 'mag_var') + FIX_COLUMNS)
+VOR_TABLE = SnapshotTable('vor', Vor, (
+    'vor_id', 'airport_id', 'name', 'frequency', 'channel', 'range', 'mag_var',
+    'dme_only', 'dme_altitude', 'dme_lonx', 'dme_laty', 'altitude') + FIX_COLUMNS)
+NDB_TABLE = SnapshotTable('ndb', Ndb, (
+    'ndb_id', 'file_id', 'airport_id', 'name', 'frequency', 'range', 'mag_var',
+    'altitude') + FIX_COLUMNS)
+AIRWAY_TABLE = SnapshotTable('airway', Airway, (
+    'airway_id', 'airway_name', 'airway_type', 'airway_fragment_no',
+    'sequence_no', 'from_waypoint_id', 'to_waypoint_id', 'direction',
+    'from_lonx', 'from_laty', 'to_lonx', 'to_laty'))
+AIRPORT_TABLE = SnapshotTable('airport', Airport, ('airport_id', 'ident'))
+TAXI_PATH_TABLE = SnapshotTable('taxi_path', TaxiPath, (
+    'taxi_path_id', 'airport_id', 'type', 'surface', 'width', 'name',
+    'start_type', 'start_dir', 'start_lonx', 'start_laty',
+    'end_type', 'end_dir', 'end_lonx', 'end_laty'))
+PARKING_TABLE = SnapshotTable('parking', Parking, (
+    'parking_id', 'airport_id', 'type', 'pushback', 'name', 'number', 'suffix',
+    'airline_codes', 'radius', 'heading', 'has_jetway', 'lonx', 'laty'))
+START_TABLE = SnapshotTable('start', Start, (
+    'start_id', 'airport_id', 'runway_end_id', 'runway_name', 'type',
+    'heading', 'number', 'altitude', 'lonx', 'laty'))
+
+FIX_TABLES = (WAYPOINT_TABLE, VOR_TABLE, NDB_TABLE)
+GROUND_TABLES = {table.model: table for table in (TAXI_PATH_TABLE, PARKING_TABLE, START_TABLE)}
+
+
+class StringPool:
+    def __init__(self):
+        self.indexes: dict[str, int] = {}
+
+    def add(self, value: str | None) -> int:
+        if value is None:
+            return STRING_NONE
+        return self.indexes.setdefault(value, len(self.indexes))
+
+    def encode(self) -> bytes:
+        blobs = [value.encode() for value in self.indexes]
+        offsets = [0]
+        for blob in blobs:
+            offsets.append(offsets[-1] + len(blob))
+        return struct.pack(f'<{len(offsets)}I', *offsets) + b''.join(blobs)
+
+
+def decode_strings(data, count: int) -> list[str]:
+    offsets = struct.unpack_from(f'<{count + 1}I', data)
+    blob = bytes(data[(count + 1) * 4:])
+    return [blob[offsets[i]:offsets[i + 1]].decode() for i in range(count)]
+
+
+def region_filter(column, patterns: list[str]):
+    """
+    Match region codes against glob patterns like `RC*`.
+    """
+    return or_(*(column.like(p.replace('*', '%').replace('?', '_')) for p in patterns))
+
+
+class SnapshotBuilder:
+    def __init__(
+        self,
+        patterns: list[str],
+        navigraph_session: Session | scoped_session,
+        msfs_session: Session | scoped_session
+    ):
+        self.patterns = patterns
+        self.navigraph_session = navigraph_session
+        self.msfs_session = msfs_session
+        self.strings = StringPool()
+        self.sections: list[tuple[str, bytes, int]] = []
+
+    def _add_table(self, table: SnapshotTable, rows: list):
+        data = b''.join(table.encode(row, self.strings) for row in rows)
+        self.sections.append((table.name, data, len(rows)))
+
+    def _add_ground_table(self, table: SnapshotTable, rows: list):
+        rows = sorted(rows, key=lambda row: (row.airport_id, getattr(row, table.columns[0])))
+        index: list[tuple[int, int, int]] = []
+        for i, row in enumerate(rows):
+            if len(index) != 0 and index[-1][0] == row.airport_id:
+                airport_id, first, count = index[-1]
+                index[-1] = (airport_id, first, count + 1)
+            else:
+                index.append((row.airport_id, i, 1))
+        self._add_table(table, rows)
+        self.sections.append((
+            f'{table.name}.index',
+            b''.join(AIRPORT_INDEX.pack(*entry) for entry in index),
+            len(index)
+        ))
+
+    def build(self, path: str):
+        regions: set[str] = set()
+        waypoints: dict[int, Waypoint] = {}
+        for table in FIX_TABLES:
+            fixes = self.navigraph_session.query(table.model).filter(
+                region_filter(table.model.region, self.patterns)).all()
+            regions.update(fix.region for fix in fixes)
+            if table is WAYPOINT_TABLE:
+                waypoints = {w.waypoint_id: w for w in fixes}
+            else:
+                self._add_table(table, fixes)
+
+        # whole airways touching the regions, with their waypoints in other
+        # regions
+        airway_names = [name for name, in self.navigraph_session.query(
+            Airway.airway_name
+        ).join(
+            Waypoint, or_(
+                Airway.from_waypoint_id == Waypoint.waypoint_id,
+                Airway.to_waypoint_id == Waypoint.waypoint_id
+            )
+        ).filter(
+            region_filter(Waypoint.region, self.patterns)
+        ).distinct()]
+        airways = self.navigraph_session.query(Airway).filter(
+            Airway.airway_name.in_(airway_names)
+        ).order_by(
+            Airway.airway_name,
+            Airway.airway_fragment_no,
+            Airway.sequence_no
+        ).all()
+        missing_ids = {a.from_waypoint_id for a in airways} | \
+            {a.to_waypoint_id for a in airways}
+        missing_ids -= waypoints.keys()
+        if len(missing_ids) != 0:
+            for waypoint in self.navigraph_session.query(Waypoint).filter(
+                Waypoint.waypoint_id.in_(missing_ids)
+            ):
+                waypoints[waypoint.waypoint_id] = waypoint
+        self._add_table(WAYPOINT_TABLE, list(waypoints.values()))
+        self._add_table(AIRWAY_TABLE, airways)
+
+        airports = self.msfs_session.query(Airport.airport_id, Airport.ident).filter(
+            region_filter(Airport.region, self.patterns)).all()
+        airport_ids = [airport.airport_id for airport in airports]
+        self._add_table(AIRPORT_TABLE, airports)
+        for model, table in GROUND_TABLES.items():
+            self._add_ground_table(table, self.msfs_session.query(model).filter(
+                model.airport_id.in_(airport_ids)).all())
+
+        meta = json.dumps({
+            'patterns': self.patterns,
+            'regions': sorted(regions),
+            'built': int(time.time()),
+        }).encode()
+        self.sections.insert(0, ('meta', meta, 1))
+        self.sections.insert(1, ('strings', self.strings.encode(), len(self.strings.indexes)))
+        self._write(path)
+
+    def _write(self, path: str):
+        offset = HEADER.size + SECTION.size * len(self.sections)
+        directory = []
+        for name, data, count in self.sections:
+            directory.append(SECTION.pack(name.encode(), offset, len(data), count))
+            offset += len(data)
+
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(self.sections)))
+            f.write(b''.join(directory))
+            for _, data, _ in self.sections:
+                f.write(data)
+        os.replace(tmp_path, path)
+
+
+class NavdataSnapshot:
+    """
+    Read side of a snapshot. Fix tables are decoded on first use, ground
+    tables one airport at a time. Rows are returned as transient model
+    objects, not attached to any session.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        magic, version, section_count = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError('Not a navdata snapshot')
+        if version != VERSION:
+            raise ValueError(f'Unsupported navdata snapshot version {version}')
+
+        self.sections: dict[str, tuple[int, int, int]] = {}
+        for i in range(section_count):
+            name, offset, size, count = SECTION.unpack_from(
+                data, HEADER.size + SECTION.size * i)
+            self.sections[name.rstrip(b'\0').decode()] = (offset, size, count)
+
+        meta = json.loads(bytes(self._section('meta')))
+        self.patterns: list[str] = meta['patterns']
+        self.regions: set[str] = set(meta['regions'])
+        _, _, string_count = self.sections['strings']
+        self.strings = decode_strings(self._section('strings'), string_count)
+
+        self._fixes: dict[type, list] = {}
+        self._waypoints_by_id: dict[int, Waypoint] | None = None
+        self._airways: dict[str, list[tuple]] | None = None
+        self.airport_ids = {
+            row['airport_id'] for row in AIRPORT_TABLE.decode(self._section('airport'), self.strings)}
+        self._airport_indexes: dict[str, dict[int, tuple[int, int]]] = {}
+
+    @classmethod
+    def open(cls, path: str):
+        with open(path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        snapshot = cls(memoryview(data))
+        logger.info('Open navdata snapshot %s of %s', path, ', '.join(snapshot.patterns))
+        return snapshot
+
+    def _section(self, name: str):
+        offset, size, _ = self.sections[name]
+        return self.data[offset:offset + size]
+
+    def get_fixes(self, model: type) -> list:
+        fixes = self._fixes.get(model)
+        if fixes is None:
+            table = next(t for t in FIX_TABLES if t.model is model)
+            fixes = [model(**row) for row in table.decode(self._section(table.name), self.strings)]
+            self._fixes[model] = fixes
+        return fixes
+
+    def get_waypoint(self, waypoint_id: int) -> Waypoint | None:
+        if self._waypoints_by_id is None:
+            self._waypoints_by_id = {w.waypoint_id: w for w in self.get_fixes(Waypoint)}
+        return self._waypoints_by_id.get(waypoint_id)
+
+    def get_airway_rows(self, airway_name: str) -> list[tuple] | None:
+        """
+        Segments of an airway in the row format of `AirwayIndex`, or None
+        when the airway isn't in the snapshot.
+        """
+        if self._airways is None:
+            self._airways = {}
+            for row in AIRWAY_TABLE.decode(self._section('airway'), self.strings):
+                from_waypoint = self.get_waypoint(row['from_waypoint_id'])
+                to_waypoint = self.get_waypoint(row['to_waypoint_id'])
+                if from_waypoint is None or to_waypoint is None:
+                    # dropped like the inner joins of the database query do
+                    continue
+                self._airways.setdefault(row['airway_name'], []).append((
+                    row['airway_name'], row['airway_fragment_no'], row['direction'],
+                    row['from_waypoint_id'], from_waypoint.ident, row['from_laty'], row['from_lonx'],
+                    row['to_waypoint_id'], to_waypoint.ident, row['to_laty'], row['to_lonx'],
+                ))
+        return self._airways.get(airway_name)
+
+    def get_airport_rows(self, model: type, airport_id: int) -> list | None:
+        """
+        Taxi paths, parkings or starts of an airport, or None when the
+        airport isn't in the snapshot.
+        """
+        if airport_id not in self.airport_ids:
+            return None
+        table = GROUND_TABLES[model]
+        index = self._airport_indexes.get(table.name)
+        if index is None:
+            index = {
+                airport_id: (first, count)
+                for airport_id, first, count in AIRPORT_INDEX.iter_unpack(
+                    self._section(f'{table.name}.index'))
+            }
+            self._airport_indexes[table.name] = index
+        first, count = index.get(airport_id, (0, 0))
+        start = first * table.record.size
+        data = self._section(table.name)[start:start + count * table.record.size]
+        return [model(**row) for row in table.decode(data, self.strings)]
+
+
+def main(path: str = SNAPSHOT_PATH, *patterns: str):
+    from db.init import session, msfs_session
+
+    started = time.perf_counter()
+    SnapshotBuilder(list(patterns) or ['*'], session, msfs_session).build(path)
+    print(f'Built {path} in {time.perf_counter() - started:.1f}s')
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
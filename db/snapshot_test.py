@@ -0,0 +1,152 @@
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from db.models import Airway, Parking, Start, TaxiPath, Vor, Waypoint
+from db.navdata import NavdataRepository
+from db.snapshot import NavdataSnapshot, SnapshotBuilder
+
+
+def create_navigraph_session():
+    engine = create_engine('sqlite://')
+    Waypoint.__table__.create(engine)
+    Vor.__table__.create(engine)
+    Airway.__table__.create(engine)
+    with engine.begin() as conn:
+        # the bgl_file table referenced by ndb isn't mapped
+        conn.exec_driver_sql(
+            'CREATE TABLE ndb (ndb_id INTEGER PRIMARY KEY, file_id INTEGER, '
+            'airport_id INTEGER, ident VARCHAR(5), region VARCHAR(2), '
+            'airport_ident VARCHAR(4), type VARCHAR(15), name VARCHAR(50), '
+            'frequency INTEGER, range INTEGER, mag_var FLOAT, altitude INTEGER, '
+            'lonx FLOAT, laty FLOAT)'
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO ndb (ndb_id, file_id, ident, region, name, frequency, mag_var, lonx, laty) "
+            "VALUES (1, 1, 'TNN', 'RC', 'TAINAN', 380, 0, 120.2, 22.95)"
+        )
+    db_session = Session(engine)
+    db_session.add_all([
+        Waypoint(waypoint_id=1, ident='BOCCA', region='RC', laty=24.9, lonx=121.0),
+        Waypoint(waypoint_id=2, ident='BOCCA', region='RJ', laty=35.0, lonx=139.0),
+        Waypoint(waypoint_id=3, ident='SALMI', region='RP', laty=20.0, lonx=121.0),
+        Vor(vor_id=1, ident='TNN', region='RC', name='TAINAN', laty=22.95, lonx=120.2),
+        Vor(vor_id=2, ident='OLE', region='RJ', laty=35.0, lonx=139.0),
+    ])
+    db_session.add(Airway(
+        airway_id=1, airway_name='M646', airway_type='J', airway_fragment_no=1,
+        sequence_no=1, direction='N', from_waypoint_id=1, to_waypoint_id=3,
+        from_laty=24.9, from_lonx=121.0, to_laty=20.0, to_lonx=121.0,
+        left_lonx=121.0, right_lonx=121.0, top_laty=24.9, bottom_laty=20.0,
+    ))
+    # the waypoint at the end of the segment is missing
+    db_session.add(Airway(
+        airway_id=2, airway_name='B591', airway_type='J', airway_fragment_no=1,
+        sequence_no=1, direction='N', from_waypoint_id=1, to_waypoint_id=99,
+        from_laty=24.9, from_lonx=121.0, to_laty=26.0, to_lonx=122.0,
+        left_lonx=121.0, right_lonx=122.0, top_laty=26.0, bottom_laty=24.9,
+    ))
+    db_session.commit()
+    return db_session
+
+
+def create_msfs_session():
+    engine = create_engine('sqlite://')
+    TaxiPath.__table__.create(engine)
+    Parking.__table__.create(engine)
+    Start.__table__.create(engine)
+    with engine.begin() as conn:
+        # only the columns used to select airports
+        conn.exec_driver_sql(
+            'CREATE TABLE airport (airport_id INTEGER PRIMARY KEY, '
+            'ident VARCHAR(10), region VARCHAR(4))'
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO airport VALUES (1, 'RCTP', 'RC'), (2, 'RCSS', 'RC'), (3, 'RJAA', 'RJ')"
+        )
+    db_session = Session(engine)
+    for airport_id in (1, 3):
+        db_session.add_all([
+            TaxiPath(
+                taxi_path_id=airport_id * 10 + i, airport_id=airport_id, name='N',
+                width=20.0, is_draw_surface=1, is_draw_detail=1, start_type='N',
+                start_laty=25.0, start_lonx=121.0 + i * 0.001,
+                end_type='HSND', end_laty=25.0, end_lonx=121.0 + (i + 1) * 0.001,
+            ) for i in range(3)
+        ])
+        db_session.add(Parking(
+            parking_id=airport_id, airport_id=airport_id, type='GM', name='NONE',
+            number=airport_id, has_jetway=0, laty=25.0, lonx=121.0,
+        ))
+    db_session.add(Start(
+        start_id=1, airport_id=1, runway_name='05L', heading=53.0,
+        altitude=106, laty=25.0, lonx=121.0,
+    ))
+    db_session.commit()
+    return db_session
+
+
+class TestNavdataSnapshot(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.directory.name, 'navdata.snapshot')
+        SnapshotBuilder(['RC*'], create_navigraph_session(), create_msfs_session()).build(cls.path)
+        cls.snapshot = NavdataSnapshot.open(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.snapshot.data.release()
+        cls.directory.cleanup()
+
+    def test_regions(self):
+        self.assertEqual(self.snapshot.regions, {'RC'})
+        self.assertEqual(
+            [(v.vor_id, v.ident, v.name) for v in self.snapshot.get_fixes(Vor)],
+            [(1, 'TNN', 'TAINAN')]
+        )
+
+    def test_airway_waypoints_of_other_regions(self):
+        self.assertEqual(
+            sorted(w.waypoint_id for w in self.snapshot.get_fixes(Waypoint)), [1, 3])
+        self.assertEqual(
+            self.snapshot.get_airway_rows('M646'),
+            [('M646', 1, 'N', 1, 'BOCCA', 24.9, 121.0, 3, 'SALMI', 20.0, 121.0)]
+        )
+        self.assertIsNone(self.snapshot.get_airway_rows('A1'))
+
+    def test_airway_rows_without_waypoint(self):
+        self.assertIsNone(self.snapshot.get_airway_rows('B591'))
+
+    def test_airport_rows(self):
+        taxi_paths = self.snapshot.get_airport_rows(TaxiPath, 1)
+        self.assertEqual([t.taxi_path_id for t in taxi_paths], [10, 11, 12])
+        self.assertEqual(taxi_paths[0].end_type, 'HSND')
+        self.assertIsNone(taxi_paths[0].type)
+        self.assertEqual(self.snapshot.get_airport_rows(Start, 1)[0].runway_name, '05L')
+        self.assertEqual(self.snapshot.get_airport_rows(Parking, 1)[0].full_name, '1')
+        # in the regions but without ground data
+        self.assertEqual(self.snapshot.get_airport_rows(TaxiPath, 2), [])
+        # not in the regions
+        self.assertIsNone(self.snapshot.get_airport_rows(TaxiPath, 3))
+
+    def test_navdata_without_query(self):
+        db_session = create_navigraph_session()
+        queries = []
+        event.listen(db_session.get_bind(), 'before_cursor_execute',
+                     lambda *args: queries.append(args))
+        navdata = NavdataRepository(db_session)
+        navdata.use_snapshot(self.snapshot)
+        navdata.load({'RC'})
+        self.assertEqual([w.waypoint_id for w in navdata.get_waypoints('BOCCA', 'RC')], [1])
+        self.assertEqual(navdata.get_fix('TNN', 'RC').ndb_id, 1)
+        self.assertEqual(navdata.get_waypoint_by_id(3).ident, 'SALMI')
+        self.assertEqual(queries, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
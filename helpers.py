@@ -1,23 +1,20 @@
 from datetime import timedelta
-from typing import Literal
-import struct
 
-from geopy.distance import Distance
+from utils.distance import Distance
 from sqlalchemy import or_, and_
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, selectinload
 
 from db.init import session, msfs_session
+from db.navdata import navdata
+from db.airways import airway_index
 from db.models import (
     Airport,
-    Airway,
     Approach,
     ProcedureLeg,
     Fix,
-    Waypoint,
-    Vor,
-    Ndb,
     Runway,
     RunwayEnd,
+    Transition,
     TransitionLeg,
     Parking,
     TaxiPath,
@@ -31,11 +28,15 @@ from messages.Position import Position
 
 
 def get_waypoints_by_ident_n_region(ident: str, region: str):
-    return session.query(Waypoint).filter(Waypoint.ident == ident, Waypoint.region == region).all()
+    return navdata.get_waypoints(ident, region)
 
 
 def get_vors_by_ident_n_region(ident: str, region: str):
-    return session.query(Vor).filter(Vor.ident == ident, Vor.region == region).all()
+    return navdata.get_vors(ident, region)
+
+
+def get_ndbs_by_ident_n_region(ident: str, region: str):
+    return navdata.get_ndbs(ident, region)
 
 
 def get_runway_end_by_airport_n_runway(dep_airport: str, dep_runway: str):
@@ -54,28 +55,7 @@ def get_runway_end_by_airport_n_runway(dep_airport: str, dep_runway: str):
 
 
 def get_fix_by_ident(ident: str, region: str | None = None) -> Fix | None:
-    _query = session.query(Waypoint).filter(Waypoint.ident == ident)
-    if (region is not None):
-        _query = _query.filter(Waypoint.region == region)
-    waypoint: Waypoint | None = _query.first()
-    if waypoint is not None:
-        return waypoint
-
-    _query = session.query(Ndb).filter(Ndb.ident == ident)
-    if (region is not None):
-        _query = _query.filter(Ndb.region == region)
-    ndb: Ndb | None = _query.first()
-    if ndb is not None:
-        return ndb
-
-    _query = session.query(Vor).filter(Vor.ident == ident)
-    if (region is not None):
-        _query = _query.filter(Vor.region == region)
-    vor: Vor | None = _query.first()
-    if vor is not None:
-        return vor
-
-    return None
+    return navdata.get_fix(ident, region)
 
 
 def fill_position_on_legs(procedure_legs: list[ProcedureLeg], airport_ident: str | None = None):
@@ -83,7 +63,8 @@ def fill_position_on_legs(procedure_legs: list[ProcedureLeg], airport_ident: str
     params:
         procedure_legs: list[ProcedureLeg]
         airport_ident: str | None
-    The approach legs in diffent data source, fix_airport_ident may be null
+    The approach legs in diffent data source, fix_airport_ident may be null.
+    The procedure legs are not modified.
     """
     legs: list[Leg] = []
     for pl in procedure_legs:
@@ -94,17 +75,19 @@ def fill_position_on_legs(procedure_legs: list[ProcedureLeg], airport_ident: str
                 airport_ident or pl.fix_airport_ident,
                 runway_end_name
             )
-            pl.fix_lonx = runway_end.lonx
-            pl.fix_laty = runway_end.laty
-            legs.append(Leg.from_procedure_leg(pl))
+            legs.append(Leg.from_procedure_leg(
+                pl,
+                laty=runway_end.laty,
+                lonx=runway_end.lonx
+            ))
         else:
             fix = get_fix_by_ident(pl.fix_ident, pl.fix_region)
-            if fix is not None:
-                pl.fix_lonx = fix.lonx
-                pl.fix_laty = fix.laty
-            leg = Leg.from_procedure_leg(pl)
-            leg.fix = fix
-            legs.append(leg)
+            legs.append(Leg.from_procedure_leg(
+                pl,
+                fix,
+                laty=None if fix is None else fix.laty,
+                lonx=None if fix is None else fix.lonx
+            ))
 
     return legs
 
@@ -129,9 +112,19 @@ def get_sid_legs(dep_airport: str, dep_runway: str, sid: str):
     return fill_position_on_legs(approach.approach_legs)
 
 
+# everything read from a procedure, which may be detached from the session
+# once loaded
+PROCEDURE_OPTIONS = (
+    joinedload(Approach.approach_legs),
+    selectinload(Approach.transitions).selectinload(Transition.transition_legs),
+    joinedload(Approach.runway_end).joinedload(RunwayEnd.ils),
+    joinedload(Approach.runway_end).joinedload(RunwayEnd.start),
+)
+
+
 def get_approach_by_id(approach_id: int):
     return session.query(Approach).options(
-        joinedload(Approach.runway_end)
+        *PROCEDURE_OPTIONS
     ).filter(Approach.approach_id == approach_id).first()
 
 
@@ -151,7 +144,7 @@ def get_sid_approaches_by_airport_ident_n_approach_name(airport_ident: str, appr
 
 
 def get_sid_approaches_by_airport_ident(airport_ident: str) -> list[Approach]:
-    return session.query(Approach).options(joinedload(Approach.approach_legs)).filter(
+    return session.query(Approach).options(*PROCEDURE_OPTIONS).filter(
         Approach.airport_ident == airport_ident,
         Approach.suffix == 'D'
     ).all()
@@ -166,14 +159,14 @@ def get_star_approaches_by_airport_ident_n_approach_name(airport_ident: str, app
 
 
 def get_star_approaches_by_airport_ident(airport_ident: str) -> list[Approach]:
-    return session.query(Approach).options(joinedload(Approach.approach_legs)).filter(
+    return session.query(Approach).options(*PROCEDURE_OPTIONS).filter(
         Approach.airport_ident == airport_ident,
         Approach.suffix == 'A'
     ).all()
 
 
 def get_approach_approaches_by_airport_ident(airport_ident: str):
-    return session.query(Approach).options(joinedload(Approach.approach_legs)).filter(
+    return session.query(Approach).options(*PROCEDURE_OPTIONS).filter(
         Approach.airport_ident == airport_ident,
         or_(Approach.suffix == None, Approach.suffix == '')
     ).all()
@@ -215,73 +208,21 @@ def get_app_legs(arr_airport: str, app_name: str, transition_name: str | None =
     return not_missed_legs, missed_legs
 
 
-def get_all_airways(airway_name: str, fix: Waypoint) -> list[Airway]:
-    airway = session.query(Airway).options(
-        joinedload(Airway.from_waypoint),
-        joinedload(Airway.to_waypoint)
-    ).filter(
-        Airway.airway_name == airway_name,
-        or_(
-            Airway.from_waypoint_id == fix.waypoint_id,
-            Airway.to_waypoint_id == fix.waypoint_id
+def get_airway_legs_between_fixs(airway: str, from_fix: Fix, to_fix_name: str) -> list[Leg]:
+    """
+    Legs of the waypoints along the airway, including both fixes.
+    """
+    fragment, indexes = airway_index.get_waypoints_between(
+        airway, from_fix, to_fix_name)
+    return [
+        Leg(
+            ident=fragment.idents[i],
+            laty=fragment.latys[i],
+            lonx=fragment.lonxs[i],
+            fix=navdata.get_waypoint_by_id(fragment.waypoint_ids[i])
         )
-    ).first()
-    if airway is None:
-        return []
-    airways = session.query(Airway).filter(
-        Airway.airway_name == airway_name,
-        Airway.airway_fragment_no == airway.airway_fragment_no,
-    ).order_by(Airway.sequence_no).all()
-    return airways
-
-
-def filter_airways_by_from_to(
-    airways: list[Airway],
-    direction: Literal['F', 'B'],
-    from_fix: Waypoint,
-    to_fix_name: str
-) -> list[Airway] | None:
-    airway_range: list[Airway] = []
-    for a in (airways if direction == 'F' else reversed(airways)):
-        if len(airway_range) == 0:
-            # if a.direction != direction and a.direction != 'N':  # invalid direction
-            #     return None
-            if (
-                # forward or both
-                (a.direction != 'B' and a.from_waypoint_id == from_fix.waypoint_id) or
-                # backward or both
-                (a.direction != 'F' and a.to_waypoint_id == from_fix.waypoint_id)
-            ):
-                airway_range.append(a)
-        else:
-            airway_range.append(a)
-            if (
-                # forward or both
-                (a.direction != 'B' and a.to_waypoint.ident == to_fix_name) or
-                # backward or both
-                (a.direction != 'F' and a.from_waypoint.ident == to_fix_name)
-            ):
-                return airway_range
-    return None
-
-
-def get_airways_between_fixs(airway: str, from_fix: Waypoint, to_fix_name: str) -> list[Airway]:
-    airways = get_all_airways(airway, from_fix)
-    forward_airways = filter_airways_by_from_to(
-        airways, 'F', from_fix, to_fix_name)
-    if forward_airways is not None:
-        return forward_airways
-
-    backward_airways = filter_airways_by_from_to(
-        airways, 'B', from_fix, to_fix_name)
-    if backward_airways is not None:
-        return backward_airways
-
-    return []
-
-
-def airways_to_legs(airways: list[Airway]):
-    return [Leg.from_airway(a) for a in airways]
+        for i in indexes
+    ]
 
 
 # ex. 121.800 -> @21800
@@ -328,12 +269,11 @@ def get_legs_by_route_str(route_str: str):
     while len(items) != 0:
         airway_name = items.pop(0)
         to_fix_name = items.pop(0)
-        new_airways = get_airways_between_fixs(
+        new_legs = get_airway_legs_between_fixs(
             airway_name,
             legs[-1].fix,
             to_fix_name
         )
-        new_legs = airways_to_legs(new_airways)
         extended_legs = new_legs[1:]
         legs.extend(extended_legs)
 
@@ -422,10 +362,33 @@ def get_taxi_positions_by_airport_id_n_taxi_path_names(airport_id: int, taxi_pat
     ).all()
 
 
+def get_snapshot_rows_by_airport_id(model, airport_id: int):
+    if navdata.snapshot is None:
+        return None
+    return navdata.snapshot.get_airport_rows(model, airport_id)
+
+
 def get_taxt_paths_by_airport_id(airport_id: int) -> list[TaxiPath]:
+    taxi_paths = get_snapshot_rows_by_airport_id(TaxiPath, airport_id)
+    if taxi_paths is not None:
+        return taxi_paths
     return msfs_session.query(TaxiPath).filter(TaxiPath.airport_id == airport_id).all()
 
 
+def get_parkings_by_airport_id(airport_id: int) -> list[Parking]:
+    parkings = get_snapshot_rows_by_airport_id(Parking, airport_id)
+    if parkings is not None:
+        return parkings
+    return msfs_session.query(Parking).filter(Parking.airport_id == airport_id).all()
+
+
+def get_starts_by_airport_id(airport_id: int) -> list[Start]:
+    starts = get_snapshot_rows_by_airport_id(Start, airport_id)
+    if starts is not None:
+        return starts
+    return msfs_session.query(Start).filter(Start.airport_id == airport_id).all()
+
+
 def get_taxt_paths_by_parking_id(parking_id: int):
     return msfs_session.query(TaxiPath).join(
         Parking,
@@ -514,21 +477,11 @@ def get_taxi_path_endpoint_by_airport_id(airport_id: int):
     return msfs_session.query(TaxiPath).filter(TaxiPath.airport_id == airport_id).all()
 
 
-mag_var_table = None
-
-
-def get_mag_var_table():
-    global mag_var_table
-    if mag_var_table is not None:
-        return mag_var_table
-
+def get_mag_var_data() -> bytes | None:
     mag_decl = session.query(MagDecl).first()
     if mag_decl is None:
         return None
-
-    num_values_bytes = mag_decl.mag_var[:4]
-    num_values = struct.unpack('>I', num_values_bytes)[0]
-    return struct.unpack('>' + 'f' * num_values, mag_decl.mag_var[4:])
+    return mag_decl.mag_var
 
 
 def get_ils_by_ident_n_region(ident: str, region: str):
@@ -15,9 +15,17 @@ async def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--ssl-key', dest='key', default=None)
     parser.add_argument('--ssl-cert', dest='cert', default=None)
+    parser.add_argument(
+        '--shards',
+        type=int,
+        default=0,
+        help='simulate the bots in this number of worker processes'
+    )
     args = parser.parse_args()
 
     fsd_server = training_server
+    if args.shards > 1:
+        fsd_server.use_shards(args.shards)
     api_server_config = Config(
         app,
         host=HOST,
@@ -28,10 +36,13 @@ async def main():
     )
     api_server = Server(config=api_server_config)
     api_server_config.setup_event_loop()
-    await asyncio.gather(
-        fsd_server.serve(),
-        api_server.serve()
-    )
+    try:
+        await asyncio.gather(
+            fsd_server.serve(),
+            api_server.serve()
+        )
+    finally:
+        fsd_server.stop()
 
 if __name__ == '__main__':
     asyncio.run(main())
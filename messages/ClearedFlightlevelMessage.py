@@ -1,4 +1,4 @@
-from geopy.distance import Distance
+from utils.distance import Distance
 
 from messages.IMessage import IMessage
 
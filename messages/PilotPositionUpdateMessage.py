@@ -1,6 +1,6 @@
 from enum import Enum
 
-from geopy.distance import Distance
+from utils.distance import Distance
 
 from messages.IMessage import IMessage
 from messages.Position import Position
@@ -39,9 +39,22 @@ class PilotPositionUpdateMessage(IMessage):
         self.pbh = pbh
         self.pressure_delta = pressure_delta
 
-    @staticmethod
-    def parse_raw_message(raw_message):
-        raise NotImplementedError('Not implemented')
+    @classmethod
+    def parse_raw_message(cls, raw_message: str):
+        ident, callsign, squawk_code, rating, latitude, longitude, altitude, speed, pbh, pressure_delta = \
+            raw_message[len(cls.command):].split(':')[:10]
+        altitude_ = Distance(feet=float(altitude))
+        return cls(
+            callsign=callsign,
+            ident=TransponderMode(ident),
+            squawk_code=squawk_code,
+            rating=rating,
+            position=Position(float(latitude), float(longitude), altitude_),
+            altitude=altitude_,
+            speed=Speed(knots=float(speed)),
+            pbh=cls.pbh_to_tuple(int(pbh)),
+            pressure_delta=int(pressure_delta),
+        )
 
     def tuple_to_pbh(self):
         pitch, bank, heading, on_ground = self.pbh
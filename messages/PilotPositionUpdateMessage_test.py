@@ -35,3 +35,15 @@ class TestPilotPositionUpdateMessage(unittest.TestCase):
 
     def test_pbh_to_tuple(self):
         PilotPositionUpdateMessage.pbh_to_tuple(4261414408)
+
+    def test_parse_raw_message(self):
+        msg = PilotPositionUpdateMessage.parse_raw_message(
+            '@N:CAL123:2000:1:25.07945:121.23277:108:0:4261414408:-15'
+        )
+        self.assertEqual(msg.callsign, 'CAL123')
+        self.assertEqual(msg.ident, TransponderMode.MODE_C)
+        self.assertEqual(msg.squawk_code, '2000')
+        self.assertAlmostEqual(msg.position.latitude, 25.07945)
+        self.assertAlmostEqual(msg.position.longitude, 121.23277)
+        self.assertAlmostEqual(msg.altitude.feet, 108)
+        self.assertEqual(msg.pressure_delta, -15)
@@ -1,5 +1,5 @@
 from geopy.point import Point
-from geopy.distance import Distance
+from utils.distance import Distance
 
 
 class Position(Point):
@@ -1,33 +1,37 @@
+import os
 import re
+import random
+import asyncio
 import logging
+from datetime import timedelta
+from math import nan
 from uuid import uuid1
-from math import radians, isclose, sin
-from typing import Callable
 
-import requests
-import astar
-from geopy.distance import distance as distance_between, Distance
+from utils.distance import Distance
 
 import db.init
-from db.models import TaxiPath, Parking, RunwayEnd
+from db.executor import db_executor
+from db.init import detach
+from db.models import Approach, Parking, RunwayEnd
+from db.navdata import navdata
+from db.snapshot import NavdataSnapshot, SNAPSHOT_PATH
 from aircrafts.bot_aircraft import BotAircraft, AircraftStatus
+from aircrafts.store import aircraft_store
 from utils.fsd_server import FsdServer
 from utils.aircraft_factory import AircraftFactory
-from utils.geo import get_bearing_distance
 from utils.connection import Connection
+from utils.motion import MotionBatch
+from utils.flightplan import Flightplan
+from utils.shards import ShardAircraft, ShardPool, get_shard_index, pack_records, unpack_records
 from utils.fsd_controller import FsdController
+from utils.weather import WeatherProvider, Metar
+from utils.procedure_compiler import procedure_compiler
+from utils.ground_graph import ground_graphs, get_vacatable_taxi_path_by_runway
+from utils.procedure_catalogue import procedure_catalogues
+from messages.IMessage import IMessage
 from messages.Position import Position
 from messages.TextMessage import TextMessage
 from helpers import (
-    get_taxi_positions_by_airport_id_n_taxi_path_names,
-    get_pushback_paths_by_parking_id,
-    get_start_by_airport_id_n_runway_name,
-    get_sid_approaches_by_airport_ident_n_approach_name,
-    get_star_approaches_by_airport_ident_n_approach_name,
-    fill_position_on_legs,
-    get_runway_end_by_airport_id_n_runway_name,
-    get_runway_by_runway_end_id,
-    get_taxt_paths_by_airport_id,
     get_airport_by_ident,
     get_parking_by_parking_id
 )
@@ -37,198 +41,25 @@ logging.basicConfig(level=logging.DEBUG)
 
 
 NUMBER_OF_AIRCRAFTS = 10
-
-
-class Node:
-    def __init__(self, position: Position, is_hold_short: bool, g=0.0, h=0.0):
-        self.position = position
-        self.links: list[Node] = []
-        self.is_hold_short = is_hold_short
-        self.name = str(hash(self))
-
-    def __eq__(self, other):
-        if not isinstance(other, Node):
-            return False
-        return self.position == other.position
-
-    def __hash__(self):
-        return hash(self.position)
-
-    @property
-    def id(self):
-        return str(hash(self))
-
-
-def get_vacatable_taxi_path_by_runway(airport_id: int, runway_end: RunwayEnd):
-    print('runway_end', runway_end)
-    if runway_end is None:
-        return []
-
-    runway = get_runway_by_runway_end_id(runway_end.runway_end_id)
-    if runway is None:
-        return []
-
-    runway_width = runway.width
-    runway_heading = runway_end.heading
-
-    taxi_paths = get_taxt_paths_by_airport_id(airport_id)
-    taxi_path_groups: dict[str, list[TaxiPath]] = {}
-    for taxi_path in taxi_paths:
-        if taxi_path.name not in taxi_path_groups:
-            taxi_path_groups[taxi_path.name] = []
-        taxi_path_groups[taxi_path.name].append(taxi_path)
-
-    vacated_paths: dict[str, list[Position]] = {}
-    for taxi_path_name, taxi_path_group in taxi_path_groups.items():
-        points: dict[Position, TaxiPath] = {}
-        for taxi_path in taxi_path_group:
-            if points.get(taxi_path.start_position) is None:
-                points[taxi_path.start_position] = []
-            if points.get(taxi_path.end_position) is None:
-                points[taxi_path.end_position] = []
-            points[taxi_path.start_position].append(taxi_path)
-            points[taxi_path.end_position].append(taxi_path)
-        for position, taxi_paths in points.items():
-            if len(taxi_paths) == 1:
-                bearing, distance = get_bearing_distance(
-                    runway_end.position,
-                    position
-                )
-                deg = bearing.degrees - runway_heading
-                rad = radians(deg)
-                distance_to_runway = sin(rad) * distance.feet
-                # The endpoint of taxiway should inside the runway
-                if isclose(distance_to_runway, 0, abs_tol=runway_width):
-                    another_position = taxi_paths[0].end_position if position == taxi_paths[
-                        0].start_position else taxi_paths[0].start_position
-                    taxi_path_bearing, _ = get_bearing_distance(
-                        position,
-                        another_position
-                    )
-                    # degrees between runway and taxi path should not too large
-                    if isclose(bearing.degrees, taxi_path_bearing.degrees, abs_tol=60):
-                        nodes = get_vacated_taxi_path(
-                            position,
-                            taxi_path_group
-                        )
-                        vacated_paths[taxi_path_name] = [
-                            n.position for n in nodes]
-    return vacated_paths
-
-
-def get_vacated_taxi_path(start_position: Position, all_taxi_paths: list[TaxiPath]):
-    all_nodes: set[Node] = set()
-    position_hash_node_map = {}
-
-    def get_node_by_taxi_path(taxi_path: TaxiPath):
-        hash_start_position = hash(taxi_path.start_position)
-        hash_end_position = hash(taxi_path.end_position)
-        if hash_start_position not in position_hash_node_map:
-            position_hash_node_map[hash_start_position] = Node(
-                taxi_path.start_position,
-                is_hold_short=taxi_path.start_type in ('HSND', 'IHSND'),
-            )
-        if hash_end_position not in position_hash_node_map:
-            position_hash_node_map[hash_end_position] = Node(
-                taxi_path.end_position,
-                is_hold_short=taxi_path.end_type in ('HSND', 'IHSND'),
-            )
-        return (
-            position_hash_node_map.get(hash_start_position),
-            position_hash_node_map.get(hash_end_position),
-        )
-
-    for tp in all_taxi_paths:
-        start_node, end_node = get_node_by_taxi_path(tp)
-        start_node.links.append(end_node)
-        end_node.links.append(start_node)
-        all_nodes.add(start_node)
-        all_nodes.add(end_node)
-
-    start_node = next(
-        (n for n in all_nodes if n.position == start_position),
-        None
-    )
-    target_node = next(
-        (n for n in all_nodes if n.is_hold_short),
-        None
-    )
-    if target_node is None:
-        target_node = next(
-            (n for n in all_nodes if distance_between(
-                start_node.position, n.position).feet > 70),
-            None
-        )
-
-    def distance_between_nodes(n1: Node, n2: Node):
-        return distance_between(n1.position, n2.position).meters
-
-    return astar.find_path(
-        start_node,
-        target_node,
-        neighbors_fnct=lambda n: n.links,
-        heuristic_cost_estimate_fnct=distance_between_nodes,
-        distance_between_fnct=distance_between_nodes
-    )
-
-
-def get_start_position_by_parking(parking: Parking):
-    pushback_paths = get_pushback_paths_by_parking_id(
-        parking.parking_id
-    )
-    pushback_path = pushback_paths[0]
-    return pushback_path.end_position if pushback_path.start_position == parking.position else pushback_path.start_position
-
-
-def get_taxi_path(
-    start_position: Position,
-    all_taxi_paths: list[TaxiPath],
-    find_target_func: Callable[[Node, set[Node]], Node]
-):
-    all_nodes: set[Node] = set()
-    position_hash_node_map = {}
-
-    def get_node_by_taxi_path(taxi_path: TaxiPath):
-        hash_start_position = hash(taxi_path.start_position)
-        hash_end_position = hash(taxi_path.end_position)
-        if hash_start_position not in position_hash_node_map:
-            position_hash_node_map[hash_start_position] = Node(
-                taxi_path.start_position,
-                is_hold_short=taxi_path.start_type in ('HSND', 'IHSND'),
-            )
-        if hash_end_position not in position_hash_node_map:
-            position_hash_node_map[hash_end_position] = Node(
-                taxi_path.end_position,
-                is_hold_short=taxi_path.end_type in ('HSND', 'IHSND'),
-            )
-        return (
-            position_hash_node_map.get(hash_start_position),
-            position_hash_node_map.get(hash_end_position),
-        )
-
-    for tp in all_taxi_paths:
-        start_node, end_node = get_node_by_taxi_path(tp)
-        start_node.links.append(end_node)
-        end_node.links.append(start_node)
-        all_nodes.add(start_node)
-        all_nodes.add(end_node)
-
-    start_node = next(
-        (n for n in all_nodes if n.position == start_position),
-        None
-    )
-    target_node = find_target_func(start_node, all_nodes)
-
-    def distance_between_nodes(n1: Node, n2: Node):
-        return distance_between(n1.position, n2.position).meters
-
-    return astar.find_path(
-        start_node,
-        target_node,
-        neighbors_fnct=lambda n: n.links,
-        heuristic_cost_estimate_fnct=distance_between_nodes,
-        distance_between_fnct=distance_between_nodes
-    )
+BOT_AIRPORT_IDENT = 'RCTP'
+# navdata regions preloaded at startup, others are loaded on demand
+NAVDATA_REGIONS = {'RC'}
+# how a shard worker's message is delivered by the front-end
+SHARD_TEXT = 'text'
+SHARD_BROADCAST = 'broadcast'
+
+# instruction patterns, matched against the lowercased text message
+CLEARANCE_PATTERN = re.compile(r'(cleared|clrd?) to \w+,? via')
+SID_NAME_PATTERN = re.compile(r'via ([a-z]{2,5}\d[a-z]?)')
+STAR_NAME_PATTERN = re.compile(r'([a-z]{2,5}\d[a-z]?) arrival')
+INITIAL_ALTITUDE_PATTERN = re.compile(r'(initial altitude|climb and maintain|c\/m) ?(\d{4}|FL\d{3})')
+SQUAWK_PATTERN = re.compile(r'(squawk|sq) ?([0-7]{4})')
+PUSHBACK_PATTERN = re.compile(r'(start(up)?|s\/u) (and|&|n) pushback approved?')
+CHANGE_ALTITUDE_PATTERN = re.compile(r'((climb|decend) and maintain|[cd]\/m) (fl\d{3}|\d{3,5})')
+ALTITUDE_PATTERN = re.compile(r'((climb/decend) and maintain|[cd]\/m) (fl\d{3}|\d{3,5})')
+RUNWAY_NAME_PATTERN = re.compile(r'(runway|rwy) ?(\d{2}[lrc]?)')
+LINEUP_WAIT_PATTERN = re.compile(r'(line[- ]?up (and|n|&) wait|l\/u (and|n|&) w|luw)')
+TAKEOFF_PATTERN = re.compile(r'(clear(ed)?|clrd?) (to |for )?(takeoff|t\/o)')
 
 
 class TrainingController(FsdController):
@@ -247,23 +78,21 @@ class TrainingController(FsdController):
             return
         if aircraft.parking is None or aircraft.flightplan is None:
             return
-        sid_approaches = get_sid_approaches_by_airport_ident_n_approach_name(
-            aircraft.flightplan.departure_airport,
-            sid_name
-        )
-        used_sid = sid_approaches[0]
+        used_sid = get_sid(aircraft.flightplan.departure_airport, sid_name)
+        if used_sid is None:
+            self.send_text_to_channel(
+                target_conn.callsign,
+                self.frequency,
+                f'Unable, {target_conn.callsign}'
+            )
+            return
         aircraft.set_sid_legs(
-            fill_position_on_legs(
-                used_sid.approach_legs,
+            procedure_compiler.get_legs(
+                used_sid,
                 aircraft.flightplan.departure_airport
             )
         )
 
-        if star_name is not None:
-            get_star_approaches_by_airport_ident_n_approach_name(
-                aircraft.flightplan.arrival_airport,
-                star_name
-            )
         aircraft.set_squawk(squawk)
         aircraft.set_transponder_mode_c()
         aircraft.set_target_altitude(initial_altitude)
@@ -271,7 +100,7 @@ class TrainingController(FsdController):
         aircraft.set_status(AircraftStatus.DELIVERED)
 
         last_route_str = f'{star_name} arrival' if star_name is not None else 'flightplan route'
-        self.send_text_to_all_connections(
+        self.send_text_to_channel(
             target_conn.callsign,
             self.frequency,
             f'Cleared to {aircraft.flightplan.arrival_airport} via {sid_name}, ..., {last_route_str}, '
@@ -283,10 +112,11 @@ class TrainingController(FsdController):
         if aircraft is None or not isinstance(aircraft, BotAircraft) or target_conn.callsign is None or aircraft.parking is None:
             return
 
-        pushback_paths = get_pushback_paths_by_parking_id(
-            aircraft.parking.parking_id)
-        if len(pushback_paths) == 0:
-            self.send_text_to_all_connections(
+        push_to_position = ground_graphs.get(
+            aircraft.parking.airport_id
+        ).get_pushback_position(aircraft.parking.parking_id)
+        if push_to_position is None:
+            self.send_text_to_channel(
                 target_conn.callsign,
                 self.frequency,
                 f'Unable, {target_conn.callsign}'
@@ -295,42 +125,35 @@ class TrainingController(FsdController):
         if aircraft is None:
             return
 
-        self.send_text_to_all_connections(
+        self.send_text_to_channel(
             target_conn.callsign,
             self.frequency,
             f'Startup and pushback approved, {target_conn.callsign}'
         )
-        pushback_path = pushback_paths[0]
-        push_to_position = pushback_path.end_position if pushback_path.start_position == aircraft.position else pushback_path.start_position
         aircraft.start_pushback([push_to_position])
 
-    def taxi_approved(self, target_conn: Connection, taxiway_names: list[str]):
+    def taxi_approved(self, target_conn: Connection, taxiway_names: list[str], runway_name: str | None = None):
         aircraft = target_conn.aircraft
-        if aircraft is None or not isinstance(aircraft, BotAircraft) or target_conn.callsign is None:
+        if aircraft is None or not isinstance(aircraft, BotAircraft) or target_conn.callsign is None or aircraft.parking is None:
             return
 
-        start_position = get_start_position_by_parking(aircraft.parking)
-        all_taxi_paths = get_taxi_positions_by_airport_id_n_taxi_path_names(
-            aircraft.parking.airport_id,
-            taxiway_names
-        )
-        path = get_taxi_path(
+        graph = ground_graphs.get(aircraft.parking.airport_id)
+        start_position = graph.get_pushback_position(
+            aircraft.parking.parking_id)
+        path = None if start_position is None else graph.find_hold_short_path(
             start_position,
-            all_taxi_paths,
-            lambda start_node, all_nodes: next(
-                (n for n in all_nodes if n.is_hold_short),
-                None
-            )
+            taxiway_names,
+            runway_name
         )
         if path is None:
-            self.send_text_to_all_connections(
+            self.send_text_to_channel(
                 target_conn.callsign,
                 self.frequency,
                 f'Unable, {target_conn.callsign}'
             )
             return
 
-        path_positions = [p.position for p in path]
+        path_positions = list(path)
         taxiway_name_sentence = ' '.join(taxiway_names)
         runway_sentence = ''
         if aircraft.expect_runway_end is not None:
@@ -339,7 +162,7 @@ class TrainingController(FsdController):
             start = aircraft.expect_runway_end.start
             aircraft.set_departure_path([start.position])
 
-        self.send_text_to_all_connections(
+        self.send_text_to_channel(
             target_conn.callsign,
             self.frequency,
             f'{runway_sentence}taxi via {taxiway_name_sentence}, {target_conn.callsign}'
@@ -353,7 +176,7 @@ class TrainingController(FsdController):
         if aircraft is None or not isinstance(aircraft, BotAircraft) or target_conn.callsign is None:
             return
         if len(aircraft.departure_path) == 0:
-            self.send_text_to_all_connections(
+            self.send_text_to_channel(
                 target_conn.callsign,
                 self.frequency,
                 'Unable'
@@ -361,63 +184,58 @@ class TrainingController(FsdController):
             return
 
         runway_sentence = f', runway {aircraft.expect_runway_end.name}' if aircraft.expect_runway_end is not None else ''
-        self.send_text_to_all_connections(
+        self.send_text_to_channel(
             target_conn.callsign,
             self.frequency,
             f'Line-up and wait {runway_sentence}, {target_conn.callsign}'
         )
         aircraft.start_lineup_wait()
 
-    def _get_metar(self, airport_ident: str):
-        url = (
-            'https://aviationweather.gov/api/data/metar'
-            f'?ids={airport_ident}&format=json'
-        )
-        response = requests.get(url)
-        airport_data = response.json()[0]
-        wdir = airport_data['wdir']
-        wspd = airport_data['wspd']
-        altim = airport_data['altim']
-        return wdir, wspd, altim
-
     def cleared_takeoff(self, target_conn: Connection):
         aircraft = target_conn.aircraft
         if aircraft is None or not isinstance(aircraft, BotAircraft) or target_conn.callsign is None:
             return
 
-        wdir, wspd, altim = self._get_metar(
-            aircraft.flightplan.departure_airport
-        )
-
         runway_sentence = f'Runway {aircraft.expect_runway_end.name}, ' if aircraft.expect_runway_end is not None else ''
-        self.send_text_to_all_connections(
-            target_conn.callsign,
-            self.frequency,
-            f'{runway_sentence}wind {wdir} at {wspd} knots, QNH {altim}, cleared for takeoff, {target_conn.callsign}'
+
+        def send_clearance(metar: Metar):
+            self.send_text_to_channel(
+                target_conn.callsign,
+                self.frequency,
+                f'{runway_sentence}wind {metar.wind_direction} at {metar.wind_speed} knots, QNH {metar.altimeter}, cleared for takeoff, {target_conn.callsign}'
+            )
+
+        self.server.weather.with_metar(
+            aircraft.flightplan.departure_airport,
+            send_clearance
         )
         aircraft.start_departure()
         aircraft.set_expect_runway_end(None)
 
-    def cleared_land(self, target_conn: Connection):
+    def cleared_land(
+        self,
+        target_conn: Connection,
+        vacate_paths: dict[str, list[Position]]
+    ):
         aircraft = target_conn.aircraft
         if aircraft is None or not isinstance(aircraft, BotAircraft) or target_conn.callsign is None:
             return
 
-        wdir, wspd, altim = self._get_metar(
-            aircraft.flightplan.arrival_airport
-        )
+        runway_name = aircraft.expect_runway_end.name.upper()
 
-        self.send_text_to_all_connections(
-            target_conn.callsign,
-            self.frequency,
-            f'Runway {aircraft.expect_runway_end.name.upper()}, wind {wdir} at {wspd} knots, QNH {altim}, cleared to land, {target_conn.callsign}'
+        def send_clearance(metar: Metar):
+            self.send_text_to_channel(
+                target_conn.callsign,
+                self.frequency,
+                f'Runway {runway_name}, wind {metar.wind_direction} at {metar.wind_speed} knots, QNH {metar.altimeter}, cleared to land, {target_conn.callsign}'
+            )
+
+        self.server.weather.with_metar(
+            aircraft.flightplan.arrival_airport,
+            send_clearance
         )
         aircraft.start_land()
-        airport = get_airport_by_ident(aircraft.flightplan.arrival_airport)
-        aircraft.vacatable_taxi_paths = get_vacatable_taxi_path_by_runway(
-            airport.airport_id,
-            aircraft.expect_runway_end
-        )
+        aircraft.set_vacatable_taxi_paths(vacate_paths)
 
     def change_altitude(self, target_conn: Connection, altitude: Distance):
         aircraft = target_conn.aircraft
@@ -426,45 +244,47 @@ class TrainingController(FsdController):
 
         action_str = 'Climb' if aircraft.position.altitude_ < altitude else 'Descend'
 
-        self.send_text_to_all_connections(
+        self.send_text_to_channel(
             target_conn.callsign,
             self.frequency,
             f'{action_str} and maintain {int(altitude.feet)}, {target_conn.callsign}'
         )
         aircraft.set_target_altitude(altitude)
 
-    def taxi_to_bay(self, target_conn: Connection, taxiway_names: list[str], parking_id: int):
+    def taxi_to_bay(
+        self,
+        target_conn: Connection,
+        taxiway_names: list[str],
+        bay: tuple[int, Parking] | None
+    ):
+        """
+        params:
+            bay: the airport id and the parking, from `get_bay`
+        """
         aircraft = target_conn.aircraft
         if aircraft is None or not isinstance(aircraft, BotAircraft) or target_conn.callsign is None:
             return
 
-        airport = get_airport_by_ident(aircraft.flightplan.arrival_airport)
-        parking = get_parking_by_parking_id(parking_id)
-        if airport is None or parking is None:
-            self.send_text_to_all_connections(
+        if bay is None:
+            self.send_text_to_channel(
                 target_conn.callsign,
                 self.frequency,
                 f'Unable, {target_conn.callsign}'
             )
             return
 
-        pushback_position = get_start_position_by_parking(parking)
+        airport_id, parking = bay
+        graph = ground_graphs.get(airport_id)
+        pushback_node_id = graph.parking_pushback_nodes.get(parking.parking_id)
         aircraft.set_parking(parking)
-        all_taxi_paths = get_taxi_positions_by_airport_id_n_taxi_path_names(
-            airport.airport_id,
-            taxiway_names
-        )
-        path = get_taxi_path(
+        path = graph.find_path(
             aircraft.position if len(
                 aircraft.taxi_path) == 0 else aircraft.taxi_path[-1],
-            all_taxi_paths,
-            lambda start_node, all_nodes: next(
-                (n for n in all_nodes if n.position == pushback_position),
-                None
-            )
+            [] if pushback_node_id is None else [pushback_node_id],
+            taxiway_names
         )
         if path is None:
-            self.send_text_to_all_connections(
+            self.send_text_to_channel(
                 target_conn.callsign,
                 self.frequency,
                 f'Unable, {target_conn.callsign}'
@@ -472,9 +292,9 @@ class TrainingController(FsdController):
             return
 
         # taxi to parking
-        path_positions = [p.position for p in path] + [parking.position]
+        path_positions = path + [parking.position]
         taxiway_name_sentence = ' '.join(taxiway_names)
-        self.send_text_to_all_connections(
+        self.send_text_to_channel(
             target_conn.callsign,
             self.frequency,
             f'Bay {parking.full_name}, taxi via {taxiway_name_sentence}, {target_conn.callsign}'
@@ -488,7 +308,7 @@ class TrainingController(FsdController):
         if aircraft is None or not isinstance(aircraft, BotAircraft) or target_conn.callsign is None:
             return
 
-        self.send_text_to_all_connections(
+        self.send_text_to_channel(
             target_conn.callsign,
             self.frequency,
             f'Engine shutdown, thank for your service, {target_conn.callsign}'
@@ -508,34 +328,25 @@ class TrainingController(FsdController):
         sentences = message.message.split(',')
         lower_message = message.message.lower()
 
-        if re.search(r'(cleared|clrd?) to \w+,? via', lower_message) is not None:
+        if CLEARANCE_PATTERN.search(lower_message) is not None:
             # del
-            sid_name_match = re.search(
-                r'via ([a-z]{2,5}\d[a-z]?)',
-                lower_message
-            )
+            sid_name_match = SID_NAME_PATTERN.search(lower_message)
             sid_name = sid_name_match.group(1)
             sid_name = sid_name.upper()
             # ex. CHALI1C -> CHAL1C
             sid_name = sid_name[:4] + \
                 sid_name[5:] if len(sid_name) == 7 else sid_name
-            star_name_match = re.search(
-                r'([a-z]{2,5}\d[a-z]?) arrival',
-                lower_message
-            )
+            star_name_match = STAR_NAME_PATTERN.search(lower_message)
             star_name = None
             if star_name_match is not None:
                 star_name = star_name_match.group(1)
                 star_name = star_name.upper()
-            initial_altitude_match = re.search(
-                r'(initial altitude|climb and maintain|c\/m) ?(\d{4}|FL\d{3})',
-                lower_message
-            )
+            initial_altitude_match = INITIAL_ALTITUDE_PATTERN.search(lower_message)
             initial_altitude = initial_altitude_match.group(2)
             initial_altitude = int(initial_altitude[2:]) * 100 \
                 if initial_altitude.startswith('fl') \
                 else int(initial_altitude)
-            squawk_match = re.search(r'(squawk|sq) ?([0-7]{4})', lower_message)
+            squawk_match = SQUAWK_PATTERN.search(lower_message)
             squawk = squawk_match.group(2)
             self.delivered(
                 target_conn,
@@ -545,15 +356,12 @@ class TrainingController(FsdController):
                 squawk
             )
             return
-        elif re.search(r'(start(up)?|s\/u) (and|&|n) pushback approved?', lower_message) is not None:
+        elif PUSHBACK_PATTERN.search(lower_message) is not None:
             # gnd
             self.pushback_approved(target_conn)
             return
-        elif re.search(r'((climb|decend) and maintain|[cd]\/m) (fl\d{3}|\d{3,5})', lower_message) is not None:
-            altitude_match = re.search(
-                r'((climb/decend) and maintain|[cd]\/m) (fl\d{3}|\d{3,5})',
-                lower_message
-            )
+        elif CHANGE_ALTITUDE_PATTERN.search(lower_message) is not None:
+            altitude_match = ALTITUDE_PATTERN.search(lower_message)
             altitude = altitude_match.group(3)
             altitude = int(
                 altitude[2:]) * 100 if altitude.startswith('fl') else int(altitude)
@@ -562,35 +370,28 @@ class TrainingController(FsdController):
             return
         elif len(sentences) > 2:
             path_str = sentences[2].strip().lower()
-            runway_name_match = re.search(
-                r'(runway|rwy) ?(\d{2}[lrc]?)',
-                lower_message
-            )
+            runway_name_match = RUNWAY_NAME_PATTERN.search(lower_message)
             runway_name = runway_name_match.group(2).upper()
             if path_str.startswith('taxi via'):
                 path_str = sentences[2].strip().lower()
                 taxiway_names = [
                     n.upper() for n in path_str.replace('taxi via ', '').split(' ') if n != ''
                 ]
+                # the parking is cleared once the taxi is approved
+                parking = aircraft.parking
                 self.taxi_approved(target_conn, taxiway_names, runway_name)
+                if parking is None or aircraft.parking is not None:
+                    return
 
-                start = get_start_by_airport_id_n_runway_name(
-                    aircraft.parking.airport_id,
-                    runway_name
-                )
-                aircraft.set_departure_path([start.position])
+                start = ground_graphs.get(parking.airport_id).get_start(runway_name)
+                if start is not None:
+                    aircraft.set_departure_path([start.position])
                 return
-            elif re.search(r'(line[- ]?up (and|n|&) wait|l\/u (and|n|&) w|luw)', lower_message) is not None:
-                self.lineup_and_wait(
-                    target_conn,
-                    runway_name,
-                )
+            elif LINEUP_WAIT_PATTERN.search(lower_message) is not None:
+                self.lineup_and_wait(target_conn)
                 return
-            elif re.search(r'(clear(ed)?|clrd?) (to |for )?(takeoff|t\/o)', lower_message) is not None:
-                self.cleared_takeoff(
-                    target_conn,
-                    runway_name,
-                )
+            elif TAKEOFF_PATTERN.search(lower_message) is not None:
+                self.cleared_takeoff(target_conn)
                 return
 
         raise Exception('Cannot parse instruction')
@@ -598,11 +399,17 @@ class TrainingController(FsdController):
     def handle_text_message(self, message):
         super().handle_text_message(message)
 
+        callsign = message.message.split(',')[0]
+        target_conn = self.server.get_connection_by_callsign(callsign)
+        if target_conn is not None and isinstance(target_conn.aircraft, ShardAircraft):
+            self.server.shards.forward(callsign, message)
+            return
+        self.instruct(message)
+
+    def instruct(self, message: TextMessage):
         sentences = message.message.split(',')
         callsign = sentences[0]
-        target_conn = next(
-            conn for conn in self.connections.values() if conn.callsign == callsign
-        )
+        target_conn = self.server.get_connection_by_callsign(callsign)
         if target_conn is None or target_conn.aircraft is None:
             return
 
@@ -612,20 +419,90 @@ class TrainingController(FsdController):
             logging.exception(e)
 
         # cannot parse instruction
-        self.send_text_to_all_connections(
+        self.send_text_to_channel(
             target_conn.callsign,
             self.frequency,
             f'Say again, {target_conn.callsign}'
         )
 
 
+def get_sid(airport_ident: str, sid_name: str) -> Approach | None:
+    """
+    The SID of the procedure catalogue, with its legs compiled.
+    """
+    for sid in procedure_catalogues.get(airport_ident).sids:
+        if sid.fix_ident == sid_name:
+            procedure_compiler.get_legs(sid, airport_ident)
+            return sid
+    return None
+
+
+def get_vacate_paths(airport_ident: str, runway_end: RunwayEnd | None) -> dict[str, list[Position]]:
+    airport = get_airport_by_ident(airport_ident)
+    if airport is None:
+        return {}
+    return get_vacatable_taxi_path_by_runway(airport.airport_id, runway_end)
+
+
+def get_bay(airport_ident: str, parking_id: int) -> tuple[int, Parking] | None:
+    """
+    The airport id and the parking to taxi to, with the ground graph of the
+    airport built.
+    """
+    airport = get_airport_by_ident(airport_ident)
+    parking = get_parking_by_parking_id(parking_id)
+    if airport is None or parking is None:
+        return None
+    ground_graphs.get(airport.airport_id)
+    # kept by the aircraft, which is read from the event loop
+    detach([parking])
+    return airport.airport_id, parking
+
+
+def load_airport(airport_ident: str):
+    """
+    Build the ground graph and the procedure catalogue of the airport.
+    """
+    airport = get_airport_by_ident(airport_ident)
+    if airport is not None:
+        ground_graphs.get(airport.airport_id)
+    procedure_catalogues.get(airport_ident)
+
+
 class TrainingServer(FsdServer):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.factory = AircraftFactory()
+        self.weather = WeatherProvider()
+        self.aircraft_store = aircraft_store
+        self.motion = MotionBatch(self.aircraft_store)
+        self.shards: ShardPool | None = None
+
+    def use_shards(self, count: int):
+        """
+        Simulate the bots in `count` worker processes.
+        """
+        self.shards = ShardPool(count, run_shard, BOT_AIRPORT_IDENT, NUMBER_OF_AIRCRAFTS)
+        return self
+
+    def load_navdata(self):
+        if os.path.exists(SNAPSHOT_PATH):
+            navdata.use_snapshot(NavdataSnapshot.open(SNAPSHOT_PATH))
+        navdata.load(NAVDATA_REGIONS)
 
     def on_start(self):
-        for _ in range(NUMBER_OF_AIRCRAFTS):
+        self.weather.attach(asyncio.get_running_loop())
+        self.load_navdata()
+        if self.shards is not None:
+            self.shards.start()
+            return
+        self.spawn_bots(BOT_AIRPORT_IDENT, NUMBER_OF_AIRCRAFTS)
+        # build the caches the clearances use in the database executor
+        # instead of on the first clearance
+        asyncio.ensure_future(db_executor.run(load_airport, BOT_AIRPORT_IDENT))
+
+    def spawn_bots(self, airport_ident: str, number: int):
+        for _ in range(number):
             # factory.generate_w_random_situation(random_progress=True)
             conn = Connection(
                 lambda _: None,
@@ -633,7 +510,7 @@ class TrainingServer(FsdServer):
                 self._on_text_message,
             )
             conn.id = str(uuid1())
-            aircraft = self.factory.generate_on_parking('RCTP')
+            aircraft = self.generate_bot(airport_ident)
             # aircraft = self.factory.generate_on_approaching(
             #     arrival_airport_ident='RCTP'
             # )
@@ -643,10 +520,75 @@ class TrainingServer(FsdServer):
             conn.aircraft = aircraft
             conn.callsign = conn.aircraft.callsign
             conn.type = 'PILOT'
-            self.connections[conn.id] = conn
+            self.add_connection(conn)
+
+    def generate_bot(self, airport_ident: str) -> BotAircraft | None:
+        return self.factory.generate_on_parking(airport_ident)
+
+    def stop(self):
+        if self.shards is not None:
+            self.shards.stop()
+        super().stop()
+        db_executor.shutdown()
+        db.init.remove_sessions()
+
+    def add_connection(self, connection: Connection):
+        if connection.aircraft is not None:
+            self.aircraft_store.add(connection.aircraft)
+        return super().add_connection(connection)
+
+    def _on_lost_connection(self, connection: Connection):
+        super()._on_lost_connection(connection)
+        if connection.aircraft is not None:
+            self.aircraft_store.remove(connection.aircraft)
+
+    def on_tick(self, after_time):
+        if self.shards is None:
+            return
+        for reply in self.shards.poll():
+            self.apply_shard_reply(*reply)
+        self.shards.tick(after_time)
 
-    def on_tick(self):
-        pass
+    def apply_shard_reply(
+        self,
+        added: list[tuple[str, Flightplan | None]],
+        removed: list[str],
+        outbox: list[tuple[str, IMessage]],
+        records: bytes
+    ):
+        for callsign, flightplan in added:
+            conn = Connection(
+                lambda _: None,
+                self._on_lost_connection,
+                self._on_text_message,
+            )
+            conn.id = str(uuid1())
+            conn.aircraft = ShardAircraft(callsign, flightplan)
+            conn.callsign = callsign
+            conn.type = 'PILOT'
+            self.add_connection(conn)
+
+        for callsign, *state in unpack_records(records):
+            conn = self.callsigns.get(callsign)
+            if conn is not None and isinstance(conn.aircraft, ShardAircraft):
+                conn.aircraft.update(*state)
+
+        # the bots send their messages through the controllers of their
+        # stand-ins
+        for kind, message in outbox:
+            conn = self.callsigns.get(message.source)
+            if conn is None or conn.controller is None:
+                logging.debug('Drop message of unknown bot %s', message.source)
+                continue
+            if kind == SHARD_TEXT:
+                conn.controller.deliver_text_message(message)
+            else:
+                conn.controller.send_to_all_connections(message)
+
+        for callsign in removed:
+            conn = self.callsigns.get(callsign)
+            if conn is not None and isinstance(conn.aircraft, ShardAircraft):
+                conn.connection_lost(None)
 
     def on_tick_connection(self, conn, after_time):
         if conn.type != 'PILOT' or conn.aircraft is None:
@@ -655,7 +597,10 @@ class TrainingServer(FsdServer):
         # update bot aircrafts
         aircraft = conn.aircraft
         if isinstance(aircraft, BotAircraft):
-            aircraft.update_status(after_time)
+            aircraft.update_status(after_time, self.motion)
+
+    def on_tick_connections_updated(self):
+        self.motion.flush()
 
     def on_connection_made(self, connection):
         pass
@@ -664,6 +609,131 @@ class TrainingServer(FsdServer):
         pass
 
 
+class ShardController(TrainingController):
+    """
+    Controller of a shard worker. Its messages are queued for the
+    front-end, which delivers them to the clients.
+    """
+
+    def deliver_text_message(self, message: TextMessage, exclude: Connection | None = None):
+        self.server.outbox.append((SHARD_TEXT, message))
+
+    def send_to_all_connections(self, message: IMessage):
+        self.server.outbox.append((SHARD_BROADCAST, message))
+
+    def handle_text_message(self, message: TextMessage):
+        # already delivered by the front-end
+        self.instruct(message)
+
+
+class ShardServer(TrainingServer):
+    """
+    Simulates the bots of one shard in a worker process. It doesn't
+    listen, every tick is requested by the front-end through the pipe.
+    """
+
+    def __init__(self, shard_index: int, shard_count: int):
+        super().__init__(Controller=ShardController)
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.added: list[tuple[str, Flightplan | None]] = []
+        self.removed: list[str] = []
+        self.outbox: list[tuple[str, IMessage]] = []
+        self.controller = ShardController(
+            Connection(lambda _: None, lambda _: None, lambda *_: None),
+            self
+        )
+
+    def generate_bot(self, airport_ident: str) -> BotAircraft | None:
+        # the callsigns and the parkings of the shards don't overlap
+        callsign = self.factory.generate_callsign()
+        while get_shard_index(callsign, self.shard_count) != self.shard_index:
+            callsign = self.factory.generate_callsign()
+        airport = get_airport_by_ident(airport_ident)
+        if airport is None:
+            return None
+        occupied_parking_ids = {
+            conn.aircraft.parking.parking_id for conn in self.connections.values()
+            if isinstance(conn.aircraft, BotAircraft) and conn.aircraft.parking is not None
+        }
+        parkings = [
+            p for p in airport.parkings
+            if p.parking_id % self.shard_count == self.shard_index
+            and p.parking_id not in occupied_parking_ids
+        ]
+        if len(parkings) == 0:
+            return None
+        return self.factory.generate_on_parking(
+            airport_ident,
+            callsign=callsign,
+            parking=random.choice(parkings)
+        )
+
+    def add_connection(self, connection: Connection):
+        if connection.aircraft is not None:
+            self.added.append((connection.callsign, connection.aircraft.flightplan))
+        return super().add_connection(connection)
+
+    def _on_lost_connection(self, connection: Connection):
+        if self.callsigns.get(connection.callsign) is connection:
+            self.removed.append(connection.callsign)
+        super()._on_lost_connection(connection)
+
+    def run_tick(self, after_time: timedelta, messages: list[TextMessage]):
+        for message in messages:
+            self.controller.handle_text_message(message)
+
+        for conn in list(self.connections.values()):
+            self.on_tick_connection(conn, after_time)
+        self.on_tick_connections_updated()
+
+        records = pack_records(
+            (
+                aircraft.callsign,
+                aircraft.position.latitude,
+                aircraft.position.longitude,
+                nan if aircraft.position.altitude_ is None else aircraft.position.altitude_.feet,
+                aircraft.speed.knots,
+                aircraft.heading.degrees,
+                str(aircraft.get_position_update_message()),
+            )
+            for aircraft in (conn.aircraft for conn in self.connections.values())
+            if aircraft is not None and aircraft.position is not None
+        )
+        reply = (self.added, self.removed, self.outbox, records)
+        self.added = []
+        self.removed = []
+        self.outbox = []
+        return reply
+
+    async def serve_shard(self, pipe, airport_ident: str, number_of_aircraft: int):
+        loop = asyncio.get_running_loop()
+        self.weather.attach(loop)
+        self.load_navdata()
+        self.spawn_bots(airport_ident, number_of_aircraft)
+        while True:
+            try:
+                request = await loop.run_in_executor(None, pipe.recv)
+            except EOFError:
+                break
+            if request is None:
+                break
+            seconds, messages = request
+            pipe.send(self.run_tick(timedelta(seconds=seconds), messages))
+        db.init.remove_sessions()
+
+
+def run_shard(shard_index: int, shard_count: int, pipe, airport_ident: str, number_of_aircraft: int):
+    """
+    Entry point of a shard worker process, simulating its share of the bots.
+    """
+    number_of_aircraft = number_of_aircraft // shard_count + \
+        (1 if shard_index < number_of_aircraft % shard_count else 0)
+    asyncio.run(
+        ShardServer(shard_index, shard_count).serve_shard(pipe, airport_ident, number_of_aircraft)
+    )
+
+
 training_server = TrainingServer(
     '0.0.0.0',
     Controller=TrainingController
@@ -2,7 +2,7 @@ import random
 import logging
 from datetime import timedelta
 
-from geopy.distance import Distance
+from utils.distance import Distance
 
 from aircrafts.b738 import B738
 from utils.squawk_code import generate_taipei_fir_squawk_code
@@ -11,7 +11,8 @@ from utils.flightplan import Flightplan
 from utils.physics import Speed
 from utils.squawk_code import choise_squawk_code_in_ranges, squawk_code_2_int
 from db.models import Parking
-from helpers import fill_position_on_legs, get_start_leg, get_airport_by_ident, get_approach_by_id
+from utils.procedure_compiler import procedure_compiler
+from helpers import get_start_leg, get_airport_by_ident, get_approach_by_id
 from aircrafts.bot_aircraft import BotAircraft, TransponderMode, AircraftStatus
 
 logger = logging.getLogger(__name__)
@@ -56,8 +57,8 @@ class AircraftFactory:
             usable_sids = flightplan.get_usable_sids()
             used_sid = random.choice(usable_sids)
             aircraft.set_sid_legs(
-                fill_position_on_legs(
-                    used_sid.approach_legs,
+                procedure_compiler.get_legs(
+                    used_sid,
                     flightplan.departure_airport
                 )
             )
@@ -82,19 +83,17 @@ class AircraftFactory:
             if len(usable_transitions) != 0:
                 used_transition = random.choice(usable_transitions)
 
-            approach_legs = used_approach.approach_legs if used_approach is not None else []
-            not_missed_approach_legs = [
-                al for al in approach_legs if al.is_missed == 0]
             aircraft.set_star_n_approach_legs(
-                fill_position_on_legs(
-                    used_star.approach_legs if used_star is not None else [],
+                procedure_compiler.get_legs(
+                    used_star,
                     flightplan.arrival_airport
-                ),
-                fill_position_on_legs(
-                    (used_transition.transition_legs if used_transition is not None else []) +
-                    not_missed_approach_legs,
-                    flightplan.arrival_airport
-                )
+                ) if used_star is not None else (),
+                procedure_compiler.get_legs(
+                    used_approach,
+                    flightplan.arrival_airport,
+                    used_transition,
+                    include_missed=False
+                ) if used_approach is not None else ()
             )
             aircraft.set_expect_runway_end(used_approach.runway_end)
 
@@ -237,12 +236,11 @@ class AircraftFactory:
             used_transition = None
             if len(usable_transitions) != 0:
                 used_transition = random.choice(usable_transitions)
-            approach_legs = used_approach.approach_legs if used_approach is not None else []
             aircraft.set_approach_legs(
-                fill_position_on_legs(
-                    (used_transition.transition_legs if used_transition is not None else []) +
-                    approach_legs,
-                    flightplan.arrival_airport
+                procedure_compiler.get_legs(
+                    used_approach,
+                    flightplan.arrival_airport,
+                    used_transition
                 )
             )
             aircraft.set_expect_runway_end(used_approach.runway_end)
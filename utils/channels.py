@@ -0,0 +1,44 @@
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from utils.connection import Connection
+
+
+class ChannelRegistry:
+    """
+    Track which connections listen to which frequency channel (e.g.
+    `@18700`). Connections which haven't tuned a frequency yet listen to
+    every channel.
+    """
+
+    def __init__(self):
+        self.channels: dict[str, set['Connection']] = {}
+        self.untuned: set['Connection'] = set()
+
+    def join(self, connection: 'Connection'):
+        if connection.frequency is None:
+            self.untuned.add(connection)
+        else:
+            self.tune(connection, connection.frequency)
+
+    def tune(self, connection: 'Connection', frequency: str):
+        self.leave(connection)
+        connection.frequency = frequency
+        if frequency not in self.channels:
+            self.channels[frequency] = set()
+        self.channels[frequency].add(connection)
+
+    def leave(self, connection: 'Connection'):
+        self.untuned.discard(connection)
+        listeners = self.channels.get(connection.frequency)
+        if listeners is None:
+            return
+        listeners.discard(connection)
+        if len(listeners) == 0:
+            self.channels.pop(connection.frequency)
+
+    def get_listeners(self, frequency: str) -> set['Connection']:
+        listeners = self.channels.get(frequency)
+        if listeners is None:
+            return self.untuned
+        return listeners | self.untuned
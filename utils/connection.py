@@ -1,12 +1,30 @@
 import asyncio
 from asyncio.transports import BaseTransport
+from collections import deque
 import logging
-from typing import Literal
+from typing import Literal, TYPE_CHECKING
 
 from aircrafts.aircraft import Aircraft
 from messages.TextMessage import TextMessage
 from messages.IMessage import IMessage
+from messages.Position import Position
 from utils.leg import Leg
+from utils.line_framer import LineFramer, FrameOverflowError
+
+if TYPE_CHECKING:
+    from utils.fsd_controller import FsdController
+
+
+# bytes buffered by the transport before pause_writing() is called
+WRITE_BUFFER_HIGH_WATER_MARK = 256 * 1024
+WRITE_BUFFER_LOW_WATER_MARK = 64 * 1024
+# slow clients are disconnected when exceeding these limits
+MAX_PENDING_MESSAGES = 1024
+MAX_PAUSED_SECONDS = 30
+
+
+def encode_message(msg: str | IMessage) -> bytes:
+    return (str(msg) + '\r\n').encode()
 
 
 class Connection(asyncio.Protocol):
@@ -17,21 +35,120 @@ class Connection(asyncio.Protocol):
         self.type: Literal['ATC', 'PILOT'] = 'PILOT'
         self.frequency: str | None = None
         self.aircraft: Aircraft | None = None
+        # last reported position and visibility range (nautical miles)
+        self.position: Position | None = None
+        self.visibility_range: float | None = None
         self.is_send_flightplan = False
         self.user = None
+        self.framer = LineFramer()
+        self.controller: 'FsdController | None' = None
+        # outbound messages queued while the transport is paused. Position
+        # updates are coalesced to the latest one per callsign.
+        self.is_paused = False
+        # aborted for being too slow, later messages are dropped
+        self.is_closing = False
+        self._pause_timer: asyncio.TimerHandle | None = None
+        self._pending_messages: deque[bytes] = deque()
+        self._pending_positions: dict[str, bytes] = {}
         self._on_connection_made = _on_connection_made
         self._on_lost_connection = _on_lost_connection
         self._on_message = _on_message
 
+    @property
+    def queue_depth(self):
+        return len(self._pending_messages) + len(self._pending_positions)
+
     def send(self, msg: str | IMessage):
         # logging.debug('Send msg to connection: %s' % msg)
+        if self.transport is None or self.is_closing:
+            return
+        data = encode_message(msg)
+        if self.is_paused:
+            self._pending_messages.append(data)
+            self._check_congestion()
+            return
+        self.write(data)
+
+    def send_position(self, callsign: str, msg: str | IMessage):
+        if self.transport is None or self.is_closing:
+            return
+        self.send_positions([(callsign, encode_message(msg))])
+
+    def send_positions(self, frames: list[tuple[str, bytes]], payload: bytes | None = None):
+        """
+        params:
+            frames: encoded position updates by callsign
+            payload: the frames already joined, if shared with other connections
+        """
+        if self.transport is None or self.is_closing:
+            return
+        if self.is_paused:
+            for callsign, frame in frames:
+                self._pending_positions[callsign] = frame
+            self._check_congestion()
+            return
+        self.write(payload if payload is not None else b''.join(
+            frame for _, frame in frames))
+
+    def write(self, data: bytes):
+        """
+        Write already encoded frames, e.g. a broadcast payload shared by
+        every connection in a tick.
+        """
         try:
-            if self.transport is None:
+            if self.transport is None or self.is_closing:
                 return
-            self.transport.write((str(msg) + '\r\n').encode())
+            self.transport.write(data)
         except Exception as err:
             logging.exception(err)
 
+    def _check_congestion(self):
+        if len(self._pending_messages) > MAX_PENDING_MESSAGES:
+            self.abort()
+
+    def _cancel_pause_timer(self):
+        if self._pause_timer is not None:
+            self._pause_timer.cancel()
+            self._pause_timer = None
+
+    def abort(self):
+        """
+        Disconnect a slow connection, once.
+        """
+        if self.is_closing:
+            return
+        logging.warning(
+            'Disconnect slow connection %s, %d messages pending',
+            self.id,
+            self.queue_depth
+        )
+        self.is_closing = True
+        self._cancel_pause_timer()
+        self._pending_messages.clear()
+        self._pending_positions.clear()
+        self.transport.abort()
+
+    def pause_writing(self):
+        self.is_paused = True
+        # a client paused for too long is disconnected even when nothing
+        # is queued meanwhile
+        self._cancel_pause_timer()
+        self._pause_timer = asyncio.get_running_loop().call_later(
+            MAX_PAUSED_SECONDS,
+            self.abort
+        )
+
+    def resume_writing(self):
+        self.is_paused = False
+        self._cancel_pause_timer()
+        # text and control messages first
+        data = b''.join(self._pending_messages) + \
+            b''.join(self._pending_positions.values())
+        self._pending_messages.clear()
+        self._pending_positions.clear()
+        if len(data) != 0:
+            self.write(data)
+
     def send_text(self, target: str, msg: str):
         return self.send(
             TextMessage(
@@ -49,11 +166,26 @@ class Connection(asyncio.Protocol):
         logging.info('Connection from %s:%s' % peername)
         self.id = peername
         self.transport = transport
+        transport.set_write_buffer_limits(
+            high=WRITE_BUFFER_HIGH_WATER_MARK,
+            low=WRITE_BUFFER_LOW_WATER_MARK
+        )
 
         self._on_connection_made(self)
 
     def connection_lost(self, exc):
+        self.is_closing = True
+        self._cancel_pause_timer()
+        self._pending_messages.clear()
+        self._pending_positions.clear()
         self._on_lost_connection(self)
 
     def data_received(self, data):
-        self._on_message(self, data.decode().rstrip())
+        try:
+            lines = self.framer.feed(data)
+        except FrameOverflowError as err:
+            logging.warning('Close connection %s: %s', self.id, err)
+            self.transport.close()
+            return
+        if len(lines) != 0:
+            self._on_message(self, lines)
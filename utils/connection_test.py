@@ -0,0 +1,114 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from utils import connection as connection_module
+from utils.connection import Connection
+
+
+class FakeTransport:
+    def __init__(self):
+        self.writes: list[bytes] = []
+        self.aborted = False
+        self.buffer_limits = None
+
+    def write(self, data: bytes):
+        self.writes.append(data)
+
+    def abort(self):
+        self.aborted = True
+
+    def set_write_buffer_limits(self, high=None, low=None):
+        self.buffer_limits = (high, low)
+
+    def get_extra_info(self, name):
+        return ('127.0.0.1', 12345)
+
+
+def create_connection():
+    conn = Connection(lambda conn: None, lambda conn: None,
+                      lambda conn, lines: None)
+    conn.connection_made(FakeTransport())
+    return conn
+
+
+class TestConnection(unittest.IsolatedAsyncioTestCase):
+
+    def test_set_write_buffer_limits(self):
+        conn = create_connection()
+        self.assertEqual(
+            conn.transport.buffer_limits,
+            (connection_module.WRITE_BUFFER_HIGH_WATER_MARK,
+             connection_module.WRITE_BUFFER_LOW_WATER_MARK)
+        )
+
+    def test_write_immediately_when_not_paused(self):
+        conn = create_connection()
+        conn.send('#TMSERVER:*:hello')
+        conn.send_position('CAL123', '@N:CAL123')
+        self.assertEqual(
+            conn.transport.writes,
+            [b'#TMSERVER:*:hello\r\n', b'@N:CAL123\r\n']
+        )
+        self.assertEqual(conn.queue_depth, 0)
+
+    async def test_queue_while_paused(self):
+        conn = create_connection()
+        conn.pause_writing()
+        conn.send_position('CAL123', '@N:CAL123:1')
+        conn.send('#TMSERVER:*:hello')
+        conn.send_positions([('EVA456', b'@N:EVA456\r\n')])
+        conn.send_position('CAL123', '@N:CAL123:2')
+        self.assertEqual(conn.transport.writes, [])
+        self.assertEqual(conn.queue_depth, 3)
+
+        conn.resume_writing()
+        # control messages first, then the latest position per callsign
+        self.assertEqual(
+            conn.transport.writes,
+            [b'#TMSERVER:*:hello\r\n@N:CAL123:2\r\n@N:EVA456\r\n']
+        )
+        self.assertEqual(conn.queue_depth, 0)
+
+    async def test_evict_when_queue_overflows(self):
+        conn = create_connection()
+        conn.pause_writing()
+        for i in range(connection_module.MAX_PENDING_MESSAGES):
+            conn.send('#TMSERVER:*:%d' % i)
+        self.assertFalse(conn.transport.aborted)
+        conn.send('#TMSERVER:*:overflow')
+        self.assertTrue(conn.transport.aborted)
+        self.assertEqual(conn.queue_depth, 0)
+
+    @patch.object(connection_module, 'MAX_PAUSED_SECONDS', 0.01)
+    async def test_evict_when_paused_too_long(self):
+        conn = create_connection()
+        conn.pause_writing()
+        # nothing queued, the timer of the pause disconnects it
+        await asyncio.sleep(0.05)
+        self.assertTrue(conn.transport.aborted)
+
+    @patch.object(connection_module, 'MAX_PAUSED_SECONDS', 0.01)
+    async def test_resume_before_timeout(self):
+        conn = create_connection()
+        conn.pause_writing()
+        conn.resume_writing()
+        await asyncio.sleep(0.05)
+        self.assertFalse(conn.transport.aborted)
+
+    async def test_drop_messages_after_abort(self):
+        conn = create_connection()
+        conn.pause_writing()
+        conn.abort()
+        conn.transport.aborted = False
+        conn.abort()
+        self.assertFalse(conn.transport.aborted)
+        conn.resume_writing()
+        conn.send('#TMSERVER:*:hello')
+        conn.send_position('CAL123', '@N:CAL123')
+        self.assertEqual(conn.transport.writes, [])
+        self.assertEqual(conn.queue_depth, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
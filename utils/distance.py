@@ -0,0 +1,159 @@
+METERS_PER_KILOMETER = 1000.0
+METERS_PER_MILE = 1609.344
+METERS_PER_FOOT = 0.3048
+METERS_PER_NAUTICAL_MILE = 1852.0
+
+UNITS = {
+    'kilometers': METERS_PER_KILOMETER,
+    'km': METERS_PER_KILOMETER,
+    'meters': 1.0,
+    'm': 1.0,
+    'miles': METERS_PER_MILE,
+    'mi': METERS_PER_MILE,
+    'feet': METERS_PER_FOOT,
+    'ft': METERS_PER_FOOT,
+    'nautical': METERS_PER_NAUTICAL_MILE,
+    'nm': METERS_PER_NAUTICAL_MILE,
+}
+
+
+class Distance:
+    """
+    A distance stored as a float of meters.
+
+    Constructed like geopy's Distance: positional values are kilometers,
+    keyword values in any of the units are added together.
+    """
+    __slots__ = ('_meters',)
+
+    def __init__(self, *args: float, **kwargs: float):
+        meters = 0.0
+        for value in args:
+            meters += value * METERS_PER_KILOMETER
+        for unit, value in kwargs.items():
+            try:
+                meters += value * UNITS[unit]
+            except KeyError:
+                raise TypeError(f'Unknown distance unit {unit}') from None
+        self._meters = meters
+
+    @classmethod
+    def from_meters(cls, meters: float):
+        distance = cls.__new__(cls)
+        distance._meters = meters
+        return distance
+
+    def __add__(self, other):
+        if isinstance(other, Distance):
+            return Distance.from_meters(self._meters + other._meters)
+        raise TypeError(
+            "Distance instance must be added with Distance instance."
+        )
+
+    def __neg__(self):
+        return Distance.from_meters(-self._meters)
+
+    def __sub__(self, other):
+        if isinstance(other, Distance):
+            return Distance.from_meters(self._meters - other._meters)
+        raise TypeError(
+            "Distance instance must be subtracted with Distance instance."
+        )
+
+    def __mul__(self, other):
+        if isinstance(other, Distance):
+            raise TypeError(
+                "Distance instance must be multiplicated with numbers."
+            )
+        return Distance.from_meters(self._meters * other)
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def __truediv__(self, other):
+        if isinstance(other, Distance):
+            return self._meters / other._meters
+        return Distance.from_meters(self._meters / other)
+
+    def __floordiv__(self, other):
+        if isinstance(other, Distance):
+            return self._meters // other._meters
+        return Distance.from_meters(self._meters // other)
+
+    def __abs__(self):
+        return Distance.from_meters(abs(self._meters))
+
+    def __bool__(self):
+        return bool(self._meters)
+
+    def __repr__(self):  # pragma: no cover
+        return 'Distance(%s)' % (self._meters / METERS_PER_KILOMETER)
+
+    def __str__(self):  # pragma: no cover
+        return '%s km' % (self._meters / METERS_PER_KILOMETER)
+
+    def __hash__(self):
+        return hash(self._meters)
+
+    def __eq__(self, other):
+        if isinstance(other, Distance):
+            return self._meters == other._meters
+        return NotImplemented
+
+    def __ne__(self, other):
+        if isinstance(other, Distance):
+            return self._meters != other._meters
+        return NotImplemented
+
+    def __gt__(self, other):
+        if isinstance(other, Distance):
+            return self._meters > other._meters
+        return NotImplemented
+
+    def __lt__(self, other):
+        if isinstance(other, Distance):
+            return self._meters < other._meters
+        return NotImplemented
+
+    def __ge__(self, other):
+        if isinstance(other, Distance):
+            return self._meters >= other._meters
+        return NotImplemented
+
+    def __le__(self, other):
+        if isinstance(other, Distance):
+            return self._meters <= other._meters
+        return NotImplemented
+
+    @property
+    def meters(self) -> float:
+        return self._meters
+
+    m = meters
+
+    @property
+    def kilometers(self) -> float:
+        return self._meters / METERS_PER_KILOMETER
+
+    km = kilometers
+
+    @property
+    def miles(self) -> float:
+        return self._meters / METERS_PER_MILE
+
+    mi = miles
+
+    @property
+    def feet(self) -> float:
+        return self._meters / METERS_PER_FOOT
+
+    ft = feet
+
+    @property
+    def nautical(self) -> float:
+        return self._meters / METERS_PER_NAUTICAL_MILE
+
+    nm = nautical
+
+
+ZERO_DISTANCE = Distance.from_meters(0.0)
@@ -0,0 +1,50 @@
+import unittest
+
+from geopy.distance import Distance as GeopyDistance
+
+from utils.distance import Distance
+
+
+class TestDistance(unittest.TestCase):
+
+    def test_init_like_geopy(self):
+        for args, kwargs in (
+            ((1.5,), {}),
+            ((), {'meters': 20}),
+            ((), {'feet': 10000}),
+            ((), {'nautical': 3}),
+            ((), {'miles': 2}),
+            ((), {'feet': 100, 'meters': 1}),
+        ):
+            distance = Distance(*args, **kwargs)
+            expected = GeopyDistance(*args, **kwargs)
+            self.assertAlmostEqual(distance.meters, expected.meters)
+            self.assertAlmostEqual(distance.feet, expected.feet, places=6)
+            self.assertAlmostEqual(distance.nautical, expected.nautical)
+            self.assertAlmostEqual(distance.km, expected.km)
+
+    def test_unknown_unit(self):
+        with self.assertRaises(TypeError):
+            Distance(yards=1)
+
+    def test_arithmetic(self):
+        distance = Distance(meters=10) + Distance(meters=5) - Distance(meters=3)
+        self.assertEqual(distance, Distance(meters=12))
+        self.assertEqual((distance * 2).meters, 24)
+        self.assertEqual((2 * distance).meters, 24)
+        self.assertEqual(distance / Distance(meters=4), 3)
+        self.assertEqual((distance / 4).meters, 3)
+        self.assertEqual(abs(-distance), distance)
+        self.assertFalse(Distance(0))
+        with self.assertRaises(TypeError):
+            distance + 1
+
+    def test_compare(self):
+        self.assertLess(Distance(feet=9000), Distance(feet=10000))
+        self.assertGreaterEqual(Distance(nautical=1), Distance(meters=1852))
+        self.assertEqual(max(Distance(meters=1), Distance(meters=2)).meters, 2)
+        self.assertNotEqual(Distance(meters=1), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,19 +1,20 @@
 from typing import Literal
 
-from geopy.distance import Distance
+from utils.distance import Distance
 
 from messages.FlightplanMessage import FlightplanMessage
 from messages.Time import Time
-from helpers import (
-    get_airways_between_fixs,
-    airways_to_legs,
-    get_sid_approaches_by_airport_ident,
-    get_star_approaches_by_airport_ident,
-    get_approach_approaches_by_airport_ident
-)
+from helpers import get_airway_legs_between_fixs
 from utils.leg import Leg
+from utils.lru_cache import LRUCache
 from utils.physics import Speed
+from utils.procedure_catalogue import procedure_catalogues
 from db.models import Approach
+from db.navdata import navdata
+
+# expanded en-route legs by (route, start leg ident, latitude, longitude)
+route_legs_cache: LRUCache[tuple[str, str, float, float], tuple[Leg, ...]] = LRUCache(256)
+navdata.on_reload(route_legs_cache.clear)
 
 
 class Flightplan:
@@ -65,16 +66,27 @@ class Flightplan:
     def aircraft_type(self):
         return f'{self.number_of_aircraft}/{self.aircraft_icao}/{self.wake_turbulence_category}-{self.equipment}/{self.transponder_types}'
 
-    def get_legs(self, start_leg: Leg):
+    def get_legs(self, start_leg: Leg) -> tuple[Leg, ...]:
+        """
+        En-route legs from the start leg, shared by flightplans of the same
+        route.
+        """
+        key = (self.route, start_leg.ident, start_leg.laty, start_leg.lonx)
+        legs = route_legs_cache.get(key)
+        if legs is None:
+            legs = tuple(self._expand_route(start_leg))
+            route_legs_cache.put(key, legs)
+        return legs
+
+    def _expand_route(self, start_leg: Leg):
         legs = [start_leg]
         items = self.route.split(' ')
         items.pop(0)  # popup sid fix
         while len(items) != 0:
             airway_name = items.pop(0)
             to_fix_name = items.pop(0)
-            new_airways = get_airways_between_fixs(
+            new_legs = get_airway_legs_between_fixs(
                 airway_name, legs[-1].fix, to_fix_name)
-            new_legs = airways_to_legs(new_airways)
             extended_legs = new_legs[1:]
             legs.extend(extended_legs)
         return legs
@@ -102,34 +114,21 @@ class Flightplan:
         )
 
     def get_usable_sids(self):
-        sid_approaches = get_sid_approaches_by_airport_ident(
-            self.departure_airport)
         end_leg_waypoint_ident = self.route.split(' ')[0]
-        return [
-            sa for sa in sid_approaches if sa.approach_legs[-1].fix_ident == end_leg_waypoint_ident
-        ]
+        return procedure_catalogues.get(
+            self.departure_airport
+        ).get_sids_by_exit_fix(end_leg_waypoint_ident)
 
     def get_usable_stars(self):
-        star_approaches = get_star_approaches_by_airport_ident(
-            self.arrival_airport)
         start_leg_waypoint_ident = self.route.split(' ')[-1]
-        return [
-            sa for sa in star_approaches if sa.approach_legs[0].fix_ident == start_leg_waypoint_ident
-        ]
+        return procedure_catalogues.get(
+            self.arrival_airport
+        ).get_stars_by_entry_fix(start_leg_waypoint_ident)
 
     def get_usable_approaches(self, star_approach: Approach | None = None):
-        approach_approaches = get_approach_approaches_by_airport_ident(
-            self.arrival_airport)
+        catalogue = procedure_catalogues.get(self.arrival_airport)
         if star_approach is None:
-            return approach_approaches
+            return catalogue.approaches
 
         start_leg_waypoint_ident = star_approach.approach_legs[-1].fix_ident
-        usable_approaches: list[Approach] = []
-        for aa in approach_approaches:
-            if aa.approach_legs[0].fix_ident == start_leg_waypoint_ident:
-                usable_approaches.append(aa)
-            else:
-                for t in aa.transitions:
-                    if t.fix_ident == start_leg_waypoint_ident:
-                        usable_approaches.append(aa)
-        return usable_approaches
+        return catalogue.get_approaches_by_entry_fix(start_leg_waypoint_ident)
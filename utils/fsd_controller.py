@@ -1,5 +1,9 @@
 from logging import getLogger
+from time import perf_counter
+from typing import TYPE_CHECKING
 
+from messages.ATISMessage import ATISMessage
+from messages.ATISCancelMessage import ATISCancelMessage
 from messages.AddATCMessage import AddATCMessage
 from messages.AddPilotMessage import AddPilotMessage
 from messages.AssumeControlMessage import AssumeControlMessage
@@ -18,87 +22,83 @@ from messages.InformationReplyMessage import InformationReplyMessage
 from messages.TextMessage import TextMessage
 from messages.IMessage import IMessage
 from messages.PilotPositionUpdateMessage import PilotPositionUpdateMessage
+from messages.Position import Position
 from utils.connection import Connection
+from utils.metrics import CommandMetrics
+from utils.interest import is_in_range, get_atc_visibility_range, PILOT_VISIBILITY_RANGE
 from utils.user import User
+from helpers import frequency_to_abbr
+
+if TYPE_CHECKING:
+    from utils.fsd_server import FsdServer
 
 logger = getLogger(__name__)
 
+# ATC clients without a primary frequency
+NO_FREQUENCY = '@99998'
+
+
+def handle(message_class: type[IMessage]):
+    """
+    Register the decorated method as the handler of `message_class.command`.
+    Subclasses overriding the method keep the registration.
+    """
+    def decorator(func):
+        func.handled_message_class = message_class
+        return func
+    return decorator
+
 
 class FsdController:
-    def __init__(self, source_conn: Connection, connections: dict[str, Connection]):
+    # command prefix -> (message class, handler method name)
+    handlers: dict[str, tuple[type[IMessage], str | None]] = {}
+    metrics = CommandMetrics()
+
+    def __init__(self, source_conn: Connection, server: 'FsdServer'):
         self.source_conn = source_conn
-        self.connections = connections
+        self.server = server
+        self.connections = server.connections
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.build_handlers()
+
+    @classmethod
+    def build_handlers(cls):
+        cls.handlers = {**cls.handlers}
+        for name, attr in vars(cls).items():
+            message_class = getattr(attr, 'handled_message_class', None)
+            if message_class is not None:
+                cls.handlers[message_class.command] = (message_class, name)
+
+    @classmethod
+    def register(cls, message_class: type[IMessage], handler_name: str | None = None):
+        """
+        Register a handler of the command. The message is only logged if
+        `handler_name` is None.
+        """
+        cls.handlers = {**cls.handlers, message_class.command: (message_class, handler_name)}
 
     def route(self, raw_message: str):
-        major_command = raw_message[0]
-        logger.debug('Data received: %s' % raw_message)
-        message = None
-        if major_command == '#':  # CommunicationMessage
-            minor_command = raw_message[1:3]
-            if minor_command == 'AT':
-                logger.debug('Received ATISMessage')
-            if minor_command == 'AC':
-                logger.debug('Received ATISCancelMessage')
-            elif minor_command == 'AA':
-                message = AddATCMessage.parse_raw_message(raw_message)
-                self.handle_add_atc_message(message)
-            elif minor_command == 'AP':
-                message = AddPilotMessage.parse_raw_message(raw_message)
-                self.handle_add_pilot_message(message)
-            elif minor_command == 'TM':
-                message = TextMessage.parse_raw_message(raw_message)
-                self.handle_text_message(message)
-        elif major_command == '%':  # PositionUpdateMessage
-            message = ATCPositionUpdateMessage.parse_raw_message(raw_message)
-            self.handle_atc_position_update_message(message)
-        elif major_command == '@':  # PilotPositionUpdateMessage
-            message = PilotPositionUpdateMessage.parse_raw_message(raw_message)
-            self.handle_pilot_position_update_message(message)
-        elif major_command == '$':  # AdministrativeMessage
-            minor_command = raw_message[1:3]
-            if minor_command == 'CQ':
-                message = InformationRequestMessage.parse_raw_message(
-                    raw_message)
-                self.handle_information_request_message(message)
-        elif major_command == '=':  # ClearanceMessage
-            minor_command = raw_message[1]
-            if minor_command == 'A':
-                message = AssumeControlMessage.parse_raw_message(raw_message)
-                self.handle_assume_control_message(message)
-            if minor_command == 'R':
-                message = ReleaseControlMessage.parse_raw_message(raw_message)
-                self.handle_release_control_message(message)
-            if minor_command == 'W':
-                message = ClearedWaypointMessage.parse_raw_message(raw_message)
-                self.handle_cleared_waypoint_message(message)
-            if minor_command == 'S':
-                message = ClearedSpeedMessage.parse_raw_message(raw_message)
-                self.handle_cleared_speed_message(message)
-            if minor_command == 'F':
-                message = ClearedFlightlevelMessage.parse_raw_message(
-                    raw_message)
-                self.handle_cleared_flightlevel_message(message)
-        elif major_command == '!':  # VerificationMessage
-            minor_command = raw_message[1]
-            if minor_command == 'S':
-                logger.debug('Received ServerVerificationMessage')
-            if minor_command == 'C':
-                message = ClientVerificationMessage.parse_raw_message(
-                    raw_message)
-                self.handle_client_verification_message(message)
-        elif major_command == '-':  # PilotMessage
-            minor_command = raw_message[1]
-            if minor_command == 'PR':
-                message = RequestPlaneInfoMessage.parse_raw_message(
-                    raw_message)
-                self.handle_request_plane_info_message(message)
-            if minor_command == 'MR':
-                message = RequestPlaneParamsMessage.parse_raw_message(
-                    raw_message)
-                self.handle_request_plane_params_message(message)
-        else:
-            logger.debug('Unknown data received: %s' % raw_message)
+        handler = self.handlers.get(raw_message[:3]) \
+            or self.handlers.get(raw_message[:2]) \
+            or self.handlers.get(raw_message[:1])
+        if handler is None:
+            logger.debug('Unknown data received: %s', raw_message)
+            return None
+
+        message_class, handler_name = handler
+        if handler_name is None:
+            logger.debug('Received %s', message_class.__name__)
+            return None
 
+        started = perf_counter()
+        message = message_class.parse_raw_message(raw_message)
+        getattr(self, handler_name)(message)
+        self.metrics.observe(
+            message_class.command,
+            perf_counter() - started
+        )
         return message
 
     def relay_to_other_connections(self, message: IMessage):
@@ -107,22 +107,51 @@ class FsdController:
                 continue
             connection.send(message)
 
+    def relay_to_visible_connections(
+        self,
+        message: ATCPositionUpdateMessage | PilotPositionUpdateMessage,
+        position: Position
+    ):
+        for connection in self.connections.values():
+            if connection == self.source_conn or not is_in_range(connection, position):
+                continue
+            connection.send_position(message.callsign, message)
+
     def send_to_all_connections(self, message: IMessage):
         for connection in self.connections.values():
             connection.send(message)
 
-    def send_text_to_all_connections(self, source: str, target: str, msg: str):
-        for connection in self.connections.values():
-            connection.send(
-                TextMessage(
-                    source,
-                    target,
-                    msg
-                )
-            )
+    def send_text_to_channel(self, source: str, target: str, msg: str):
+        self.deliver_text_message(TextMessage(source, target, msg))
+
+    def deliver_text_message(self, message: TextMessage, exclude: Connection | None = None):
+        """
+        Deliver to the callsign, or the listeners of the frequencies
+        (e.g. `@18700&@21800`). Other destinations are broadcasted.
+        """
+        # private message
+        target_conn = self.server.get_connection_by_callsign(
+            message.destination)
+        if target_conn is not None:
+            target_conn.send(message)
+            return
+
+        if message.destination.startswith('@'):
+            listeners: set[Connection] = set()
+            for frequency in message.destination.split('&'):
+                listeners |= self.server.channels.get_listeners(frequency)
+        else:
+            listeners = self.connections.values()
+        for connection in listeners:
+            if connection == exclude:
+                continue
+            connection.send(message)
 
+    @handle(AddATCMessage)
     def handle_add_atc_message(self, message: AddATCMessage):
         # self.relay_to_other_connections(message)
+        self.source_conn.type = 'ATC'
+        self.server.set_callsign(self.source_conn, message.source)
         self.source_conn.user = User(
             message.real_name,
             message.rating,
@@ -136,7 +165,10 @@ class FsdController:
             )
         )
 
+    @handle(AddPilotMessage)
     def handle_add_pilot_message(self, message: AddPilotMessage):
+        self.source_conn.type = 'PILOT'
+        self.server.set_callsign(self.source_conn, message.source)
         self.source_conn.user = User(
             message.real_name,
             message.rating,
@@ -146,6 +178,7 @@ class FsdController:
             ServerVerificationMessage('SERVER', message.source, 0)
         )
 
+    @handle(ClientVerificationMessage)
     def handle_client_verification_message(self, message: ClientVerificationMessage):
         self.source_conn.send(
             RegistrationInformationMessage(
@@ -163,23 +196,36 @@ class FsdController:
             )
         )
 
+    @handle(TextMessage)
     def handle_text_message(self, message: TextMessage):
-        self.relay_to_other_connections(message)
+        self.deliver_text_message(message, exclude=self.source_conn)
 
+    @handle(ATCPositionUpdateMessage)
     def handle_atc_position_update_message(self, message: ATCPositionUpdateMessage):
-        self.relay_to_other_connections(message)
+        if message.frequency != self.source_conn.frequency and message.frequency != NO_FREQUENCY:
+            self.server.channels.tune(self.source_conn, message.frequency)
+        self.source_conn.position = message.position
+        self.source_conn.visibility_range = get_atc_visibility_range(
+            message.facility,
+            message.visibility
+        )
+        self.relay_to_visible_connections(message, message.position)
 
+    @handle(PilotPositionUpdateMessage)
     def handle_pilot_position_update_message(self, message: PilotPositionUpdateMessage):
-        self.relay_to_other_connections(message)
+        self.source_conn.position = message.position
+        self.source_conn.visibility_range = PILOT_VISIBILITY_RANGE
+        self.relay_to_visible_connections(message, message.position)
 
+    @handle(InformationRequestMessage)
     def handle_information_request_message(self, message: InformationRequestMessage):
         if message.sub_command == InformationCommand.FLIGHTPLAN.value:
             callsign = message.fields[0]
-            for conn in self.connections.values():
-                if conn.type == 'PILOT' and conn.aircraft is not None and conn.aircraft.callsign == callsign:
-                    self.source_conn.send(
-                        conn.aircraft.get_flightplan_message(callsign)
-                    )
+            conn = self.server.get_connection_by_callsign(callsign)
+            if conn is not None and conn.type == 'PILOT' and conn.aircraft is not None:
+                self.source_conn.send(
+                    conn.aircraft.get_flightplan_message(callsign)
+                )
         elif message.sub_command == InformationCommand.NAME.value:
             self.source_conn.send(
                 str(
@@ -206,23 +252,48 @@ class FsdController:
                 )
             )
 
+    @handle(InformationReplyMessage)
+    def handle_information_reply_message(self, message: InformationReplyMessage):
+        if message.sub_command == InformationCommand.COM.value and len(message.fields) != 0:
+            self.server.channels.tune(
+                self.source_conn,
+                frequency_to_abbr(message.fields[0])
+            )
+        target_conn = self.server.get_connection_by_callsign(
+            message.destination)
+        if target_conn is not None:
+            target_conn.send(message)
+
+    @handle(AssumeControlMessage)
     def handle_assume_control_message(self, message: AssumeControlMessage):
         self.relay_to_other_connections(message)
 
+    @handle(ReleaseControlMessage)
     def handle_release_control_message(self, message: ReleaseControlMessage):
         self.relay_to_other_connections(message)
 
+    @handle(ClearedWaypointMessage)
     def handle_cleared_waypoint_message(self, message: ClearedWaypointMessage):
         self.relay_to_other_connections(message)
 
+    @handle(ClearedSpeedMessage)
     def handle_cleared_speed_message(self, message: ClearedSpeedMessage):
         self.relay_to_other_connections(message)
 
+    @handle(ClearedFlightlevelMessage)
     def handle_cleared_flightlevel_message(self, message: ClearedFlightlevelMessage):
         self.relay_to_other_connections(message)
 
+    @handle(RequestPlaneInfoMessage)
     def handle_request_plane_info_message(self, message: RequestPlaneInfoMessage):
         pass
 
+    @handle(RequestPlaneParamsMessage)
     def handle_request_plane_params_message(self, message: RequestPlaneParamsMessage):
         pass
+
+
+FsdController.build_handlers()
+FsdController.register(ATISMessage)
+FsdController.register(ATISCancelMessage)
+FsdController.register(ServerVerificationMessage)
@@ -0,0 +1,103 @@
+import unittest
+
+from messages.RequestPlaneInfoMessage import RequestPlaneInfoMessage
+from messages.TextMessage import TextMessage
+from messages.DeletePilotMessage import DeletePilotMessage
+from utils.connection import Connection
+from utils.fsd_controller import FsdController, handle
+from utils.fsd_server import FsdServer
+
+
+class FakeTransport:
+    def __init__(self):
+        self.writes: list[bytes] = []
+
+    def write(self, data: bytes):
+        self.writes.append(data)
+
+
+def create_connection(server: FsdServer, id: str):
+    conn = Connection(None, None, None)
+    conn.id = id
+    conn.transport = FakeTransport()
+    return server.add_connection(conn)
+
+
+class TestFsdController(unittest.TestCase):
+
+    def test_route_text_message(self):
+        server = FsdServer()
+        source = create_connection(server, 'source')
+        other = create_connection(server, 'other')
+        controller = source.controller
+
+        message = controller.route('#TMRCTP_TWR:@18700:hello')
+
+        self.assertIsInstance(message, TextMessage)
+        self.assertEqual(other.transport.writes, [b'#TMRCTP_TWR:@18700:hello\r\n'])
+        self.assertEqual(source.transport.writes, [])
+        self.assertGreaterEqual(FsdController.metrics.counts['#TM'], 1)
+
+    def test_route_private_text_message(self):
+        server = FsdServer()
+        source = create_connection(server, 'source')
+        target = create_connection(server, 'target')
+        other = create_connection(server, 'other')
+        server.set_callsign(target, 'CAL123')
+
+        source.controller.route('#TMRCTP_TWR:CAL123:hello')
+
+        self.assertEqual(target.transport.writes, [b'#TMRCTP_TWR:CAL123:hello\r\n'])
+        self.assertEqual(other.transport.writes, [])
+
+    def test_route_frequency_text_message(self):
+        server = FsdServer()
+        source = create_connection(server, 'source')
+        tower = create_connection(server, 'tower')
+        ground = create_connection(server, 'ground')
+        pilot = create_connection(server, 'pilot')
+        untuned = create_connection(server, 'untuned')
+        source.controller.route('%RCTP_TWR:18700:4:50:5:25.07:121.22:0')
+        tower.controller.route('%RCTP_TWR2:18700:4:50:5:25.07:121.22:0')
+        ground.controller.route('%RCTP_GND:21800:3:20:5:25.07:121.22:0')
+        pilot.controller.route('$CRCAL123:RCTP_TWR:C?:118.700')
+        for conn in (source, tower, ground, pilot, untuned):
+            conn.transport.writes.clear()
+
+        source.controller.route('#TMRCTP_TWR:@18700:hello')
+
+        self.assertEqual(pilot.frequency, '@18700')
+        for conn in (tower, pilot, untuned):
+            self.assertEqual(conn.transport.writes, [b'#TMRCTP_TWR:@18700:hello\r\n'])
+        self.assertEqual(ground.transport.writes, [])
+        self.assertEqual(source.transport.writes, [])
+
+    def test_route_pilot_message(self):
+        controller = create_connection(FsdServer(), 'source').controller
+        self.assertIsInstance(
+            controller.route('-PRCAL123:RCTP_TWR'),
+            RequestPlaneInfoMessage
+        )
+
+    def test_route_unknown_message(self):
+        controller = create_connection(FsdServer(), 'source').controller
+        self.assertIsNone(controller.route('#XXunknown'))
+        self.assertIsNone(controller.route('#ATRCTP_ATIS:@18700:A:info'))
+
+    def test_register_handler_in_subclass(self):
+        class Controller(FsdController):
+            received = []
+
+            @handle(DeletePilotMessage)
+            def handle_delete_pilot_message(self, message):
+                self.received.append(message)
+
+        server = FsdServer(Controller=Controller)
+        controller = create_connection(server, 'source').controller
+        controller.route('#DPCAL123')
+        self.assertEqual(len(Controller.received), 1)
+        self.assertNotIn('#DP', FsdController.handlers)
+
+
+if __name__ == '__main__':
+    unittest.main()
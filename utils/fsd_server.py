@@ -1,10 +1,13 @@
 import asyncio
-from datetime import timedelta, datetime
+from datetime import timedelta
 from logging import getLogger
-import threading
 
 from utils.fsd_controller import FsdController
-from utils.connection import Connection
+from utils.channels import ChannelRegistry
+from utils.connection import Connection, encode_message
+from utils.interest import SpatialGrid
+from utils.metrics import RateCounter
+from utils.tick import TickScheduler
 
 
 TICK_INTERVAL = 2
@@ -12,16 +15,6 @@ TICK_INTERVAL = 2
 logger = getLogger(__name__)
 
 
-def set_interval(func, sec: float, last_time: datetime):
-    def func_wrapper():
-        now = datetime.now()
-        set_interval(func, sec, now)
-        func(now - last_time)
-    t = threading.Timer(sec, func_wrapper)
-    t.start()
-    return t
-
-
 class FsdServer:
     def __init__(
         self,
@@ -32,48 +25,116 @@ class FsdServer:
         self.host = host
         self.port = port
         self.connections: dict[str, Connection] = {}
+        self.callsigns: dict[str, Connection] = {}
+        self.channels = ChannelRegistry()
         self.Controller = Controller
+        self.tick_scheduler: TickScheduler | None = None
+        self.parsed_messages = RateCounter()
 
     def start_tick(self):
         def send_all_aircraft_position(after_time: timedelta):
-            self.on_tick()
+            self.on_tick(after_time)
 
             # copy to avoid RuntimeError: dictionary changed size during iteration
-            for conn in self.connections.values():
+            connections = list(self.connections.values())
+            for conn in connections:
                 self.on_tick_connection(conn, after_time)
-
-                if conn.type != 'PILOT' or conn.aircraft is None:
-                    continue
-
-                aircraft = conn.aircraft
-                position_update_message = aircraft.get_position_update_message()
-                for connection in self.connections.values():
-                    connection.send(str(position_update_message))
+            self.on_tick_connections_updated()
+            self.broadcast_positions(connections)
             # average 200 seconds to generate an new aircraft
             # if randint(0, 100) > 98:
             #     factory.generate_w_random_situation()
-        return set_interval(
-            send_all_aircraft_position,
+        self.tick_scheduler = TickScheduler(
             TICK_INTERVAL,
-            datetime.now()
+            send_all_aircraft_position
         )
-
-    def _on_text_message(self, connection: Connection, raw_message: str):
-        controller = self.Controller(connection, self.connections)
-        for raw_message_row in raw_message.split('\r\n'):
-            print('Data row received: %s' % raw_message_row)
+        return self.tick_scheduler.start()
+
+    def broadcast_positions(self, connections: list[Connection]):
+        """
+        Serialize every aircraft position once, bucket the frames in a
+        spatial grid and send each connection only the frames within its
+        visibility range, with a single write.
+        """
+        frames: list[tuple[str, bytes]] = []
+        grid: SpatialGrid[tuple[str, bytes]] = SpatialGrid()
+        for conn in connections:
+            if conn.type != 'PILOT' or conn.aircraft is None:
+                continue
+            frame = (
+                conn.aircraft.callsign,
+                encode_message(conn.aircraft.get_position_update_message())
+            )
+            frames.append(frame)
+            position = conn.aircraft.position
+            grid.insert(position.latitude, position.longitude, frame)
+        if len(frames) == 0:
+            return
+
+        payload = None
+        for conn in connections:
+            if conn.transport is None:
+                continue
+            if conn.position is None or conn.visibility_range is None:
+                # not reported position yet
+                if payload is None:
+                    payload = b''.join(frame for _, frame in frames)
+                conn.send_positions(frames, payload)
+                continue
+            visible_frames = grid.query(
+                conn.position.latitude,
+                conn.position.longitude,
+                conn.visibility_range
+            )
+            if len(visible_frames) != 0:
+                conn.send_positions(visible_frames)
+
+    def _on_text_message(self, connection: Connection, raw_messages: list[str]):
+        controller = connection.controller
+        if controller is None:
+            return
+        for raw_message in raw_messages:
+            logger.debug('Data row received: %s', raw_message)
             try:
-                message = controller.route(raw_message_row)
+                message = controller.route(raw_message)
+                self.parsed_messages.increment()
                 self.on_message(connection, message)
             except Exception as err:
                 logger.exception(err)
 
-    def _on_connection_made(self, connection: Connection):
+    def add_connection(self, connection: Connection):
+        """
+        Register the connection and create its controller. Used by TCP
+        clients and bots.
+        """
+        connection.controller = self.Controller(connection, self)
         self.connections[connection.id] = connection
+        if connection.callsign is not None:
+            self.set_callsign(connection, connection.callsign)
+        # bots don't listen to any channel
+        if connection.transport is not None:
+            self.channels.join(connection)
+        return connection
+
+    def set_callsign(self, connection: Connection, callsign: str):
+        if self.callsigns.get(connection.callsign) is connection:
+            self.callsigns.pop(connection.callsign)
+        connection.callsign = callsign
+        self.callsigns[callsign] = connection
+
+    def get_connection_by_callsign(self, callsign: str) -> Connection | None:
+        return self.callsigns.get(callsign)
+
+    def _on_connection_made(self, connection: Connection):
+        self.add_connection(connection)
         self.on_connection_made(connection)
 
     def _on_lost_connection(self, connection: Connection):
-        self.connections.pop(connection.id)
+        self.connections.pop(connection.id, None)
+        if self.callsigns.get(connection.callsign) is connection:
+            self.callsigns.pop(connection.callsign)
+        self.channels.leave(connection)
+        connection.controller = None
 
     async def serve(self):
         print(f"FSD Server started at {self.host}:{self.port}")
@@ -95,12 +156,17 @@ class FsdServer:
             await self._tcp_server.serve_forever()
 
     def stop(self):
+        if self.tick_scheduler is not None:
+            self.tick_scheduler.stop()
         print(f"FSD Server stopped at {self.host}:{self.port}")
 
     def on_start(self):
         pass
 
-    def on_tick(self):
+    def on_tick(self, after_time: timedelta):
+        pass
+
+    def on_tick_connections_updated(self):
         pass
 
     def on_tick_connection(self, connection: Connection, after_time: timedelta):
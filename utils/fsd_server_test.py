@@ -0,0 +1,116 @@
+import unittest
+
+from messages.Position import Position
+from utils.connection import Connection
+from utils.fsd_server import FsdServer
+
+
+class FakeTransport:
+    def __init__(self):
+        self.writes: list[bytes] = []
+
+    def write(self, data: bytes):
+        self.writes.append(data)
+
+
+class FakeAircraft:
+    def __init__(self, callsign: str, position: Position = Position(25.08, 121.23)):
+        self.callsign = callsign
+        self.position = position
+        self.serialized = 0
+
+    def get_position_update_message(self):
+        self.serialized += 1
+        return f'@N:{self.callsign}'
+
+
+def create_connection(server: FsdServer, id: str, aircraft: FakeAircraft | None = None):
+    conn = Connection(
+        server._on_connection_made,
+        server._on_lost_connection,
+        server._on_text_message,
+    )
+    conn.id = id
+    if aircraft is None:
+        conn.type = 'ATC'
+        conn.transport = FakeTransport()
+    else:
+        conn.aircraft = aircraft
+        conn.callsign = aircraft.callsign
+    return server.add_connection(conn)
+
+
+class TestFsdServer(unittest.TestCase):
+
+    def test_broadcast_positions(self):
+        server = FsdServer()
+        aircrafts = [FakeAircraft('CAL123'), FakeAircraft('EVA456')]
+        for aircraft in aircrafts:
+            create_connection(server, aircraft.callsign, aircraft)
+        atcs = [create_connection(server, f'ATC{i}') for i in range(3)]
+
+        server.broadcast_positions(list(server.connections.values()))
+
+        for aircraft in aircrafts:
+            self.assertEqual(aircraft.serialized, 1)
+        for atc in atcs:
+            self.assertEqual(
+                atc.transport.writes,
+                [b'@N:CAL123\r\n@N:EVA456\r\n']
+            )
+
+    def test_broadcast_positions_in_visibility_range(self):
+        server = FsdServer()
+        create_connection(server, 'CAL123', FakeAircraft(
+            'CAL123', Position(25.08, 121.23)))
+        create_connection(server, 'EVA456', FakeAircraft(
+            'EVA456', Position(22.58, 120.35)))
+        taipei = create_connection(server, 'RCTP_TWR')
+        taipei.position = Position(25.07, 121.22)
+        taipei.visibility_range = 50
+        kaohsiung = create_connection(server, 'RCKH_TWR')
+        kaohsiung.position = Position(22.57, 120.34)
+        kaohsiung.visibility_range = 50
+        remote = create_connection(server, 'RJTT_TWR')
+        remote.position = Position(35.55, 139.78)
+        remote.visibility_range = 50
+
+        server.broadcast_positions(list(server.connections.values()))
+
+        self.assertEqual(taipei.transport.writes, [b'@N:CAL123\r\n'])
+        self.assertEqual(kaohsiung.transport.writes, [b'@N:EVA456\r\n'])
+        self.assertEqual(remote.transport.writes, [])
+
+
+    def test_controller_lifecycle(self):
+        server = FsdServer()
+        conn = create_connection(server, 'RCTP_TWR')
+        controller = conn.controller
+        self.assertIsNotNone(controller)
+
+        server._on_text_message(conn, ['#TMRCTP_TWR:@18700:hello'])
+        server._on_text_message(conn, ['#TMRCTP_TWR:@18700:bye'])
+        self.assertIs(conn.controller, controller)
+
+        server._on_lost_connection(conn)
+        self.assertIsNone(conn.controller)
+        self.assertNotIn(conn.id, server.connections)
+
+    def test_callsign_index(self):
+        server = FsdServer()
+        bot = create_connection(server, 'bot', FakeAircraft('CAL123'))
+        atc = create_connection(server, 'atc')
+        self.assertIs(server.get_connection_by_callsign('CAL123'), bot)
+
+        server._on_text_message(
+            atc, ['#AARCTP_TWR:SERVER:Tester:1000001:password:5:9'])
+        self.assertIs(server.get_connection_by_callsign('RCTP_TWR'), atc)
+        self.assertEqual(atc.type, 'ATC')
+
+        server._on_lost_connection(atc)
+        server._on_lost_connection(bot)
+        self.assertEqual(server.callsigns, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
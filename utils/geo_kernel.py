@@ -0,0 +1,197 @@
+"""
+Bearing, distance and destination on plain floats, for the code running
+for every aircraft in every tick. Latitudes, longitudes and bearings are in
+degrees, distances in meters.
+
+Two accuracies:
+- SPHERICAL: haversine on the mean earth radius. Distances are within 0.6%
+  and bearings within 0.2 degrees of the ellipsoid, far below what a bot
+  flying a few nautical miles per tick can notice.
+- GEODESIC: Vincenty on the WGS84 ellipsoid, within a millimeter of geopy.
+"""
+from math import atan, atan2, cos, degrees, radians, sin, sqrt, tan, asin
+
+SPHERICAL = 'spherical'
+GEODESIC = 'geodesic'
+
+EARTH_RADIUS_METERS = 6371008.8
+# WGS84
+SEMI_MAJOR_AXIS = 6378137.0
+FLATTENING = 1 / 298.257223563
+SEMI_MINOR_AXIS = SEMI_MAJOR_AXIS * (1 - FLATTENING)
+
+VINCENTY_TOLERANCE = 1e-12
+VINCENTY_MAX_ITERATIONS = 200
+
+accuracy = SPHERICAL
+
+
+def set_accuracy(mode: str):
+    global accuracy
+    if mode not in (SPHERICAL, GEODESIC):
+        raise ValueError(f'Unknown accuracy {mode}')
+    accuracy = mode
+
+
+def spherical_bearing_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> tuple[float, float]:
+    """
+    Initial bearing and haversine distance, sharing the trigonometric terms.
+    """
+    phi1 = radians(lat1)
+    phi2 = radians(lat2)
+    delta_lambda = radians(lon2 - lon1)
+    cos_phi1 = cos(phi1)
+    cos_phi2 = cos(phi2)
+    sin_phi1 = sin(phi1)
+    sin_phi2 = sin(phi2)
+    sin_half_phi = sin((phi2 - phi1) / 2)
+    sin_half_lambda = sin(delta_lambda / 2)
+
+    a = sin_half_phi * sin_half_phi + \
+        cos_phi1 * cos_phi2 * sin_half_lambda * sin_half_lambda
+    distance = 2 * EARTH_RADIUS_METERS * asin(min(1.0, sqrt(a)))
+
+    x = sin(delta_lambda) * cos_phi2
+    y = cos_phi1 * sin_phi2 - sin_phi1 * cos_phi2 * cos(delta_lambda)
+    bearing = (degrees(atan2(x, y)) + 360) % 360
+    return bearing, distance
+
+
+def spherical_destination(lat: float, lon: float, bearing: float, distance: float) -> tuple[float, float]:
+    phi1 = radians(lat)
+    theta = radians(bearing)
+    delta = distance / EARTH_RADIUS_METERS
+    sin_phi1 = sin(phi1)
+    cos_phi1 = cos(phi1)
+    sin_delta = sin(delta)
+    cos_delta = cos(delta)
+
+    sin_phi2 = sin_phi1 * cos_delta + cos_phi1 * sin_delta * cos(theta)
+    phi2 = asin(max(-1.0, min(1.0, sin_phi2)))
+    lambda2 = radians(lon) + atan2(
+        sin(theta) * sin_delta * cos_phi1,
+        cos_delta - sin_phi1 * sin_phi2
+    )
+    return degrees(phi2), (degrees(lambda2) + 540) % 360 - 180
+
+
+def vincenty_bearing_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> tuple[float, float]:
+    """
+    Vincenty's inverse formula. Falls back to the sphere for nearly
+    antipodal points, where it doesn't converge.
+    """
+    if lat1 == lat2 and lon1 == lon2:
+        return 0.0, 0.0
+    f = FLATTENING
+    u1 = atan((1 - f) * tan(radians(lat1)))
+    u2 = atan((1 - f) * tan(radians(lat2)))
+    sin_u1, cos_u1 = sin(u1), cos(u1)
+    sin_u2, cos_u2 = sin(u2), cos(u2)
+    big_l = radians(lon2 - lon1)
+    lambda_ = big_l
+
+    for _ in range(VINCENTY_MAX_ITERATIONS):
+        sin_lambda, cos_lambda = sin(lambda_), cos(lambda_)
+        sin_sigma = sqrt(
+            (cos_u2 * sin_lambda) ** 2 +
+            (cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lambda) ** 2
+        )
+        if sin_sigma == 0:
+            return 0.0, 0.0
+        cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lambda
+        sigma = atan2(sin_sigma, cos_sigma)
+        sin_alpha = cos_u1 * cos_u2 * sin_lambda / sin_sigma
+        cos_sq_alpha = 1 - sin_alpha * sin_alpha
+        # equatorial line
+        cos_2sigma_m = 0.0 if cos_sq_alpha == 0 else \
+            cos_sigma - 2 * sin_u1 * sin_u2 / cos_sq_alpha
+        c = f / 16 * cos_sq_alpha * (4 + f * (4 - 3 * cos_sq_alpha))
+        previous_lambda = lambda_
+        lambda_ = big_l + (1 - c) * f * sin_alpha * (
+            sigma + c * sin_sigma * (
+                cos_2sigma_m + c * cos_sigma * (-1 + 2 * cos_2sigma_m * cos_2sigma_m)))
+        if abs(lambda_ - previous_lambda) < VINCENTY_TOLERANCE:
+            break
+    else:
+        return spherical_bearing_distance(lat1, lon1, lat2, lon2)
+
+    u_sq = cos_sq_alpha * (SEMI_MAJOR_AXIS ** 2 - SEMI_MINOR_AXIS ** 2) / SEMI_MINOR_AXIS ** 2
+    big_a = 1 + u_sq / 16384 * (4096 + u_sq * (-768 + u_sq * (320 - 175 * u_sq)))
+    big_b = u_sq / 1024 * (256 + u_sq * (-128 + u_sq * (74 - 47 * u_sq)))
+    delta_sigma = big_b * sin_sigma * (
+        cos_2sigma_m + big_b / 4 * (
+            cos_sigma * (-1 + 2 * cos_2sigma_m * cos_2sigma_m) -
+            big_b / 6 * cos_2sigma_m * (-3 + 4 * sin_sigma * sin_sigma) *
+            (-3 + 4 * cos_2sigma_m * cos_2sigma_m)))
+    distance = SEMI_MINOR_AXIS * big_a * (sigma - delta_sigma)
+
+    bearing = atan2(
+        cos_u2 * sin(lambda_),
+        cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos(lambda_)
+    )
+    return (degrees(bearing) + 360) % 360, distance
+
+
+def vincenty_destination(lat: float, lon: float, bearing: float, distance: float) -> tuple[float, float]:
+    """
+    Vincenty's direct formula.
+    """
+    f = FLATTENING
+    alpha1 = radians(bearing)
+    sin_alpha1, cos_alpha1 = sin(alpha1), cos(alpha1)
+    tan_u1 = (1 - f) * tan(radians(lat))
+    cos_u1 = 1 / sqrt(1 + tan_u1 * tan_u1)
+    sin_u1 = tan_u1 * cos_u1
+    sigma1 = atan2(tan_u1, cos_alpha1)
+    sin_alpha = cos_u1 * sin_alpha1
+    cos_sq_alpha = 1 - sin_alpha * sin_alpha
+    u_sq = cos_sq_alpha * (SEMI_MAJOR_AXIS ** 2 - SEMI_MINOR_AXIS ** 2) / SEMI_MINOR_AXIS ** 2
+    big_a = 1 + u_sq / 16384 * (4096 + u_sq * (-768 + u_sq * (320 - 175 * u_sq)))
+    big_b = u_sq / 1024 * (256 + u_sq * (-128 + u_sq * (74 - 47 * u_sq)))
+
+    sigma = distance / (SEMI_MINOR_AXIS * big_a)
+    for _ in range(VINCENTY_MAX_ITERATIONS):
+        cos_2sigma_m = cos(2 * sigma1 + sigma)
+        sin_sigma, cos_sigma = sin(sigma), cos(sigma)
+        delta_sigma = big_b * sin_sigma * (
+            cos_2sigma_m + big_b / 4 * (
+                cos_sigma * (-1 + 2 * cos_2sigma_m * cos_2sigma_m) -
+                big_b / 6 * cos_2sigma_m * (-3 + 4 * sin_sigma * sin_sigma) *
+                (-3 + 4 * cos_2sigma_m * cos_2sigma_m)))
+        previous_sigma = sigma
+        sigma = distance / (SEMI_MINOR_AXIS * big_a) + delta_sigma
+        if abs(sigma - previous_sigma) < VINCENTY_TOLERANCE:
+            break
+
+    cos_2sigma_m = cos(2 * sigma1 + sigma)
+    sin_sigma, cos_sigma = sin(sigma), cos(sigma)
+    x = sin_u1 * sin_sigma - cos_u1 * cos_sigma * cos_alpha1
+    lat2 = atan2(
+        sin_u1 * cos_sigma + cos_u1 * sin_sigma * cos_alpha1,
+        (1 - f) * sqrt(sin_alpha * sin_alpha + x * x)
+    )
+    lambda_ = atan2(
+        sin_sigma * sin_alpha1,
+        cos_u1 * cos_sigma - sin_u1 * sin_sigma * cos_alpha1
+    )
+    c = f / 16 * cos_sq_alpha * (4 + f * (4 - 3 * cos_sq_alpha))
+    big_l = lambda_ - (1 - c) * f * sin_alpha * (
+        sigma + c * sin_sigma * (
+            cos_2sigma_m + c * cos_sigma * (-1 + 2 * cos_2sigma_m * cos_2sigma_m)))
+    return degrees(lat2), (lon + degrees(big_l) + 540) % 360 - 180
+
+
+def bearing_distance(
+    lat1: float, lon1: float, lat2: float, lon2: float, mode: str | None = None
+) -> tuple[float, float]:
+    if (mode or accuracy) == GEODESIC:
+        return vincenty_bearing_distance(lat1, lon1, lat2, lon2)
+    return spherical_bearing_distance(lat1, lon1, lat2, lon2)
+
+
+def destination(
+    lat: float, lon: float, bearing: float, distance: float, mode: str | None = None
+) -> tuple[float, float]:
+    if (mode or accuracy) == GEODESIC:
+        return vincenty_destination(lat, lon, bearing, distance)
+    return spherical_destination(lat, lon, bearing, distance)
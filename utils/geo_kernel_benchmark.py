@@ -0,0 +1,49 @@
+"""
+Compare the geo kernel with geopy on bot sized movements.
+
+    python -m utils.geo_kernel_benchmark 100000
+"""
+import random
+import sys
+import time
+
+from geopy.distance import distance as distance_between
+
+from utils import geo_kernel
+
+
+def main(count: int = 100000):
+    random.seed(0)
+    movements = [(
+        random.uniform(-60, 60),
+        random.uniform(-180, 180),
+        random.uniform(0, 360),
+        random.uniform(10, 5 * 1852),
+    ) for _ in range(count)]
+    targets = [
+        geo_kernel.destination(lat, lon, bearing, meters)
+        for lat, lon, bearing, meters in movements
+    ]
+    pairs = [(lat, lon, lat2, lon2) for (lat, lon, _, _), (lat2, lon2) in zip(movements, targets)]
+
+    for name, run in (
+        ('geopy distance', lambda: [distance_between((a, b), (c, d)).meters for a, b, c, d in pairs]),
+        ('geopy destination', lambda: [
+            distance_between(meters=m).destination((a, b), bearing=c) for a, b, c, m in movements]),
+        ('spherical bearing distance', lambda: [
+            geo_kernel.spherical_bearing_distance(*pair) for pair in pairs]),
+        ('spherical destination', lambda: [
+            geo_kernel.spherical_destination(*movement) for movement in movements]),
+        ('vincenty bearing distance', lambda: [
+            geo_kernel.vincenty_bearing_distance(*pair) for pair in pairs]),
+        ('vincenty destination', lambda: [
+            geo_kernel.vincenty_destination(*movement) for movement in movements]),
+    ):
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+        print(f'{name}: {elapsed / count * 1e6:.2f}us per call')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,71 @@
+import random
+import unittest
+
+from geopy.distance import geodesic
+
+from utils import geo_kernel
+
+
+def random_movements(count: int, max_meters: float):
+    rng = random.Random(0)
+    for _ in range(count):
+        yield (
+            rng.uniform(-80, 80),
+            rng.uniform(-180, 180),
+            rng.uniform(0, 360),
+            rng.uniform(1, max_meters),
+        )
+
+
+def bearing_difference(b1: float, b2: float):
+    difference = abs(b1 - b2) % 360
+    return min(difference, 360 - difference)
+
+
+class TestGeoKernel(unittest.TestCase):
+
+    def test_spherical_error_bounds(self):
+        for lat, lon, bearing, meters in random_movements(500, 20 * 1852):
+            target = geodesic(meters=meters).destination((lat, lon), bearing=bearing)
+            b, d = geo_kernel.spherical_bearing_distance(lat, lon, target.latitude, target.longitude)
+            self.assertLess(abs(d - meters) / meters, 0.006)
+            self.assertLess(bearing_difference(b, bearing), 0.2)
+
+    def test_spherical_destination_round_trip(self):
+        for lat, lon, bearing, meters in random_movements(500, 20 * 1852):
+            lat2, lon2 = geo_kernel.spherical_destination(lat, lon, bearing, meters)
+            b, d = geo_kernel.spherical_bearing_distance(lat, lon, lat2, lon2)
+            self.assertAlmostEqual(d, meters, delta=1e-6)
+            self.assertLess(bearing_difference(b, bearing), 1e-6)
+
+    def test_vincenty_matches_geopy(self):
+        for lat, lon, bearing, meters in random_movements(500, 1000 * 1852):
+            target = geodesic(meters=meters).destination((lat, lon), bearing=bearing)
+            lat2, lon2 = geo_kernel.vincenty_destination(lat, lon, bearing, meters)
+            self.assertLess(geodesic((lat2, lon2), (target.latitude, target.longitude)).meters, 0.001)
+            b, d = geo_kernel.vincenty_bearing_distance(lat, lon, target.latitude, target.longitude)
+            self.assertAlmostEqual(d, meters, delta=0.001)
+            self.assertLess(bearing_difference(b, bearing), 1e-6)
+
+    def test_same_point(self):
+        self.assertEqual(geo_kernel.vincenty_bearing_distance(25.0, 121.0, 25.0, 121.0), (0.0, 0.0))
+        self.assertEqual(geo_kernel.spherical_bearing_distance(25.0, 121.0, 25.0, 121.0), (0.0, 0.0))
+
+    def test_antimeridian(self):
+        _, lon = geo_kernel.destination(0.0, 179.99, 90.0, 3000.0)
+        self.assertLess(lon, -179.9)
+        bearing, meters = geo_kernel.bearing_distance(0.0, 179.99, 0.0, -179.99)
+        self.assertAlmostEqual(bearing, 90.0)
+        self.assertAlmostEqual(meters, 2224, delta=1)
+
+    def test_accuracy_mode(self):
+        self.addCleanup(geo_kernel.set_accuracy, geo_kernel.accuracy)
+        geo_kernel.set_accuracy(geo_kernel.GEODESIC)
+        _, meters = geo_kernel.bearing_distance(25.0, 121.0, 26.0, 121.0)
+        self.assertAlmostEqual(meters, geodesic((25.0, 121.0), (26.0, 121.0)).meters, delta=0.001)
+        with self.assertRaises(ValueError):
+            geo_kernel.set_accuracy('flat')
+
+
+if __name__ == '__main__':
+    unittest.main()
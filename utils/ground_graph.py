@@ -0,0 +1,351 @@
+import heapq
+from logging import getLogger
+from math import radians, isclose, sin, cos, hypot
+from typing import Callable, Iterable
+
+from db.init import detach
+from db.models import TaxiPath, Parking, Start, RunwayEnd
+from db.navdata import navdata
+from messages.Position import Position
+from helpers import (
+    get_taxt_paths_by_airport_id,
+    get_parkings_by_airport_id,
+    get_starts_by_airport_id,
+    get_runway_by_runway_end_id,
+)
+from utils.geo import get_bearing_distance
+
+logger = getLogger(__name__)
+
+HOLD_SHORT_TYPES = ('HSND', 'IHSND')
+EARTH_RADIUS_METERS = 6371008.8
+# hold short points within this distance to the runway centerline belong
+# to the runway
+RUNWAY_HOLD_SHORT_DISTANCE = 150
+# the first node this far away when vacating a taxiway without hold short
+MIN_VACATE_DISTANCE = 70 * 0.3048
+
+
+class AirportGroundGraph:
+    """
+    Taxiway network of an airport. Nodes are deduplicated by coordinates
+    and referenced by index. Every edge keeps the name of its taxiway, so
+    taxi clearances only follow the cleared taxiways.
+
+    Node coordinates are projected once to a local tangent plane in meters,
+    which is accurate enough within an airport, so edge lengths and the A*
+    heuristic are plain euclidean distances.
+    """
+
+    def __init__(self, airport_id: int):
+        self.airport_id = airport_id
+        self.positions: list[Position] = []
+        self.is_hold_short: list[bool] = []
+        # local tangent plane, meters east and north of the reference point
+        self.xs: list[float] = []
+        self.ys: list[float] = []
+        # node -> [(neighbor node, taxiway name, length in meters)]
+        self.links: list[list[tuple[int, str, float]]] = []
+        self.taxiway_nodes: dict[str, list[int]] = {}
+        self.node_ids: dict[tuple[float, float], int] = {}
+        # parking_id -> node where pushback ends
+        self.parking_pushback_nodes: dict[int, int] = {}
+        self.starts: dict[str, Start] = {}
+        self._reference: tuple[float, float] | None = None
+
+    @classmethod
+    def from_rows(
+        cls,
+        airport_id: int,
+        taxi_paths: list[TaxiPath],
+        parkings: list[Parking] = [],
+        starts: list[Start] = []
+    ):
+        graph = cls(airport_id)
+        for taxi_path in taxi_paths:
+            start_id = graph._add_node(
+                taxi_path.start_position,
+                taxi_path.start_type in HOLD_SHORT_TYPES
+            )
+            end_id = graph._add_node(
+                taxi_path.end_position,
+                taxi_path.end_type in HOLD_SHORT_TYPES
+            )
+            length = hypot(
+                graph.xs[end_id] - graph.xs[start_id],
+                graph.ys[end_id] - graph.ys[start_id]
+            )
+            graph.links[start_id].append((end_id, taxi_path.name, length))
+            graph.links[end_id].append((start_id, taxi_path.name, length))
+            nodes = graph.taxiway_nodes.setdefault(taxi_path.name, [])
+            for node_id in (start_id, end_id):
+                if node_id not in nodes:
+                    nodes.append(node_id)
+
+        for parking in parkings:
+            parking_id = graph.get_node_id(parking.position)
+            if parking_id is None or len(graph.links[parking_id]) == 0:
+                continue
+            graph.parking_pushback_nodes[parking.parking_id] = \
+                graph.links[parking_id][0][0]
+        for start in starts:
+            graph.starts[start.runway_name] = start
+        return graph
+
+    @classmethod
+    def load(cls, airport_id: int):
+        logger.debug('Build ground graph of airport %s', airport_id)
+        return cls.from_rows(
+            airport_id,
+            get_taxt_paths_by_airport_id(airport_id),
+            get_parkings_by_airport_id(airport_id),
+            # kept by the graph, which is shared by every thread
+            detach(get_starts_by_airport_id(airport_id)),
+        )
+
+    def project(self, latitude: float, longitude: float) -> tuple[float, float]:
+        if self._reference is None:
+            self._reference = (latitude, longitude)
+        reference_latitude, reference_longitude = self._reference
+        x = radians(longitude - reference_longitude) * \
+            cos(radians(reference_latitude)) * EARTH_RADIUS_METERS
+        y = radians(latitude - reference_latitude) * EARTH_RADIUS_METERS
+        return x, y
+
+    def _add_node(self, position: Position, is_hold_short: bool):
+        key = (position.latitude, position.longitude)
+        node_id = self.node_ids.get(key)
+        if node_id is None:
+            node_id = len(self.positions)
+            self.node_ids[key] = node_id
+            self.positions.append(position)
+            self.is_hold_short.append(is_hold_short)
+            x, y = self.project(position.latitude, position.longitude)
+            self.xs.append(x)
+            self.ys.append(y)
+            self.links.append([])
+        elif is_hold_short:
+            self.is_hold_short[node_id] = True
+        return node_id
+
+    def get_node_id(self, position: Position) -> int | None:
+        return self.node_ids.get((position.latitude, position.longitude))
+
+    def get_distance(self, n1: int, n2: int) -> float:
+        return hypot(self.xs[n2] - self.xs[n1], self.ys[n2] - self.ys[n1])
+
+    def get_pushback_position(self, parking_id: int) -> Position | None:
+        node_id = self.parking_pushback_nodes.get(parking_id)
+        if node_id is None:
+            return None
+        return self.positions[node_id]
+
+    def get_start(self, runway_name: str) -> Start | None:
+        return self.starts.get(runway_name)
+
+    def get_nodes_of_taxiways(self, taxiway_names: list[str]) -> list[int]:
+        node_ids: list[int] = []
+        for name in taxiway_names:
+            for node_id in self.taxiway_nodes.get(name, []):
+                if node_id not in node_ids:
+                    node_ids.append(node_id)
+        return node_ids
+
+    def get_runway_hold_short_nodes(self, runway_name: str) -> list[int]:
+        """
+        Hold short nodes close to the centerline of the runway.
+        """
+        start = self.get_start(runway_name)
+        if start is None:
+            return []
+        start_x, start_y = self.project(start.laty, start.lonx)
+        heading = radians(start.heading)
+        node_ids: list[int] = []
+        for node_id, is_hold_short in enumerate(self.is_hold_short):
+            if not is_hold_short:
+                continue
+            cross_track = (self.xs[node_id] - start_x) * cos(heading) - \
+                (self.ys[node_id] - start_y) * sin(heading)
+            if abs(cross_track) <= RUNWAY_HOLD_SHORT_DISTANCE:
+                node_ids.append(node_id)
+        return node_ids
+
+    def find_route(
+        self,
+        start_id: int,
+        target_ids: Iterable[int],
+        taxiway_names: list[str] | None = None
+    ) -> list[int] | None:
+        """
+        A* from the start to the nearest of the targets.
+
+        With `taxiway_names`, the route follows the taxiways in the given
+        order and ends on the last one. Search states are (node, index of
+        the current taxiway).
+        """
+        targets = set(target_ids)
+        if len(targets) == 0:
+            return None
+        target_xs = [(self.xs[n], self.ys[n]) for n in targets]
+
+        def heuristic(node_id: int):
+            x, y = self.xs[node_id], self.ys[node_id]
+            return min(hypot(tx - x, ty - y) for tx, ty in target_xs)
+
+        if taxiway_names is None:
+            last_stage = 0
+            stage_nodes: list[set[int]] = []
+        else:
+            last_stage = len(taxiway_names) - 1
+            stage_nodes = [
+                set(self.taxiway_nodes.get(name, [])) for name in taxiway_names]
+
+        start = (start_id, 0)
+        costs = {start: 0.0}
+        parents: dict[tuple[int, int], tuple[int, int] | None] = {start: None}
+        queue = [(heuristic(start_id), 0.0, start)]
+        closed: set[tuple[int, int]] = set()
+        while len(queue) != 0:
+            _, cost, state = heapq.heappop(queue)
+            if state in closed:
+                continue
+            closed.add(state)
+            node_id, stage = state
+            if node_id in targets and stage == last_stage:
+                path: list[int] = []
+                current: tuple[int, int] | None = state
+                while current is not None:
+                    if len(path) == 0 or path[-1] != current[0]:
+                        path.append(current[0])
+                    current = parents[current]
+                path.reverse()
+                return path
+
+            next_states: list[tuple[tuple[int, int], float]] = []
+            if taxiway_names is None:
+                next_states = [((n, 0), length)
+                               for n, _, length in self.links[node_id]]
+            else:
+                # turn onto the next taxiway
+                if stage < last_stage and node_id in stage_nodes[stage + 1]:
+                    next_states.append(((node_id, stage + 1), 0.0))
+                next_states.extend(
+                    ((n, stage), length)
+                    for n, name, length in self.links[node_id]
+                    if name == taxiway_names[stage]
+                )
+            for next_state, length in next_states:
+                next_cost = cost + length
+                if next_cost >= costs.get(next_state, float('inf')):
+                    continue
+                costs[next_state] = next_cost
+                parents[next_state] = state
+                heapq.heappush(
+                    queue,
+                    (next_cost + heuristic(next_state[0]), next_cost, next_state)
+                )
+        return None
+
+    def find_path(
+        self,
+        start_position: Position,
+        target_ids: Iterable[int],
+        taxiway_names: list[str] | None = None
+    ) -> list[Position] | None:
+        start_id = self.get_node_id(start_position)
+        if start_id is None:
+            return None
+        route = self.find_route(start_id, target_ids, taxiway_names)
+        if route is None:
+            return None
+        return [self.positions[node_id] for node_id in route]
+
+    def find_hold_short_path(
+        self,
+        start_position: Position,
+        taxiway_names: list[str],
+        runway_name: str | None = None
+    ):
+        """
+        Taxi along the taxiways to the nearest hold short of the runway, or
+        of the last taxiway when the runway is unknown.
+        """
+        target_ids = [] if runway_name is None else \
+            self.get_runway_hold_short_nodes(runway_name)
+        if len(target_ids) == 0:
+            target_ids = [n for n in self.taxiway_nodes.get(taxiway_names[-1], [])
+                          if self.is_hold_short[n]]
+        return self.find_path(start_position, target_ids, taxiway_names)
+
+    def get_vacate_paths(self, runway_end: RunwayEnd, runway_width: float) -> dict[str, list[Position]]:
+        """
+        Taxiways which start on the runway, leaving it in the landing
+        direction, and their paths to the nearest hold short point.
+        """
+        vacate_paths: dict[str, list[Position]] = {}
+        for taxiway_name, node_ids in self.taxiway_nodes.items():
+            for node_id in node_ids:
+                links = [n for n, name, _ in self.links[node_id]
+                         if name == taxiway_name]
+                if len(links) != 1:
+                    continue
+                position = self.positions[node_id]
+                bearing, distance = get_bearing_distance(
+                    runway_end.position,
+                    position
+                )
+                rad = radians(bearing.degrees - runway_end.heading)
+                distance_to_runway = sin(rad) * distance.feet
+                # The endpoint of taxiway should inside the runway
+                if not isclose(distance_to_runway, 0, abs_tol=runway_width):
+                    continue
+                taxi_path_bearing, _ = get_bearing_distance(
+                    position,
+                    self.positions[links[0]]
+                )
+                # degrees between runway and taxi path should not too large
+                if not isclose(bearing.degrees, taxi_path_bearing.degrees, abs_tol=60):
+                    continue
+                target_ids = [n for n in node_ids if self.is_hold_short[n]]
+                if len(target_ids) == 0:
+                    target_ids = [n for n in node_ids if self.get_distance(
+                        node_id, n) > MIN_VACATE_DISTANCE]
+                path = self.find_path(position, target_ids, [taxiway_name])
+                if path is not None:
+                    vacate_paths[taxiway_name] = path
+        return vacate_paths
+
+
+class GroundGraphCache:
+    """
+    Ground graphs built on first use, dropped when the navdata is reloaded.
+    """
+
+    def __init__(self, load: Callable[[int], AirportGroundGraph] = AirportGroundGraph.load):
+        self.load = load
+        self.graphs: dict[int, AirportGroundGraph] = {}
+
+    def get(self, airport_id: int) -> AirportGroundGraph:
+        graph = self.graphs.get(airport_id)
+        if graph is None:
+            graph = self.load(airport_id)
+            self.graphs[airport_id] = graph
+        return graph
+
+    def clear(self):
+        self.graphs.clear()
+
+
+ground_graphs = GroundGraphCache()
+navdata.on_reload(ground_graphs.clear)
+
+
+def get_vacatable_taxi_path_by_runway(airport_id: int, runway_end: RunwayEnd | None):
+    if runway_end is None:
+        return {}
+
+    runway = get_runway_by_runway_end_id(runway_end.runway_end_id)
+    if runway is None:
+        return {}
+
+    return ground_graphs.get(airport_id).get_vacate_paths(runway_end, runway.width)
@@ -0,0 +1,61 @@
+"""
+Compare taxi routing on the cached ground graph with a geodesic A* over the
+same graph.
+
+    python -m utils.ground_graph_benchmark RCTP 200
+"""
+import random
+import sys
+import time
+
+import astar
+from geopy.distance import distance as distance_between
+
+from helpers import get_airport_by_ident
+from utils.ground_graph import AirportGroundGraph
+
+
+def geodesic_route(graph: AirportGroundGraph, start_id: int, target_id: int):
+    def distance_between_nodes(n1: int, n2: int):
+        return distance_between(graph.positions[n1], graph.positions[n2]).meters
+
+    return astar.find_path(
+        start_id,
+        target_id,
+        neighbors_fnct=lambda n: [neighbor for neighbor, _, _ in graph.links[n]],
+        heuristic_cost_estimate_fnct=distance_between_nodes,
+        distance_between_fnct=distance_between_nodes
+    )
+
+
+def main(airport_ident: str = 'RCTP', count: int = 200):
+    airport = get_airport_by_ident(airport_ident)
+    if airport is None:
+        print(f'Airport {airport_ident} not found')
+        return
+
+    started = time.perf_counter()
+    graph = AirportGroundGraph.load(airport.airport_id)
+    print(
+        f'Built graph of {len(graph.positions)} nodes in '
+        f'{time.perf_counter() - started:.3f}s'
+    )
+
+    random.seed(0)
+    node_count = len(graph.positions)
+    pairs = [(random.randrange(node_count), random.randrange(node_count))
+             for _ in range(count)]
+
+    for name, route in (
+        ('indexed A*', lambda s, t: graph.find_route(s, [t])),
+        ('geodesic A*', lambda s, t: geodesic_route(graph, s, t)),
+    ):
+        started = time.perf_counter()
+        for start_id, target_id in pairs:
+            route(start_id, target_id)
+        elapsed = time.perf_counter() - started
+        print(f'{name}: {elapsed / count * 1000:.3f}ms per route')
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:2], *(int(arg) for arg in sys.argv[2:3]))
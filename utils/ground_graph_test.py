@@ -0,0 +1,121 @@
+import unittest
+
+from db.models import TaxiPath, Parking, Start
+from messages.Position import Position
+from utils.ground_graph import AirportGroundGraph, GroundGraphCache
+
+PARKING = (25.0000, 121.0000)
+A1 = (25.0010, 121.0000)
+A2 = (25.0020, 121.0000)
+A3 = (25.0030, 121.0000)
+B1 = (25.0020, 121.0010)
+
+
+def create_taxi_path(name: str, start, end, end_type='N'):
+    return TaxiPath(
+        name=name,
+        start_laty=start[0], start_lonx=start[1], start_type='N',
+        end_laty=end[0], end_lonx=end[1], end_type=end_type,
+    )
+
+
+def create_graph():
+    return AirportGroundGraph.from_rows(
+        1,
+        [
+            create_taxi_path('', PARKING, A1),
+            create_taxi_path('A', A1, A2),
+            create_taxi_path('A', A2, A3, end_type='HSND'),
+            create_taxi_path('B', A2, B1, end_type='HSND'),
+        ],
+        [Parking(parking_id=10, airport_id=1, laty=PARKING[0], lonx=PARKING[1])],
+        [Start(start_id=1, airport_id=1, runway_name='05L',
+               laty=25.01, lonx=121.01, altitude=100, heading=50)],
+    )
+
+
+class TestAirportGroundGraph(unittest.TestCase):
+
+    def test_deduplicate_nodes(self):
+        graph = create_graph()
+        self.assertEqual(len(graph.positions), 5)
+        a2 = graph.get_node_id(Position(*A2))
+        self.assertEqual(
+            sorted(name for _, name, _ in graph.links[a2]), ['A', 'A', 'B'])
+        self.assertEqual(graph.get_nodes_of_taxiways(['B']), [a2, 4])
+
+    def test_attachment_points(self):
+        graph = create_graph()
+        self.assertEqual(graph.get_pushback_position(10), Position(*A1))
+        self.assertIsNone(graph.get_pushback_position(11))
+        self.assertEqual(graph.get_start('05L').start_id, 1)
+
+    def test_find_hold_short_path_along_taxiways(self):
+        graph = create_graph()
+        path = graph.find_hold_short_path(Position(*A1), ['A'])
+        self.assertEqual(path, [Position(*A1), Position(*A2), Position(*A3)])
+
+    def test_edge_length(self):
+        graph = create_graph()
+        a1 = graph.get_node_id(Position(*A1))
+        length = next(length for n, _, length in graph.links[a1] if n == 2)
+        # 0.001 degree of latitude
+        self.assertAlmostEqual(length, 111.2, delta=0.5)
+
+    def test_find_path_fails_off_cleared_taxiways(self):
+        graph = create_graph()
+        b1 = graph.get_node_id(Position(*B1))
+        self.assertIsNone(graph.find_path(Position(*A1), [b1], ['A']))
+        path = graph.find_path(Position(*A1), [b1], ['A', 'B'])
+        self.assertEqual(path, [Position(*A1), Position(*A2), Position(*B1)])
+
+    def test_find_path_in_taxiway_order(self):
+        graph = create_graph()
+        a1 = graph.get_node_id(Position(*A1))
+        b1 = graph.get_node_id(Position(*B1))
+        self.assertIsNone(graph.find_path(Position(*B1), [a1], ['A', 'B']))
+        path = graph.find_path(Position(*B1), [a1], ['B', 'A'])
+        self.assertEqual(path, [Position(*B1), Position(*A2), Position(*A1)])
+        self.assertEqual(graph.find_route(a1, [b1]), [a1, 2, b1])
+
+    def test_find_nearest_target(self):
+        graph = create_graph()
+        a3 = graph.get_node_id(Position(*A3))
+        b1 = graph.get_node_id(Position(*B1))
+        a1 = graph.get_node_id(Position(*A1))
+        # B1 is 0.001 degree of longitude away from A2, shorter than A3
+        self.assertEqual(graph.find_route(a1, [a3, b1])[-1], b1)
+
+    def test_find_runway_hold_short_path(self):
+        graph = create_graph()
+        # runway 05L runs north 100m east of B1, 200m east of A3
+        graph.starts['05L'].laty = B1[0] - 0.001
+        graph.starts['05L'].lonx = B1[1] + 0.001
+        graph.starts['05L'].heading = 0
+        self.assertEqual(
+            graph.get_runway_hold_short_nodes('05L'),
+            [graph.get_node_id(Position(*B1))]
+        )
+        path = graph.find_hold_short_path(Position(*A1), ['A', 'B'], '05L')
+        self.assertEqual(path[-1], Position(*B1))
+
+
+class TestGroundGraphCache(unittest.TestCase):
+
+    def test_build_once_and_clear(self):
+        built = []
+
+        def load(airport_id: int):
+            built.append(airport_id)
+            return AirportGroundGraph(airport_id)
+
+        cache = GroundGraphCache(load)
+        graph = cache.get(1)
+        self.assertIs(cache.get(1), graph)
+        cache.clear()
+        cache.get(1)
+        self.assertEqual(built, [1, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
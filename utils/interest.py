@@ -0,0 +1,106 @@
+import math
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+from messages.Position import Position
+
+if TYPE_CHECKING:
+    from utils.connection import Connection
+
+T = TypeVar('T')
+
+# nautical miles, indexed by the facility field of ATCPositionUpdateMessage
+FACILITY_VISIBILITY_RANGES = {
+    0: 300,  # observer
+    1: 1500,  # flight service station
+    2: 20,  # delivery
+    3: 20,  # ground
+    4: 50,  # tower
+    5: 150,  # approach
+    6: 600,  # center
+}
+DEFAULT_ATC_VISIBILITY_RANGE = 300
+PILOT_VISIBILITY_RANGE = 40
+
+
+def get_atc_visibility_range(facility: int, visibility: int = 0) -> float:
+    """
+    The range requested by the client wins. Otherwise fallback to the
+    default range of the facility.
+    """
+    if visibility > 0:
+        return visibility
+    return FACILITY_VISIBILITY_RANGES.get(facility, DEFAULT_ATC_VISIBILITY_RANGE)
+
+
+def get_distance_nm(latitude1: float, longitude1: float, latitude2: float, longitude2: float) -> float:
+    """
+    Equirectangular approximation. Accurate enough to decide visibility.
+    """
+    delta_longitude = (longitude2 - longitude1 + 180) % 360 - 180
+    x = math.radians(delta_longitude) * \
+        math.cos(math.radians((latitude1 + latitude2) / 2))
+    y = math.radians(latitude2 - latitude1)
+    return math.hypot(x, y) * 3440.065
+
+
+def is_in_range(connection: 'Connection', position: Position | None) -> bool:
+    """
+    Connections which haven't reported their position yet see everything.
+    """
+    if position is None or connection.position is None or connection.visibility_range is None:
+        return True
+    return get_distance_nm(
+        connection.position.latitude,
+        connection.position.longitude,
+        position.latitude,
+        position.longitude,
+    ) <= connection.visibility_range
+
+
+class SpatialGrid(Generic[T]):
+    """
+    Bucket items by latitude/longitude cells, so range queries only look
+    at the cells around the center instead of every item.
+    """
+
+    def __init__(self, cell_size: float = 1.0):
+        self.cell_size = cell_size
+        self.cells: dict[tuple[int, int], list[tuple[float, float, T]]] = {}
+
+    def _cell(self, latitude: float, longitude: float):
+        return (
+            math.floor(latitude / self.cell_size),
+            math.floor(longitude / self.cell_size),
+        )
+
+    def insert(self, latitude: float, longitude: float, item: T):
+        cell = self._cell(latitude, longitude)
+        if cell not in self.cells:
+            self.cells[cell] = []
+        self.cells[cell].append((latitude, longitude, item))
+
+    def query(self, latitude: float, longitude: float, range_nm: float) -> list[T]:
+        range_latitude = range_nm / 60
+        cos_latitude = math.cos(math.radians(latitude))
+        # near the poles every longitude is in range
+        if cos_latitude * 180 <= range_latitude:
+            range_longitude = 180.0
+        else:
+            range_longitude = range_latitude / cos_latitude
+        min_y, min_x = self._cell(
+            latitude - range_latitude, longitude - range_longitude)
+        max_y, max_x = self._cell(
+            latitude + range_latitude, longitude + range_longitude)
+        # the longitude range wraps around the antimeridian
+        x_count = int(360 / self.cell_size)
+        xs = range(min_x, max_x + 1) if max_x - min_x < x_count \
+            else range(0, x_count)
+
+        items: list[T] = []
+        for y in range(min_y, max_y + 1):
+            for x in xs:
+                x = (x + x_count // 2) % x_count - x_count // 2
+                for item_latitude, item_longitude, item in self.cells.get((y, x), ()):
+                    if get_distance_nm(latitude, longitude, item_latitude, item_longitude) <= range_nm:
+                        items.append(item)
+        return items
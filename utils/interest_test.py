@@ -0,0 +1,41 @@
+import unittest
+
+from utils.interest import SpatialGrid, get_distance_nm, get_atc_visibility_range
+
+
+class TestInterest(unittest.TestCase):
+
+    def test_get_distance_nm(self):
+        # RCTP to RCKH is about 159 NM
+        self.assertAlmostEqual(
+            get_distance_nm(25.0797, 121.2342, 22.5771, 120.3500),
+            159,
+            delta=2
+        )
+
+    def test_get_atc_visibility_range(self):
+        self.assertEqual(get_atc_visibility_range(4, 0), 50)
+        self.assertEqual(get_atc_visibility_range(4, 100), 100)
+
+
+class TestSpatialGrid(unittest.TestCase):
+
+    def test_query(self):
+        grid = SpatialGrid()
+        grid.insert(25.08, 121.23, 'RCTP')
+        grid.insert(25.07, 121.55, 'RCSS')
+        grid.insert(22.58, 120.35, 'RCKH')
+        self.assertEqual(sorted(grid.query(25.0, 121.3, 30)), ['RCSS', 'RCTP'])
+        self.assertEqual(grid.query(22.5, 120.3, 30), ['RCKH'])
+        self.assertEqual(len(grid.query(24.0, 121.0, 300)), 3)
+
+    def test_query_across_antimeridian(self):
+        grid = SpatialGrid()
+        grid.insert(0, 179.9, 'east')
+        grid.insert(0, -179.9, 'west')
+        self.assertEqual(sorted(grid.query(0, 179.95, 20)), ['east', 'west'])
+        self.assertEqual(sorted(grid.query(0, -179.95, 20)), ['east', 'west'])
+
+
+if __name__ == '__main__':
+    unittest.main()
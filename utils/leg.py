@@ -1,4 +1,4 @@
-from geopy.distance import Distance
+from utils.distance import Distance
 
 from messages.Position import Position
 from utils.physics import Speed
@@ -40,7 +40,17 @@ class Leg:
         self.procedure_leg = procedure_leg
 
     @classmethod
-    def from_procedure_leg(cls, procedure_leg: ProcedureLeg, fix: Fix | None = None):
+    def from_procedure_leg(
+        cls,
+        procedure_leg: ProcedureLeg,
+        fix: Fix | None = None,
+        laty: float | None = None,
+        lonx: float | None = None
+    ):
+        """
+        `laty` and `lonx` override the coordinates of the procedure leg,
+        e.g. resolved from the fix, without modifying the procedure leg.
+        """
         is_missed_flag = getattr(procedure_leg, 'is_missed', 0)
         procedure_leg_type = ProcedureLegType(procedure_leg.type)
 
@@ -67,8 +77,8 @@ class Leg:
 
         return cls(
             ident=procedure_leg.fix_ident,
-            laty=procedure_leg.fix_laty,
-            lonx=procedure_leg.fix_lonx,
+            laty=procedure_leg.fix_laty if laty is None else laty,
+            lonx=procedure_leg.fix_lonx if lonx is None else lonx,
             fix=fix,
             is_missed=bool(is_missed_flag),
             max_altitude_limit=max_altitude_limit,
@@ -0,0 +1,48 @@
+from logging import getLogger
+
+logger = getLogger(__name__)
+
+
+class FrameOverflowError(Exception):
+    pass
+
+
+class LineFramer:
+    """
+    Reassemble the TCP stream into lines. Only complete lines are decoded
+    and returned, the incomplete tail is kept until the next chunk.
+    """
+
+    def __init__(self, max_line_length: int = 4096, max_buffer_size: int = 65536):
+        self.max_line_length = max_line_length
+        self.max_buffer_size = max_buffer_size
+        self.dropped_lines = 0
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> list[str]:
+        buffer = self._buffer
+        buffer += data
+
+        lines: list[str] = []
+        start = 0
+        end = buffer.find(b'\n')
+        while end != -1:
+            line_end = end - 1 if end > start and buffer[end - 1] == 0x0D else end
+            length = line_end - start
+            if length > self.max_line_length:
+                self.dropped_lines += 1
+                logger.warning('Drop a line of %d bytes', length)
+            elif length > 0:
+                lines.append(
+                    buffer[start:line_end].decode('utf-8', errors='replace')
+                )
+            start = end + 1
+            end = buffer.find(b'\n', start)
+        del buffer[:start]
+
+        if len(buffer) > self.max_buffer_size:
+            buffer.clear()
+            raise FrameOverflowError(
+                'Received more than %d bytes without line break' % self.max_buffer_size
+            )
+        return lines
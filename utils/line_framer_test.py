@@ -0,0 +1,53 @@
+import unittest
+
+from utils.line_framer import LineFramer, FrameOverflowError
+
+
+class TestLineFramer(unittest.TestCase):
+
+    def test_feed_complete_lines(self):
+        framer = LineFramer()
+        self.assertEqual(
+            framer.feed(b'#TMRCTP_TWR:@18700:hello\r\n%RCTP_TWR:18700:4:50:5:25.0:121.0:0\r\n'),
+            ['#TMRCTP_TWR:@18700:hello', '%RCTP_TWR:18700:4:50:5:25.0:121.0:0']
+        )
+
+    def test_feed_line_across_chunks(self):
+        framer = LineFramer()
+        self.assertEqual(framer.feed(b'#TMRCTP_TWR:@18'), [])
+        self.assertEqual(framer.feed(b'700:hel'), [])
+        self.assertEqual(framer.feed(b'lo\r'), [])
+        self.assertEqual(
+            framer.feed(b'\n#TMRCTP'),
+            ['#TMRCTP_TWR:@18700:hello']
+        )
+        self.assertEqual(framer.feed(b'_TWR:@18700:bye\r\n'), ['#TMRCTP_TWR:@18700:bye'])
+
+    def test_skip_empty_lines(self):
+        framer = LineFramer()
+        self.assertEqual(framer.feed(b'\r\n\r\n#DPCAL123\r\n\n'), ['#DPCAL123'])
+
+    def test_drop_long_line(self):
+        framer = LineFramer(max_line_length=10)
+        self.assertEqual(
+            framer.feed(b'#TM' + b'a' * 20 + b'\r\n#DPCAL123\r\n'),
+            ['#DPCAL123']
+        )
+        self.assertEqual(framer.dropped_lines, 1)
+
+    def test_buffer_overflow(self):
+        framer = LineFramer(max_buffer_size=16)
+        framer.feed(b'a' * 10)
+        with self.assertRaises(FrameOverflowError):
+            framer.feed(b'a' * 10)
+        self.assertEqual(framer.feed(b'#DPCAL123\r\n'), ['#DPCAL123'])
+
+    def test_decode_multibyte_across_chunks(self):
+        framer = LineFramer()
+        data = '#TMA:B:台北\r\n'.encode()
+        self.assertEqual(framer.feed(data[:-4]), [])
+        self.assertEqual(framer.feed(data[-4:]), ['#TMA:B:台北'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import math
+import struct
+
+import numpy as np
+
+from db.navdata import navdata
+from helpers import get_mag_var_data
+
+# one value per whole degree, indexed by [longitude % 360, latitude + 90]
+GRID_SHAPE = (360, 181)
+
+
+class MagVarGrid:
+    """
+    World magnetic variation grid, decoded once, with bilinear
+    interpolation between the whole degrees.
+    """
+
+    def __init__(self, values: np.ndarray):
+        self.values = values.reshape(GRID_SHAPE)
+
+    @classmethod
+    def from_bytes(cls, data: bytes):
+        """
+        Decode the big-endian value count and float values of the magdecl
+        table.
+        """
+        count = struct.unpack('>I', data[:4])[0]
+        values = np.frombuffer(data, dtype='>f4', count=count, offset=4)
+        return cls(values.astype(np.float64))
+
+    def lookup(self, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+        """
+        Magnetic variations of many positions in one call.
+        """
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        x0 = np.floor(longitudes)
+        y0 = np.floor(latitudes)
+        tx = longitudes - x0
+        ty = latitudes - y0
+        i0 = x0.astype(np.int64) % 360
+        i1 = (i0 + 1) % 360
+        j0 = y0.astype(np.int64) + 90
+        j1 = np.minimum(j0 + 1, GRID_SHAPE[1] - 1)
+
+        bottom = self.values[i0, j0] * (1 - tx) + self.values[i1, j0] * tx
+        top = self.values[i0, j1] * (1 - tx) + self.values[i1, j1] * tx
+        return bottom * (1 - ty) + top * ty
+
+    def get(self, latitude: float, longitude: float) -> float:
+        x0 = math.floor(longitude)
+        y0 = math.floor(latitude)
+        tx = longitude - x0
+        ty = latitude - y0
+        i0 = x0 % 360
+        i1 = (i0 + 1) % 360
+        j0 = y0 + 90
+        j1 = min(j0 + 1, GRID_SHAPE[1] - 1)
+
+        values = self.values
+        bottom = values[i0, j0] * (1 - tx) + values[i1, j0] * tx
+        top = values[i0, j1] * (1 - tx) + values[i1, j1] * tx
+        return float(bottom * (1 - ty) + top * ty)
+
+
+mag_var_grid: MagVarGrid | None = None
+
+
+def get_mag_var_grid() -> MagVarGrid | None:
+    global mag_var_grid
+    if mag_var_grid is not None:
+        return mag_var_grid
+
+    data = get_mag_var_data()
+    if data is None:
+        return None
+    mag_var_grid = MagVarGrid.from_bytes(data)
+    return mag_var_grid
+
+
+def require_mag_var_grid() -> MagVarGrid:
+    grid = get_mag_var_grid()
+    if grid is None:
+        raise RuntimeError('The navdata has no magnetic variation table')
+    return grid
+
+
+def clear_mag_var_grid():
+    global mag_var_grid
+    mag_var_grid = None
+
+
+navdata.on_reload(clear_mag_var_grid)
@@ -0,0 +1,71 @@
+import struct
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from messages.Position import Position
+from utils.geo import get_mag_var_by_position, get_mag_vars_by_positions
+from utils.mag_var import MagVarGrid
+
+
+def make_data(value_of):
+    values = [value_of(lon, lat - 90) for lon in range(360) for lat in range(181)]
+    return struct.pack('>I', len(values)) + struct.pack('>' + 'f' * len(values), *values)
+
+
+class TestMagVarGrid(unittest.TestCase):
+
+    def setUp(self):
+        # linear in both directions, so the interpolation is exact
+        self.grid = MagVarGrid.from_bytes(make_data(lambda lon, lat: lon * 0.01 + lat * 0.1))
+
+    def test_whole_degree(self):
+        self.assertAlmostEqual(self.grid.get(25, 121), 1.21 + 2.5, places=5)
+
+    def test_bilinear(self):
+        self.assertAlmostEqual(self.grid.get(25.25, 121.75), 1.2175 + 2.525, places=5)
+
+    def test_west_longitude(self):
+        # -60 is stored at 300
+        self.assertAlmostEqual(self.grid.get(10, -60), 3.0 + 1.0, places=5)
+        self.assertAlmostEqual(self.grid.get(10, -180), self.grid.get(10, 180), places=5)
+
+    def test_north_pole(self):
+        self.assertAlmostEqual(self.grid.get(90, 10), 0.1 + 9.0, places=5)
+
+    def test_lookup_matches_get(self):
+        latitudes = np.array([25.25, -33.5, 10.0, 89.9])
+        longitudes = np.array([121.75, 151.2, -60.3, 359.5])
+        expected = [self.grid.get(lat, lon) for lat, lon in zip(latitudes, longitudes)]
+        np.testing.assert_allclose(self.grid.lookup(latitudes, longitudes), expected)
+
+
+class TestMagVarLookups(unittest.TestCase):
+
+    def setUp(self):
+        grid = MagVarGrid.from_bytes(make_data(lambda lon, lat: lon * 0.01 + lat * 0.1))
+        patcher = patch('utils.mag_var.get_mag_var_grid', return_value=grid)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get_mag_vars_by_positions(self):
+        positions = [Position(25.25, 121.75), Position(-33.5, 151.2), Position(10.0, -60.3)]
+        np.testing.assert_allclose(
+            get_mag_vars_by_positions(positions),
+            [get_mag_var_by_position(position) for position in positions]
+        )
+
+    def test_get_mag_vars_by_no_positions(self):
+        self.assertEqual(len(get_mag_vars_by_positions([])), 0)
+
+    def test_no_grid(self):
+        with patch('utils.mag_var.get_mag_var_grid', return_value=None):
+            with self.assertRaisesRegex(RuntimeError, 'magnetic variation'):
+                get_mag_var_by_position(Position(25.0, 121.0))
+            with self.assertRaisesRegex(RuntimeError, 'magnetic variation'):
+                get_mag_vars_by_positions([Position(25.0, 121.0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
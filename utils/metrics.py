@@ -0,0 +1,80 @@
+import time
+
+
+class RateCounter:
+    """
+    Count events per second. `rate` is the count of the last complete
+    second.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self._second = int(time.monotonic())
+        self._count = 0
+        self._last_count = 0
+
+    def _roll(self, second: int):
+        if second == self._second:
+            return
+        self._last_count = self._count if second == self._second + 1 else 0
+        self._second = second
+        self._count = 0
+
+    def increment(self, n: int = 1):
+        self._roll(int(time.monotonic()))
+        self._count += n
+        self.total += n
+
+    @property
+    def rate(self) -> int:
+        self._roll(int(time.monotonic()))
+        return self._last_count
+
+
+class LatencyHistogram:
+    # upper bounds in seconds
+    buckets = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        index = 0
+        while index < len(self.buckets) and seconds > self.buckets[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'buckets': {
+                **{str(bound): count for bound, count in zip(self.buckets, self.counts)},
+                '+Inf': self.counts[-1],
+            },
+        }
+
+
+class CommandMetrics:
+    def __init__(self):
+        self.counts: dict[str, int] = {}
+        self.latencies: dict[str, LatencyHistogram] = {}
+
+    def observe(self, command: str, seconds: float):
+        if command not in self.counts:
+            self.counts[command] = 0
+            self.latencies[command] = LatencyHistogram()
+        self.counts[command] += 1
+        self.latencies[command].observe(seconds)
+
+    def to_dict(self):
+        return {
+            command: {
+                'count': count,
+                'latency': self.latencies[command].to_dict(),
+            } for command, count in self.counts.items()
+        }
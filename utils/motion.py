@@ -0,0 +1,154 @@
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from utils import geo_kernel
+from utils.geo import get_mag_vars_by_coordinates
+from utils.geo_kernel import EARTH_RADIUS_METERS, GEODESIC
+
+if TYPE_CHECKING:
+    from aircrafts.store import AircraftStore
+
+# WGS84
+SEMI_MAJOR_AXIS = 6378137.0
+ECCENTRICITY_SQUARED = 6.69437999014e-3
+
+
+def get_radii_of_curvature(latitudes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Meridian and prime vertical radii of curvature, latitudes in radians.
+    """
+    sin_latitudes = np.sin(latitudes)
+    w = 1 - ECCENTRICITY_SQUARED * sin_latitudes * sin_latitudes
+    return (
+        SEMI_MAJOR_AXIS * (1 - ECCENTRICITY_SQUARED) / w ** 1.5,
+        SEMI_MAJOR_AXIS / np.sqrt(w),
+    )
+
+
+def move_positions_on_sphere(
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    bearings: np.ndarray,
+    distances: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    The destinations of `geo_kernel.spherical_destination`, for many
+    positions at once.
+    """
+    phi1 = np.radians(latitudes)
+    theta = np.radians(bearings)
+    delta = distances / EARTH_RADIUS_METERS
+    sin_phi1 = np.sin(phi1)
+    cos_phi1 = np.cos(phi1)
+    sin_delta = np.sin(delta)
+    cos_delta = np.cos(delta)
+
+    sin_phi2 = np.clip(sin_phi1 * cos_delta + cos_phi1 * sin_delta * np.cos(theta), -1.0, 1.0)
+    lambda2 = np.radians(longitudes) + np.arctan2(
+        np.sin(theta) * sin_delta * cos_phi1,
+        cos_delta - sin_phi1 * sin_phi2
+    )
+    return np.degrees(np.arcsin(sin_phi2)), (np.degrees(lambda2) + 540) % 360 - 180
+
+
+def move_positions_on_ellipsoid(
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    bearings: np.ndarray,
+    distances: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Each step is integrated on the local tangent plane with the bearing
+    and the WGS84 radii of curvature at the middle of the step. A tick
+    moves an aircraft a few kilometers at most, where this agrees with the
+    geodesic destination to centimeters.
+    """
+    latitudes = np.radians(latitudes)
+    bearings = np.radians(bearings)
+
+    # a geodesic turns toward the pole, take the latitude and the bearing
+    # at the middle of the step, estimated from the start
+    meridian_radii, normal_radii = get_radii_of_curvature(latitudes)
+    east = distances * np.sin(bearings)
+    middle_bearings = bearings + east * np.tan(latitudes) / normal_radii / 2
+    north = distances * np.cos(middle_bearings)
+    east = distances * np.sin(middle_bearings)
+    middle_latitudes = latitudes + north / meridian_radii / 2
+    meridian_radii, normal_radii = get_radii_of_curvature(middle_latitudes)
+
+    new_latitudes = latitudes + north / meridian_radii
+    new_longitudes = longitudes + np.degrees(
+        east / (normal_radii * np.cos(middle_latitudes)))
+    new_longitudes = (new_longitudes + 180) % 360 - 180
+    return np.degrees(new_latitudes), new_longitudes
+
+
+def move_positions(
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    bearings: np.ndarray,
+    distances: np.ndarray,
+    mode: str | None = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Move many positions along their bearings (degrees) by their distances
+    (meters) in one step, on the earth model of the geo kernel, so that
+    the bearings and distances to the fixes agree with the movement.
+    """
+    if (mode or geo_kernel.accuracy) == GEODESIC:
+        return move_positions_on_ellipsoid(latitudes, longitudes, bearings, distances)
+    return move_positions_on_sphere(latitudes, longitudes, bearings, distances)
+
+
+class MotionBatch:
+    """
+    Movements of the registered aircraft collected during a tick and
+    applied together by `flush`, in place in the coordinate arrays of the
+    store. The decisions stay in the aircraft, only the integration of the
+    positions is vectorized.
+    """
+
+    def __init__(self, store: 'AircraftStore'):
+        self.store = store
+        self.ids: list[int] = []
+        self.bearings: list[float] = []
+        self.distances: list[float] = []
+        self.mag_vars: np.ndarray | None = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, aircraft_id: int, bearing: float, distance: float):
+        self.ids.append(aircraft_id)
+        self.bearings.append(bearing)
+        self.distances.append(distance)
+
+    def get_mag_var(self, aircraft_id: int) -> float:
+        """
+        Magnetic variation at the aircraft. The first call of a tick looks
+        it up for all the active aircraft of the store at once.
+        """
+        if self.mag_vars is None or aircraft_id >= len(self.mag_vars):
+            store = self.store
+            ids = np.flatnonzero(store.active[:store.size])
+            self.mag_vars = np.full(store.size, np.nan)
+            self.mag_vars[ids] = get_mag_vars_by_coordinates(
+                store.latitudes[ids], store.longitudes[ids])
+        return float(self.mag_vars[aircraft_id])
+
+    def flush(self):
+        self.mag_vars = None
+        if len(self.ids) == 0:
+            return
+        ids = np.array(self.ids, dtype=np.intp)
+        store = self.store
+        store.latitudes[ids], store.longitudes[ids] = move_positions(
+            store.latitudes[ids],
+            store.longitudes[ids],
+            np.array(self.bearings, dtype=np.float64),
+            np.array(self.distances, dtype=np.float64),
+        )
+        self.ids.clear()
+        self.bearings.clear()
+        self.distances.clear()
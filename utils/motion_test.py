@@ -0,0 +1,93 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+from geopy.distance import distance as distance_between
+
+from aircrafts.aircraft import Aircraft
+from aircrafts.store import AircraftStore
+from messages.Position import Position
+from utils.geo_kernel import GEODESIC, SPHERICAL, spherical_destination
+from utils.mag_var import MagVarGrid
+from utils.motion import MotionBatch, move_positions
+
+# latitude, longitude, bearing, meters
+MOVEMENTS = [
+    (25.08, 121.23, 53.0, 150.0),
+    (60.0, 10.0, 280.0, 3000.0),
+    (-33.9, 151.2, 180.0, 5000.0),
+    (70.0, -20.0, 45.0, 5000.0),
+    (0.0, 179.99, 90.0, 3000.0),
+]
+
+
+class TestMotion(unittest.TestCase):
+
+    def test_move_positions_like_geodesic(self):
+        latitudes, longitudes, bearings, distances = (np.array(c) for c in zip(*MOVEMENTS))
+        new_latitudes, new_longitudes = move_positions(
+            latitudes, longitudes, bearings, distances, GEODESIC)
+        for (latitude, longitude, bearing, meters), new_latitude, new_longitude in zip(
+            MOVEMENTS, new_latitudes, new_longitudes
+        ):
+            expected = distance_between(meters=meters).destination(
+                (latitude, longitude), bearing=bearing)
+            error = distance_between(
+                (expected.latitude, expected.longitude),
+                (new_latitude, new_longitude)
+            ).meters
+            self.assertLess(error, 0.01)
+
+    def test_move_positions_like_kernel(self):
+        latitudes, longitudes, bearings, distances = (np.array(c) for c in zip(*MOVEMENTS))
+        new_latitudes, new_longitudes = move_positions(
+            latitudes, longitudes, bearings, distances, SPHERICAL)
+        for (latitude, longitude, bearing, meters), new_latitude, new_longitude in zip(
+            MOVEMENTS, new_latitudes, new_longitudes
+        ):
+            expected = spherical_destination(latitude, longitude, bearing, meters)
+            self.assertAlmostEqual(new_latitude, expected[0], places=9)
+            self.assertAlmostEqual(new_longitude, expected[1], places=9)
+
+    def test_wrap_longitude(self):
+        for mode in (SPHERICAL, GEODESIC):
+            _, longitudes = move_positions(
+                np.array([0.0]), np.array([179.99]), np.array([90.0]), np.array([3000.0]), mode)
+            self.assertLess(longitudes[0], -179.9)
+
+    def test_flush(self):
+        store = AircraftStore()
+        aircraft = [Aircraft('CAL1', Position(25.0, 121.0)), Aircraft('CAL2', Position(25.0, 121.0))]
+        batch = MotionBatch(store)
+        batch.add(store.add(aircraft[0]), 0.0, 1000.0)
+        batch.add(store.add(aircraft[1]), 90.0, 1000.0)
+        self.assertEqual(len(batch), 2)
+        batch.flush()
+        self.assertEqual(len(batch), 0)
+        self.assertGreater(aircraft[0].position.latitude, 25.0)
+        self.assertEqual(aircraft[0].position.longitude, 121.0)
+        self.assertGreater(aircraft[1].position.longitude, 121.0)
+
+    def test_get_mag_var(self):
+        store = AircraftStore()
+        first = store.add(Aircraft('CAL1', Position(25.0, 121.0)))
+        removed = Aircraft('CAL2', Position(10.0, 100.0))
+        store.add(removed)
+        store.remove(removed)
+        second = store.add(Aircraft('CAL3', Position(-33.5, 151.0)))
+        batch = MotionBatch(store)
+        # the variation is the longitude
+        grid = MagVarGrid(np.repeat(np.arange(360.0), 181))
+        with patch('utils.geo.require_mag_var_grid', return_value=grid) as require_grid:
+            self.assertAlmostEqual(batch.get_mag_var(first), 121.0)
+            self.assertAlmostEqual(batch.get_mag_var(second), 151.0)
+            self.assertEqual(require_grid.call_count, 1)
+
+            batch.add(first, 90.0, 1000.0)
+            batch.flush()
+            self.assertGreater(batch.get_mag_var(first), 121.0)
+            self.assertEqual(require_grid.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,12 @@
 from datetime import timedelta
 
-from geopy.distance import Distance
+from utils.distance import (
+    Distance,
+    METERS_PER_FOOT,
+    METERS_PER_KILOMETER,
+    METERS_PER_MILE,
+    METERS_PER_NAUTICAL_MILE,
+)
 
 
 def get_acceleration_by_newton_2th(power_kg: float, aircraft_weight: float, drag_coefficient: float = 0.0):
@@ -12,32 +18,29 @@ def get_acceleration_by_newton_2th(power_kg: float, aircraft_weight: float, drag
     return Acceleration(mps2=acceleration)
 
 
-def cmp(a, b):
-    return (a > b) - (a < b)
-
-
 class Acceleration:
+    __slots__ = ('_mps2',)
+
     def __init__(
         self,
         mps2: float | None = None,   # meters per second
     ):
-        if mps2 is not None:
-            self.__distance_per_sec2 = Distance(meters=mps2)
-        else:
+        if mps2 is None:
             raise ValueError(
                 "Acceleration must be initialized with one of the units."
             )
+        self._mps2 = mps2
 
     def __add__(self, other):
         if isinstance(other, Acceleration):
-            return self.__class__(self.__distance_per_sec2.meters + other.__distance_per_sec2.meters)
+            return Acceleration(self._mps2 + other._mps2)
         else:
             raise TypeError(
                 "Acceleration instance must be added with Acceleration instance."
             )
 
     def __neg__(self):
-        return self.__class__(-self.__distance_per_sec2.meters)
+        return Acceleration(-self._mps2)
 
     def __sub__(self, other):
         return self + -other
@@ -48,77 +51,81 @@ class Acceleration:
                 "Acceleration instance must be multiplicated with numbers."
             )
         elif isinstance(other, timedelta):
-            return Speed(mps=self.__distance_per_sec2.meters * other.total_seconds())
+            return Speed(self._mps2 * other.total_seconds())
         else:
-            return self.__class__(self.__distance_per_sec2.meters * other)
+            return Acceleration(self._mps2 * other)
 
     def __rmul__(self, other):
-        if isinstance(other, Acceleration):
-            raise TypeError(
-                "Acceleration instance must be multiplicated with numbers."
-            )
-        elif isinstance(other, timedelta):
-            return Distance(meters=self.__distance_per_sec2 * other.total_seconds())
-        else:
-            return self.__class__(other * self.__distance_per_sec2.meters)
+        return self.__mul__(other)
 
     def __truediv__(self, other):
         if isinstance(other, Acceleration):
-            return self.__distance_per_sec2 / other.__distance_per_sec2
+            return self._mps2 / other._mps2
         else:
-            return self.__class__(self.__distance_per_sec2.meters / other)
+            return Acceleration(self._mps2 / other)
 
     def __floordiv__(self, other):
         if isinstance(other, Acceleration):
-            return self.__distance_per_sec2 // other.__distance_per_sec2
+            return self._mps2 // other._mps2
         else:
-            return self.__class__(self.__distance_per_sec2.meters // other)
+            return Acceleration(self._mps2 // other)
 
     def __abs__(self):
-        return self.__class__(abs(self.__distance_per_sec2.meters))
+        return Acceleration(abs(self._mps2))
 
     def __bool__(self):
-        return bool(self.__distance_per_sec2)
+        return bool(self._mps2)
 
     def __repr__(self):  # pragma: no cover
-        return 'Acceleration(%s)' % self.__distance_per_sec2
+        return 'Acceleration(%s)' % self._mps2
 
     def __str__(self):  # pragma: no cover
-        return '%s m/s^2' % self.__distance_per_sec2.meters
-
-    def __cmp__(self, other):  # py2 only
-        if isinstance(other, Acceleration):
-            return cmp(self.__distance_per_sec2, other.__distance_per_sec2)
-        else:
-            return cmp(self.__distance_per_sec2, other)
+        return '%s m/s^2' % self._mps2
 
     def __hash__(self):
-        return hash(self.__distance_per_sec2)
+        return hash(self._mps2)
 
     def __eq__(self, other):
-        return self.__cmp__(other) == 0
+        if isinstance(other, Acceleration):
+            return self._mps2 == other._mps2
+        return NotImplemented
 
     def __ne__(self, other):
-        return self.__cmp__(other) != 0
+        if isinstance(other, Acceleration):
+            return self._mps2 != other._mps2
+        return NotImplemented
 
     def __gt__(self, other):
-        return self.__cmp__(other) > 0
+        if isinstance(other, Acceleration):
+            return self._mps2 > other._mps2
+        return NotImplemented
 
     def __lt__(self, other):
-        return self.__cmp__(other) < 0
+        if isinstance(other, Acceleration):
+            return self._mps2 < other._mps2
+        return NotImplemented
 
     def __ge__(self, other):
-        return self.__cmp__(other) >= 0
+        if isinstance(other, Acceleration):
+            return self._mps2 >= other._mps2
+        return NotImplemented
 
     def __le__(self, other):
-        return self.__cmp__(other) <= 0
+        if isinstance(other, Acceleration):
+            return self._mps2 <= other._mps2
+        return NotImplemented
 
     @property
     def mps2(self) -> float:
-        return self.__distance_per_sec2.meters
+        return self._mps2
 
 
 class Speed:
+    """
+    A speed stored as a float of meters per second.
+    """
+    __slots__ = ('_mps',)
+
     def __init__(
         self,
         mps: float | None = None,   # meters per second
@@ -130,19 +137,19 @@ class Speed:
         fpm: float | None = None,  # feet per minute
     ):
         if mps is not None:
-            self.__distance_per_sec = Distance(meters=mps)
+            self._mps = mps
         elif mph is not None:
-            self.__distance_per_sec = Distance(miles=mph / 3600)
+            self._mps = mph * METERS_PER_MILE / 3600
         elif kps is not None:
-            self.__distance_per_sec = Distance(kilometers=kps)
+            self._mps = kps * METERS_PER_KILOMETER
         elif kph is not None:
-            self.__distance_per_sec = Distance(kilometers=kph / 3600)
+            self._mps = kph * METERS_PER_KILOMETER / 3600
         elif knots is not None:
-            self.__distance_per_sec = Distance(nautical=knots / 3600)
+            self._mps = knots * METERS_PER_NAUTICAL_MILE / 3600
         elif fps is not None:
-            self.__distance_per_sec = Distance(feet=fps)
+            self._mps = fps * METERS_PER_FOOT
         elif fpm is not None:
-            self.__distance_per_sec = Distance(feet=fpm / 60)
+            self._mps = fpm * METERS_PER_FOOT / 60
         else:
             raise ValueError(
                 "Speed must be initialized with one of the units."
@@ -150,16 +157,18 @@ class Speed:
 
     def __add__(self, other):
         if isinstance(other, Speed):
-            return self.__class__(mps=self.__distance_per_sec.meters + other.__distance_per_sec.meters)
+            return Speed(self._mps + other._mps)
         else:
             raise TypeError(
                 "Speed instance must be added with Speed instance."
             )
 
     def __neg__(self):
-        return self.__class__(mps=-self.__distance_per_sec.meters)
+        return Speed(-self._mps)
 
     def __sub__(self, other):
+        if isinstance(other, Speed):
+            return Speed(self._mps - other._mps)
         return self + -other
 
     def __mul__(self, other):
@@ -168,97 +177,96 @@ class Speed:
                 "Speed instance must be multiplicated with numbers."
             )
         elif isinstance(other, timedelta):
-            return Distance(meters=self.__distance_per_sec.meters * other.total_seconds())
+            return Distance.from_meters(self._mps * other.total_seconds())
         else:
-            return self.__class__(self.__distance_per_sec.meters * other)
+            return Speed(self._mps * other)
 
     def __rmul__(self, other):
-        if isinstance(other, Speed):
-            raise TypeError(
-                "Speed instance must be multiplicated with numbers."
-            )
-        elif isinstance(other, timedelta):
-            return Distance(meters=self.__distance_per_sec * other.total_seconds())
-        else:
-            return self.__class__(other * self.__distance_per_sec.meters)
+        return self.__mul__(other)
 
     def __truediv__(self, other):
         if isinstance(other, Speed):
-            return self.__distance_per_sec / other.__distance_per_sec
+            return self._mps / other._mps
         elif isinstance(other, Acceleration):
-            return timedelta(seconds=self.__distance_per_sec.meters / other.mps2)
+            return timedelta(seconds=self._mps / other.mps2)
         else:
-            return self.__class__(self.__distance_per_sec.meters / other)
+            return Speed(self._mps / other)
 
     def __floordiv__(self, other):
         if isinstance(other, Speed):
-            return self.__distance_per_sec // other.__distance_per_sec
+            return self._mps // other._mps
         else:
-            return self.__class__(self.__distance_per_sec.meters // other)
+            return Speed(self._mps // other)
 
     def __abs__(self):
-        return self.__class__(abs(self.__distance_per_sec.meters))
+        return Speed(abs(self._mps))
 
     def __bool__(self):
-        return bool(self.__distance_per_sec)
+        return bool(self._mps)
 
     def __repr__(self):  # pragma: no cover
-        return 'Speed(%s)' % self.__distance_per_sec
+        return 'Speed(%s)' % self._mps
 
     def __str__(self):  # pragma: no cover
-        return '%s m/s' % self.__distance_per_sec.meters
-
-    def __cmp__(self, other):  # py2 only
-        if isinstance(other, Speed):
-            return cmp(self.__distance_per_sec, other.__distance_per_sec)
-        else:
-            return cmp(self.__distance_per_sec, other)
+        return '%s m/s' % self._mps
 
     def __hash__(self):
-        return hash(self.__distance_per_sec)
+        return hash(self._mps)
 
     def __eq__(self, other):
-        return self.__cmp__(other) == 0
+        if isinstance(other, Speed):
+            return self._mps == other._mps
+        return NotImplemented
 
     def __ne__(self, other):
-        return self.__cmp__(other) != 0
+        if isinstance(other, Speed):
+            return self._mps != other._mps
+        return NotImplemented
 
     def __gt__(self, other):
-        return self.__cmp__(other) > 0
+        if isinstance(other, Speed):
+            return self._mps > other._mps
+        return NotImplemented
 
     def __lt__(self, other):
-        return self.__cmp__(other) < 0
+        if isinstance(other, Speed):
+            return self._mps < other._mps
+        return NotImplemented
 
     def __ge__(self, other):
-        return self.__cmp__(other) >= 0
+        if isinstance(other, Speed):
+            return self._mps >= other._mps
+        return NotImplemented
 
     def __le__(self, other):
-        return self.__cmp__(other) <= 0
+        if isinstance(other, Speed):
+            return self._mps <= other._mps
+        return NotImplemented
 
     @property
     def mps(self) -> float:
-        return self.__distance_per_sec.meters
+        return self._mps
 
     @property
     def mph(self) -> float:
-        return self.__distance_per_sec.miles * 3600
+        return self._mps * 3600 / METERS_PER_MILE
 
     @property
     def kps(self) -> float:
-        return self.__distance_per_sec.kilometers
+        return self._mps / METERS_PER_KILOMETER
 
     @property
     def kph(self) -> float:
-        return self.__distance_per_sec.kilometers * 3600
+        return self._mps * 3600 / METERS_PER_KILOMETER
 
     @property
     def knots(self) -> float:
-        return self.__distance_per_sec.nautical * 3600
+        return self._mps * 3600 / METERS_PER_NAUTICAL_MILE
 
     @property
     def fps(self) -> float:
-        return self.__distance_per_sec.feet
+        return self._mps / METERS_PER_FOOT
 
     @property
     def fpm(self) -> float:
-        return self.__distance_per_sec.feet * 60
+        return self._mps * 60 / METERS_PER_FOOT
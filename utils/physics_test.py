@@ -1,7 +1,7 @@
 from datetime import timedelta
 import unittest
 
-from geopy.distance import Distance
+from utils.distance import Distance
 
 from utils.physics import Speed, Acceleration
 
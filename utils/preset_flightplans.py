@@ -1,7 +1,7 @@
 from random import choice
 from typing import Any
 
-from geopy.distance import Distance
+from utils.distance import Distance
 
 from utils.flightplan import Flightplan
 from utils.physics import Speed
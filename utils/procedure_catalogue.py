@@ -0,0 +1,103 @@
+from logging import getLogger
+
+from db.init import detach
+from db.models import Approach
+from db.navdata import navdata
+from helpers import (
+    get_sid_approaches_by_airport_ident,
+    get_star_approaches_by_airport_ident,
+    get_approach_approaches_by_airport_ident
+)
+
+logger = getLogger(__name__)
+
+
+def _index(index: dict[str, list[Approach]], fix_ident: str | None, approach: Approach):
+    if fix_ident is None:
+        return
+    approaches = index.setdefault(fix_ident, [])
+    if approach not in approaches:
+        approaches.append(approach)
+
+
+class ProcedureCatalogue:
+    """
+    Procedures of an airport indexed by the fixes connecting them to the
+    route. SIDs by their last fix, STARs by their first fix and approaches
+    by their first fix and the first fixes of their transitions.
+    """
+
+    def __init__(
+        self,
+        airport_ident: str,
+        sids: list[Approach],
+        stars: list[Approach],
+        approaches: list[Approach]
+    ):
+        self.airport_ident = airport_ident
+        self.sids = sids
+        self.stars = stars
+        self.approaches = approaches
+        self.sids_by_exit_fix: dict[str, list[Approach]] = {}
+        self.stars_by_entry_fix: dict[str, list[Approach]] = {}
+        self.approaches_by_entry_fix: dict[str, list[Approach]] = {}
+
+        for sid in sids:
+            if len(sid.approach_legs) != 0:
+                _index(self.sids_by_exit_fix, sid.approach_legs[-1].fix_ident, sid)
+        for star in stars:
+            if len(star.approach_legs) != 0:
+                _index(self.stars_by_entry_fix, star.approach_legs[0].fix_ident, star)
+        for approach in approaches:
+            if len(approach.approach_legs) != 0:
+                _index(self.approaches_by_entry_fix,
+                       approach.approach_legs[0].fix_ident, approach)
+            for transition in approach.transitions:
+                _index(self.approaches_by_entry_fix,
+                       transition.fix_ident, approach)
+
+    @classmethod
+    def load(cls, airport_ident: str):
+        logger.debug('Build procedure catalogue of %s', airport_ident)
+        catalogue = cls(
+            airport_ident,
+            get_sid_approaches_by_airport_ident(airport_ident),
+            get_star_approaches_by_airport_ident(airport_ident),
+            get_approach_approaches_by_airport_ident(airport_ident),
+        )
+        # built in a database executor thread and read from the others,
+        # with the legs and the transitions loaded while indexing
+        detach([*catalogue.sids, *catalogue.stars, *catalogue.approaches])
+        return catalogue
+
+    def get_sids_by_exit_fix(self, fix_ident: str) -> list[Approach]:
+        return self.sids_by_exit_fix.get(fix_ident, [])
+
+    def get_stars_by_entry_fix(self, fix_ident: str) -> list[Approach]:
+        return self.stars_by_entry_fix.get(fix_ident, [])
+
+    def get_approaches_by_entry_fix(self, fix_ident: str) -> list[Approach]:
+        return self.approaches_by_entry_fix.get(fix_ident, [])
+
+
+class ProcedureCatalogues:
+    """
+    Catalogues built on first use, dropped when the navdata is reloaded.
+    """
+
+    def __init__(self):
+        self.catalogues: dict[str, ProcedureCatalogue] = {}
+
+    def get(self, airport_ident: str) -> ProcedureCatalogue:
+        catalogue = self.catalogues.get(airport_ident)
+        if catalogue is None:
+            catalogue = ProcedureCatalogue.load(airport_ident)
+            self.catalogues[airport_ident] = catalogue
+        return catalogue
+
+    def clear(self):
+        self.catalogues.clear()
+
+
+procedure_catalogues = ProcedureCatalogues()
+navdata.on_reload(procedure_catalogues.clear)
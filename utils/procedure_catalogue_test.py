@@ -0,0 +1,95 @@
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import Column, MetaData, Table, create_engine
+from sqlalchemy.orm import Session
+
+from db.models import Approach, ApproachLeg, Ils, RunwayEnd, Start, Transition, TransitionLeg
+from utils.procedure_catalogue import ProcedureCatalogue
+from utils.procedure_compiler import ProcedureCompiler
+
+
+def create_approach(approach_id: int, fix_idents: list[str], transition_fix_idents: list[str] = []):
+    approach = Approach(approach_id=approach_id, airport_ident='RCKH')
+    approach.approach_legs = [ApproachLeg(fix_ident=ident)
+                              for ident in fix_idents]
+    approach.transitions = [Transition(fix_ident=ident)
+                            for ident in transition_fix_idents]
+    return approach
+
+
+class TestProcedureCatalogue(unittest.TestCase):
+
+    def setUp(self):
+        self.sid = create_approach(1, ['RW09', 'KH050', 'TNN'])
+        self.star = create_approach(2, ['TNN', 'JAMMY'])
+        self.ils = create_approach(3, ['JAMMY', 'RW09'], ['TNN', 'JAMMY'])
+        self.rnp = create_approach(4, ['RUDDY', 'RW09'], ['JAMMY'])
+        self.catalogue = ProcedureCatalogue(
+            'RCKH', [self.sid], [self.star], [self.ils, self.rnp])
+
+    def test_sids_by_exit_fix(self):
+        self.assertEqual(self.catalogue.get_sids_by_exit_fix('TNN'), [self.sid])
+        self.assertEqual(self.catalogue.get_sids_by_exit_fix('RW09'), [])
+
+    def test_stars_by_entry_fix(self):
+        self.assertEqual(self.catalogue.get_stars_by_entry_fix('TNN'), [self.star])
+
+    def test_approaches_by_entry_fix(self):
+        self.assertEqual(
+            self.catalogue.get_approaches_by_entry_fix('JAMMY'),
+            [self.ils, self.rnp]
+        )
+        self.assertEqual(
+            self.catalogue.get_approaches_by_entry_fix('TNN'), [self.ils])
+        self.assertEqual(
+            self.catalogue.get_approaches_by_entry_fix('RUDDY'), [self.rnp])
+
+
+
+def create_session():
+    """
+    The tables of the procedures, without the constraints of the columns
+    not set below.
+    """
+    engine = create_engine('sqlite://')
+    metadata = MetaData()
+    for model in (Approach, ApproachLeg, Transition, TransitionLeg, RunwayEnd, Ils, Start):
+        Table(model.__tablename__, metadata, *(
+            Column(column.name, column.type, primary_key=column.primary_key)
+            for column in model.__table__.columns
+        ))
+    metadata.create_all(engine)
+    db_session = Session(engine)
+    runway_end = RunwayEnd(runway_end_id=1, name='09', laty=22.57, lonx=120.33)
+    runway_end.ils = Ils(ils_id=1, ident='IKHH')
+    runway_end.start = Start(start_id=1, runway_name='09')
+    approach = create_approach(1, ['JAMMY', 'RW09'], ['TNN'])
+    approach.type = 'ILS'
+    approach.runway_end = runway_end
+    approach.transitions[0].transition_legs = [TransitionLeg(fix_ident='TNN')]
+    db_session.add(approach)
+    db_session.commit()
+    db_session.close()
+    return Session(engine)
+
+
+class TestLoadProcedureCatalogue(unittest.TestCase):
+
+    def test_detached_approaches(self):
+        db_session = create_session()
+        with patch('helpers.session', db_session):
+            catalogue = ProcedureCatalogue.load('RCKH')
+        db_session.close()
+
+        approach = catalogue.get_approaches_by_entry_fix('TNN')[0]
+        compiler = ProcedureCompiler(fill_legs=lambda legs, _: legs)
+        legs = compiler.get_legs(approach, 'RCKH', approach.transitions[0])
+        self.assertEqual([leg.fix_ident for leg in legs], ['TNN', 'JAMMY', 'RW09'])
+        self.assertEqual(approach.runway_end.name, '09')
+        self.assertEqual(approach.runway_end.ils.ident, 'IKHH')
+        self.assertEqual(approach.runway_end.start.runway_name, '09')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+from logging import getLogger
+from typing import Callable
+
+from db.models import Approach, Transition, ProcedureLeg
+from db.navdata import navdata
+from helpers import fill_position_on_legs
+from utils.leg import Leg
+
+logger = getLogger(__name__)
+
+
+class ProcedureCompiler:
+    """
+    Resolve the legs of SIDs, STARs and approaches once and share them.
+
+    Compiled legs are tuples, so every aircraft copies them into its own
+    list before flying them. The cache is cleared when the navdata is
+    reloaded.
+    """
+
+    def __init__(
+        self,
+        fill_legs: Callable[[list[ProcedureLeg], str | None], list[Leg]] = fill_position_on_legs
+    ):
+        self.fill_legs = fill_legs
+        self.procedures: dict[tuple[int, int | None, str | None, bool], tuple[Leg, ...]] = {}
+        self.compile_count = 0
+
+    def get_legs(
+        self,
+        approach: Approach,
+        airport_ident: str | None = None,
+        transition: Transition | None = None,
+        include_missed: bool = True
+    ) -> tuple[Leg, ...]:
+        key = (
+            approach.approach_id,
+            None if transition is None else transition.transition_id,
+            airport_ident,
+            include_missed
+        )
+        legs = self.procedures.get(key)
+        if legs is None:
+            logger.debug('Compile procedure %s', key)
+            procedure_legs = [] if transition is None else list(
+                transition.transition_legs)
+            procedure_legs += [
+                al for al in approach.approach_legs
+                if include_missed or not al.is_missed
+            ]
+            legs = tuple(self.fill_legs(procedure_legs, airport_ident))
+            self.procedures[key] = legs
+            self.compile_count += 1
+        return legs
+
+    def clear(self):
+        self.procedures.clear()
+
+
+procedure_compiler = ProcedureCompiler()
+navdata.on_reload(procedure_compiler.clear)
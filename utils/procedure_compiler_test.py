@@ -0,0 +1,74 @@
+import unittest
+
+from db.models import Approach, ApproachLeg, Transition, TransitionLeg
+from utils.leg import Leg
+from utils.procedure_compiler import ProcedureCompiler
+
+
+def create_approach_leg(fix_ident: str, is_missed: int = 0):
+    return ApproachLeg(fix_ident=fix_ident, type='TF', fix_laty=25.0,
+                       fix_lonx=121.0, is_missed=is_missed)
+
+
+def create_approach():
+    approach = Approach(approach_id=1, airport_ident='RCTP')
+    approach.approach_legs = [
+        create_approach_leg('TONGA'),
+        create_approach_leg('RW05L'),
+        create_approach_leg('TNN', is_missed=1),
+    ]
+    return approach
+
+
+class TestProcedureCompiler(unittest.TestCase):
+
+    def setUp(self):
+        self.compiled = 0
+
+        def fill_legs(procedure_legs, airport_ident):
+            self.compiled += 1
+            return [Leg.from_procedure_leg(pl, laty=24.0, lonx=120.0)
+                    for pl in procedure_legs]
+
+        self.compiler = ProcedureCompiler(fill_legs)
+
+    def test_compile_once(self):
+        approach = create_approach()
+        legs = self.compiler.get_legs(approach, 'RCTP')
+        self.assertIsInstance(legs, tuple)
+        self.assertEqual([l.ident for l in legs], ['TONGA', 'RW05L', 'TNN'])
+        for _ in range(50):
+            self.assertIs(self.compiler.get_legs(approach, 'RCTP'), legs)
+        self.assertEqual(self.compiled, 1)
+
+    def test_procedure_legs_not_modified(self):
+        approach = create_approach()
+        legs = self.compiler.get_legs(approach, 'RCTP')
+        self.assertEqual((legs[0].laty, legs[0].lonx), (24.0, 120.0))
+        self.assertEqual(
+            (approach.approach_legs[0].fix_laty,
+             approach.approach_legs[0].fix_lonx),
+            (25.0, 121.0)
+        )
+
+    def test_transition_and_missed_legs(self):
+        approach = create_approach()
+        transition = Transition(transition_id=7)
+        transition.transition_legs = [
+            TransitionLeg(fix_ident='JAMMY', type='IF', fix_laty=25.5, fix_lonx=121.5)]
+        legs = self.compiler.get_legs(
+            approach, 'RCTP', transition, include_missed=False)
+        self.assertEqual([l.ident for l in legs], ['JAMMY', 'TONGA', 'RW05L'])
+        self.compiler.get_legs(approach, 'RCTP')
+        self.assertEqual(self.compiled, 2)
+
+    def test_clear(self):
+        approach = create_approach()
+        self.compiler.get_legs(approach, 'RCTP')
+        self.compiler.clear()
+        self.compiler.get_legs(approach, 'RCTP')
+        self.assertEqual(self.compiled, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
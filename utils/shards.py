@@ -0,0 +1,198 @@
+"""
+Bots simulated in worker processes.
+
+Each worker owns the bots whose callsigns hash to its shard, runs their
+ticks and returns their packed position records with the messages they
+sent. The front-end only keeps a stand-in of each bot for the networking
+and the fan-out.
+"""
+import struct
+import multiprocessing
+from datetime import timedelta
+from logging import getLogger
+from typing import Any, Callable, Iterable
+from zlib import crc32
+
+from aircrafts.aircraft import Aircraft
+from messages.Position import Position
+from messages.TextMessage import TextMessage
+from utils.bearing import Bearing
+from utils.distance import Distance
+from utils.flightplan import Flightplan
+from utils.physics import Speed
+
+logger = getLogger(__name__)
+
+# latitude, longitude, altitude (feet, NaN without altitude), speed (knots),
+# heading, callsign length, position update length
+RECORD = struct.Struct('<dddddHH')
+STOP_TIMEOUT = 5
+
+PositionRecord = tuple[str, float, float, float, float, float, str]
+
+
+def get_shard_index(callsign: str, shard_count: int) -> int:
+    return crc32(callsign.encode()) % shard_count
+
+
+def pack_records(records: Iterable[PositionRecord]) -> bytes:
+    chunks: list[bytes] = []
+    for callsign, latitude, longitude, altitude, speed, heading, position_update in records:
+        encoded_callsign = callsign.encode()
+        encoded_update = position_update.encode()
+        chunks.append(RECORD.pack(
+            latitude, longitude, altitude, speed, heading,
+            len(encoded_callsign), len(encoded_update)
+        ))
+        chunks.append(encoded_callsign)
+        chunks.append(encoded_update)
+    return b''.join(chunks)
+
+
+def unpack_records(data: bytes) -> list[PositionRecord]:
+    records: list[PositionRecord] = []
+    offset = 0
+    while offset < len(data):
+        latitude, longitude, altitude, speed, heading, callsign_length, update_length = \
+            RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        callsign = data[offset:offset + callsign_length].decode()
+        offset += callsign_length
+        position_update = data[offset:offset + update_length].decode()
+        offset += update_length
+        records.append((callsign, latitude, longitude, altitude, speed, heading, position_update))
+    return records
+
+
+class ShardAircraft(Aircraft):
+    """
+    Front-end stand-in of a bot simulated by a worker, with its last
+    reported state and position update.
+    """
+    __slots__ = ('position_update',)
+
+    def __init__(self, callsign: str, flightplan: Flightplan | None = None):
+        super().__init__(
+            callsign=callsign,
+            position=Position(0, 0),
+            flightplan=flightplan,
+        )
+        self.position_update = ''
+
+    def update(
+        self,
+        latitude: float,
+        longitude: float,
+        altitude: float,
+        speed: float,
+        heading: float,
+        position_update: str
+    ):
+        self.position.set_coordinates(latitude, longitude)
+        self.position.altitude_ = None if altitude != altitude else Distance(feet=altitude)
+        self.speed = Speed(knots=speed)
+        self.heading = Bearing(heading)
+        self.position_update = position_update
+
+    def get_position_update_message(self):
+        return self.position_update
+
+
+class Shard:
+    def __init__(self, index: int, process: multiprocessing.Process, pipe):
+        self.index = index
+        self.process = process
+        self.pipe = pipe
+        # waiting for the reply of the previous tick
+        self.is_busy = False
+        self.is_closed = False
+        # seconds and instructions not sent to the worker yet
+        self.elapsed = 0.0
+        self.messages: list[TextMessage] = []
+
+
+class ShardPool:
+    """
+    The worker processes and their pipes. A request carries the seconds
+    elapsed and the instructions for the shard; a worker still busy with
+    the previous tick gets them with the next one instead of queueing.
+
+    `target(shard_index, shard_count, pipe, *args)` is the worker entry
+    point. It answers every request and stops on None.
+    """
+
+    def __init__(self, count: int, target: Callable[..., None], *args: Any):
+        self.count = count
+        self.target = target
+        self.args = args
+        self.shards: list[Shard] = []
+
+    def start(self):
+        # spawn instead of fork, the workers open their own database
+        # connections and event loops
+        context = multiprocessing.get_context('spawn')
+        for index in range(self.count):
+            pipe, worker_pipe = context.Pipe()
+            process = context.Process(
+                target=self.target,
+                args=(index, self.count, worker_pipe, *self.args),
+                name=f'shard-{index}',
+                daemon=True,
+            )
+            process.start()
+            worker_pipe.close()
+            self.shards.append(Shard(index, process, pipe))
+        return self
+
+    def forward(self, callsign: str, message: TextMessage):
+        self.shards[get_shard_index(callsign, self.count)].messages.append(message)
+
+    def tick(self, after_time: timedelta):
+        for shard in self.shards:
+            if shard.is_closed:
+                continue
+            shard.elapsed += after_time.total_seconds()
+            if shard.is_busy:
+                continue
+            try:
+                shard.pipe.send((shard.elapsed, shard.messages))
+            except OSError as err:
+                self._close(shard, err)
+                continue
+            shard.is_busy = True
+            shard.elapsed = 0.0
+            shard.messages = []
+
+    def poll(self) -> list[Any]:
+        """
+        Replies received since the last poll, without waiting.
+        """
+        replies = []
+        for shard in self.shards:
+            if shard.is_closed:
+                continue
+            try:
+                while shard.pipe.poll():
+                    replies.append(shard.pipe.recv())
+                    shard.is_busy = False
+            except (EOFError, OSError) as err:
+                self._close(shard, err)
+        return replies
+
+    def _close(self, shard: Shard, err: Exception):
+        logger.error('Shard %d stopped: %r', shard.index, err)
+        shard.is_closed = True
+        shard.pipe.close()
+
+    def stop(self):
+        for shard in self.shards:
+            if not shard.is_closed:
+                try:
+                    shard.pipe.send(None)
+                except OSError:
+                    pass
+                shard.pipe.close()
+            shard.process.join(STOP_TIMEOUT)
+            if shard.process.is_alive():
+                shard.process.terminate()
+        self.shards = []
@@ -0,0 +1,131 @@
+import time
+import unittest
+from datetime import timedelta
+
+from messages.DeletePilotMessage import DeletePilotMessage
+from messages.TextMessage import TextMessage
+from utils.connection import encode_message
+from utils.shards import (
+    ShardAircraft,
+    ShardPool,
+    get_shard_index,
+    pack_records,
+    unpack_records,
+)
+
+RECORDS = [
+    ('CAL123', 25.08, 121.23, 1500.0, 180.0, 53.0, '@N:CAL123:2000:4:25.08:121.23:1500:180:0:0'),
+    ('EVA456', 24.0, 120.0, float('nan'), 0.0, 270.0, '@S:EVA456:2000:4:24.0:120.0:0:0:0:0'),
+]
+
+
+def echo_worker(shard_index, shard_count, pipe):
+    while True:
+        request = pipe.recv()
+        if request is None:
+            break
+        seconds, messages = request
+        pipe.send((shard_index, seconds, [m.message for m in messages]))
+
+
+def wait_replies(pool: ShardPool, count: int):
+    replies = []
+    deadline = time.monotonic() + 30
+    while len(replies) < count and time.monotonic() < deadline:
+        replies += pool.poll()
+        time.sleep(0.01)
+    return replies
+
+
+class TestShards(unittest.TestCase):
+
+    def test_shard_index(self):
+        self.assertEqual(get_shard_index('CAL123', 4), get_shard_index('CAL123', 4))
+        self.assertEqual(
+            {get_shard_index(f'CAL{i}', 4) for i in range(100, 200)},
+            {0, 1, 2, 3}
+        )
+
+    def test_records(self):
+        unpacked = unpack_records(pack_records(RECORDS))
+        self.assertEqual(unpacked[0], RECORDS[0])
+        self.assertEqual(unpacked[1][0], 'EVA456')
+        self.assertNotEqual(unpacked[1][3], unpacked[1][3])
+
+    def test_shard_aircraft(self):
+        aircraft = ShardAircraft('CAL123')
+        aircraft.update(*RECORDS[0][1:])
+        self.assertEqual(aircraft.position.latitude, 25.08)
+        self.assertAlmostEqual(aircraft.position.altitude_.feet, 1500)
+        self.assertAlmostEqual(aircraft.speed.knots, 180)
+        self.assertEqual(aircraft.heading.degrees, 53.0)
+        self.assertEqual(
+            encode_message(aircraft.get_position_update_message()),
+            (RECORDS[0][6] + '\r\n').encode()
+        )
+        aircraft.update(*RECORDS[1][1:])
+        self.assertIsNone(aircraft.position.altitude_)
+
+    def test_pool(self):
+        pool = ShardPool(2, echo_worker).start()
+        try:
+            pool.forward('CAL123', TextMessage('RCTP_GND', 'CAL123', 'CAL123, taxi via N'))
+            pool.tick(timedelta(seconds=2))
+            # busy, the time is sent with the next request
+            pool.tick(timedelta(seconds=2))
+            replies = sorted(wait_replies(pool, 2))
+            self.assertEqual([(index, seconds) for index, seconds, _ in replies], [(0, 2.0), (1, 2.0)])
+            self.assertEqual(
+                replies[get_shard_index('CAL123', 2)][2], ['CAL123, taxi via N'])
+            pool.tick(timedelta(seconds=2))
+            self.assertEqual([seconds for _, seconds, _ in wait_replies(pool, 2)], [4.0, 4.0])
+        finally:
+            pool.stop()
+        self.assertEqual(pool.shards, [])
+
+
+class TestShardReplies(unittest.TestCase):
+
+    def test_apply_reply(self):
+        from training_server import TrainingServer, SHARD_TEXT, SHARD_BROADCAST
+        server = TrainingServer()
+        atc = FakeConnection('RCTP_GND')
+        server.connections[atc.id] = atc
+        server.callsigns[atc.callsign] = atc
+
+        server.apply_shard_reply(
+            [('CAL123', None)],
+            [],
+            [(SHARD_TEXT, TextMessage('CAL123', 'RCTP_GND', 'Taxi via N, CAL123'))],
+            pack_records(RECORDS[:1])
+        )
+        conn = server.get_connection_by_callsign('CAL123')
+        self.assertIsInstance(conn.aircraft, ShardAircraft)
+        self.assertEqual(conn.aircraft.position.longitude, 121.23)
+        self.assertEqual(atc.sent, ['#TMCAL123:RCTP_GND:Taxi via N, CAL123'])
+
+        server.apply_shard_reply(
+            [],
+            ['CAL123'],
+            [(SHARD_BROADCAST, DeletePilotMessage('CAL123'))],
+            b''
+        )
+        self.assertIsNone(server.get_connection_by_callsign('CAL123'))
+        self.assertEqual(atc.sent[-1], '#DPCAL123')
+        self.assertEqual(len(server.aircraft_store), 0)
+
+
+class FakeConnection:
+    def __init__(self, callsign: str):
+        self.id = callsign
+        self.callsign = callsign
+        self.type = 'ATC'
+        self.aircraft = None
+        self.sent: list[str] = []
+
+    def send(self, message):
+        self.sent.append(str(message))
+
+
+if __name__ == '__main__':
+    unittest.main()
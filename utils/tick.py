@@ -1,53 +1,114 @@
-import threading
-from datetime import datetime, timedelta
-from typing import TYPE_CHECKING
+import asyncio
+from datetime import timedelta
+from logging import getLogger
+from typing import Callable
 
-from utils.fsd_server import FsdServer
+logger = getLogger(__name__)
 
 
-def set_interval(func, sec: float, last_time: datetime):
-    def func_wrapper():
-        now = datetime.now()
-        set_interval(func, sec, now)
-        func(now - last_time)
-    t = threading.Timer(sec, func_wrapper)
-    t.start()
-    return t
+class TickMetrics:
+    def __init__(self):
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped_ticks = 0
+        self.last_duration = 0.0
+        self.max_duration = 0.0
+        self.total_duration = 0.0
 
+    @property
+    def average_duration(self) -> float:
+        if self.ticks == 0:
+            return 0.0
+        return self.total_duration / self.ticks
+
+    def record(self, duration: float):
+        self.ticks += 1
+        self.last_duration = duration
+        self.max_duration = max(self.max_duration, duration)
+        self.total_duration += duration
+
+    def to_dict(self):
+        return {
+            'ticks': self.ticks,
+            'overruns': self.overruns,
+            'skippedTicks': self.skipped_ticks,
+            'lastDuration': self.last_duration,
+            'maxDuration': self.max_duration,
+            'averageDuration': self.average_duration,
+        }
+
+
+class TickScheduler:
+    """
+    Fixed-rate scheduler running on the asyncio event loop.
+
+    Deadlines are computed from the monotonic loop clock as
+    `start + n * interval`, so slow callbacks don't push later ticks back.
+    When a tick overruns by whole intervals, up to `max_catch_up` missed
+    ticks are run back-to-back and the rest are skipped and counted.
+    The callback receives the real time elapsed since the previous tick.
+    """
 
-class Tick:
     def __init__(
         self,
-        sec: float,
-        server: FsdServer,
-        on_tick,
-        on_tick_connection
-    ) -> None:
-        self.sec = sec
-        self.server = server
-        self.on_tick = on_tick
-        self.on_tick_connection = on_tick_connection
+        interval: float,
+        callback: Callable[[timedelta], None],
+        max_catch_up: int = 1,
+    ):
+        self.interval = interval
+        self.callback = callback
+        self.max_catch_up = max_catch_up
+        self.metrics = TickMetrics()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._handle: asyncio.TimerHandle | None = None
+        self._next_deadline = 0.0
+        self._last_time = 0.0
+
+    @property
+    def is_running(self):
+        return self._handle is not None
 
     def start(self):
-        def send_all_aircraft_position(after_time: timedelta):
-            self.on_tick()
-
-            # copy to avoid RuntimeError: dictionary changed size during iteration
-            for conn in self.server.connections.values():
-                self.on_tick_connection(conn, after_time)
-
-                if conn.type != 'PILOT' or conn.aircraft is None:
-                    continue
-
-                aircraft = conn.aircraft
-                position_update_message = aircraft.get_position_update_message()
-                for connection in self.connections.values():
-                    connection.send(str(position_update_message))
-            # average 200 seconds to generate an new aircraft
-            # if randint(0, 100) > 98:
-            #     factory.generate_w_random_situation()
-        return set_interval(
-            send_all_aircraft_position,
-            self.sec,
-            datetime.now()
-        )
+        if self.is_running:
+            return self
+        self._loop = asyncio.get_running_loop()
+        self._last_time = self._loop.time()
+        self._next_deadline = self._last_time + self.interval
+        self._handle = self._loop.call_at(self._next_deadline, self._run)
+        return self
+
+    def stop(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _run(self):
+        started = self._loop.time()
+        after_time = timedelta(seconds=started - self._last_time)
+        self._last_time = started
+        try:
+            self.callback(after_time)
+        except Exception as err:
+            logger.exception(err)
+        finished = self._loop.time()
+        self.metrics.record(finished - started)
+
+        # the callback may stop the scheduler
+        if self._handle is None:
+            return
+
+        self._next_deadline += self.interval
+        if finished > self._next_deadline:
+            self.metrics.overruns += 1
+            lateness = finished - self._next_deadline
+            missed = int(lateness // self.interval)
+            if missed >= self.max_catch_up:
+                skipped = missed - self.max_catch_up + 1
+                self.metrics.skipped_ticks += skipped
+                self._next_deadline += skipped * self.interval
+                logger.warning(
+                    'Tick is %.3fs behind, skipped %d tick(s)',
+                    lateness,
+                    skipped
+                )
+        self._handle = self._loop.call_at(self._next_deadline, self._run)
@@ -0,0 +1,59 @@
+import asyncio
+import time
+import unittest
+
+from utils.tick import TickScheduler
+
+
+class TestTickScheduler(unittest.TestCase):
+
+    def test_run_at_fixed_rate(self):
+        after_times = []
+
+        async def run():
+            scheduler = TickScheduler(0.02, after_times.append).start()
+            await asyncio.sleep(0.11)
+            scheduler.stop()
+            return scheduler
+
+        scheduler = asyncio.run(run())
+        self.assertGreaterEqual(len(after_times), 4)
+        self.assertEqual(scheduler.metrics.ticks, len(after_times))
+        for after_time in after_times:
+            self.assertAlmostEqual(after_time.total_seconds(), 0.02, delta=0.015)
+
+    def test_skip_ticks_on_overrun(self):
+        after_times = []
+
+        def slow_tick(after_time):
+            after_times.append(after_time)
+            if len(after_times) == 1:
+                time.sleep(0.1)
+
+        async def run():
+            scheduler = TickScheduler(0.02, slow_tick, max_catch_up=0).start()
+            await asyncio.sleep(0.15)
+            scheduler.stop()
+            return scheduler
+
+        scheduler = asyncio.run(run())
+        self.assertEqual(scheduler.metrics.overruns, 1)
+        self.assertGreaterEqual(scheduler.metrics.skipped_ticks, 4)
+        self.assertGreaterEqual(scheduler.metrics.max_duration, 0.1)
+
+    def test_stop_in_callback(self):
+        after_times = []
+
+        async def run():
+            def tick(after_time):
+                after_times.append(after_time)
+                scheduler.stop()
+            scheduler = TickScheduler(0.01, tick).start()
+            await asyncio.sleep(0.05)
+
+        asyncio.run(run())
+        self.assertEqual(len(after_times), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,213 @@
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from logging import getLogger
+from typing import Callable
+
+import requests
+
+logger = getLogger(__name__)
+
+METAR_URL = 'https://aviationweather.gov/api/data/metar?ids={ident}&format=json'
+# seconds
+METAR_TTL = 10 * 60
+METAR_STALE_TTL = 60 * 60
+# failed fetches are retried after this many seconds at the earliest
+METAR_NEGATIVE_TTL = 60
+METAR_REQUEST_TIMEOUT = 5
+
+
+class Metar:
+    def __init__(self, ident: str, wind_direction: int | str, wind_speed: int, altimeter: float):
+        self.ident = ident
+        self.wind_direction = wind_direction
+        self.wind_speed = wind_speed
+        self.altimeter = altimeter
+
+    @classmethod
+    def from_json(cls, data: dict):
+        """
+        Parse a METAR of the aviationweather.gov json format.
+        """
+        return cls(data['icaoId'], data['wdir'], data['wspd'], data['altim'])
+
+
+def get_default_metar(ident: str):
+    """
+    Calm wind and standard pressure, used when no METAR is available.
+    """
+    return Metar(ident, 0, 0, 1013)
+
+
+class MetarBackend(ABC):
+    """
+    Blocking METAR source. `fetch` runs in an executor.
+    """
+
+    @abstractmethod
+    def fetch(self, ident: str) -> Metar | None:
+        pass
+
+
+class HttpMetarBackend(MetarBackend):
+    def __init__(self, url: str = METAR_URL, timeout: float = METAR_REQUEST_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+
+    def fetch(self, ident: str):
+        response = requests.get(
+            self.url.format(ident=ident), timeout=self.timeout)
+        response.raise_for_status()
+        data = response.json()
+        if len(data) == 0:
+            return None
+        return Metar.from_json(data[0])
+
+
+class FileMetarBackend(MetarBackend):
+    """
+    Read METARs from a json file of the aviationweather.gov format, for
+    running offline.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def fetch(self, ident: str):
+        with open(self.path) as f:
+            data = json.load(f)
+        for item in data:
+            if item['icaoId'] == ident:
+                return Metar.from_json(item)
+        return None
+
+
+class StubMetarBackend(MetarBackend):
+    def __init__(self, metars: dict[str, Metar] | None = None):
+        self.metars = metars or {}
+        self.fetch_count = 0
+
+    def fetch(self, ident: str):
+        self.fetch_count += 1
+        return self.metars.get(ident)
+
+
+class WeatherProvider:
+    """
+    METAR lookups which never block the event loop.
+
+    Results are cached per airport for `ttl` seconds. Concurrent lookups of
+    the same airport share one request. Once expired, the stale METAR is
+    still served for up to `stale_ttl` seconds while it is refreshed in the
+    background. Without any METAR the default one is returned. A failed
+    fetch caches the METAR returned instead for `negative_ttl` seconds, so
+    an unreachable source isn't asked again on every lookup.
+    """
+
+    def __init__(
+        self,
+        backend: MetarBackend | None = None,
+        ttl: float = METAR_TTL,
+        stale_ttl: float = METAR_STALE_TTL,
+        negative_ttl: float = METAR_NEGATIVE_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.backend = backend or HttpMetarBackend()
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        self.clock = clock
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self._cache: dict[str, tuple[float, Metar]] = {}
+        # METARs returned for failed fetches, with the time of the failure
+        self._failed: dict[str, tuple[float, Metar]] = {}
+        self._pending: dict[str, asyncio.Future[Metar]] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def attach(self, loop: asyncio.AbstractEventLoop):
+        """
+        Bind the event loop, so `with_metar` can be called from other
+        threads, e.g. API handlers.
+        """
+        self.loop = loop
+
+    def get_cached(self, ident: str, max_age: float | None = None) -> Metar | None:
+        cached = self._cache.get(ident)
+        if cached is not None:
+            fetched_at, metar = cached
+            if self.clock() - fetched_at <= (self.ttl if max_age is None else max_age):
+                return metar
+        if max_age is None:
+            failed = self._failed.get(ident)
+            if failed is not None and self.clock() - failed[0] <= self.negative_ttl:
+                return failed[1]
+        return None
+
+    async def get_metar(self, ident: str) -> Metar:
+        metar = self.get_cached(ident)
+        if metar is not None:
+            return metar
+
+        future = self._refresh(ident)
+        metar = self.get_cached(ident, self.stale_ttl)
+        if metar is not None:
+            return metar
+        return await asyncio.shield(future)
+
+    def _refresh(self, ident: str):
+        future = self._pending.get(ident)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch(ident))
+            self._pending[ident] = future
+        return future
+
+    async def _fetch(self, ident: str):
+        loop = asyncio.get_running_loop()
+        try:
+            metar = await loop.run_in_executor(None, self.backend.fetch, ident)
+        except Exception as err:
+            logger.warning('Failed to fetch METAR of %s: %s', ident, err)
+            metar = None
+        finally:
+            self._pending.pop(ident, None)
+
+        if metar is None:
+            metar = self.get_cached(ident, self.stale_ttl) or get_default_metar(ident)
+            self._failed[ident] = (self.clock(), metar)
+            return metar
+        self._failed.pop(ident, None)
+        self._cache[ident] = (self.clock(), metar)
+        return metar
+
+    def with_metar(self, ident: str, callback: Callable[[Metar], None]):
+        """
+        Call `callback` on the event loop once the METAR is available.
+        Cached METARs are delivered immediately when called on the loop.
+        """
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is not None:
+            metar = self.get_cached(ident)
+            if metar is not None:
+                callback(metar)
+                return
+            task = running_loop.create_task(self._deliver(ident, callback))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            return
+
+        if self.loop is None:
+            raise RuntimeError('WeatherProvider is not attached to a loop')
+        asyncio.run_coroutine_threadsafe(
+            self._deliver(ident, callback), self.loop)
+
+    async def _deliver(self, ident: str, callback: Callable[[Metar], None]):
+        metar = await self.get_metar(ident)
+        try:
+            callback(metar)
+        except Exception as err:
+            logger.exception(err)
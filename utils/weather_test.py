@@ -0,0 +1,91 @@
+import asyncio
+import unittest
+
+from utils.weather import WeatherProvider, StubMetarBackend, MetarBackend, Metar
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FailingBackend(MetarBackend):
+    def fetch(self, ident: str):
+        raise ConnectionError('offline')
+
+
+class TestWeatherProvider(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.backend = StubMetarBackend({
+            'RCTP': Metar('RCTP', 50, 8, 1012),
+        })
+        self.provider = WeatherProvider(
+            self.backend, ttl=600, stale_ttl=3600, clock=self.clock)
+
+    async def test_cache_within_ttl(self):
+        metar = await self.provider.get_metar('RCTP')
+        self.assertEqual(metar.wind_direction, 50)
+        self.clock.now = 599
+        await self.provider.get_metar('RCTP')
+        self.assertEqual(self.backend.fetch_count, 1)
+
+    async def test_coalesce_concurrent_lookups(self):
+        metars = await asyncio.gather(
+            *(self.provider.get_metar('RCTP') for _ in range(5)))
+        self.assertEqual(self.backend.fetch_count, 1)
+        self.assertTrue(all(metar is metars[0] for metar in metars))
+
+    async def test_stale_while_revalidate(self):
+        stale = await self.provider.get_metar('RCTP')
+        self.backend.metars['RCTP'] = Metar('RCTP', 270, 15, 1008)
+        self.clock.now = 601
+        self.assertIs(await self.provider.get_metar('RCTP'), stale)
+        # let the background refresh finish
+        await asyncio.gather(*self.provider._pending.values())
+        metar = await self.provider.get_metar('RCTP')
+        self.assertEqual(metar.wind_direction, 270)
+        self.assertEqual(self.backend.fetch_count, 2)
+
+    async def test_default_metar_when_unavailable(self):
+        provider = WeatherProvider(FailingBackend(), clock=self.clock)
+        metar = await provider.get_metar('RCTP')
+        self.assertEqual(
+            (metar.wind_direction, metar.wind_speed, metar.altimeter),
+            (0, 0, 1013)
+        )
+
+    async def test_cache_failed_fetch(self):
+        backend = StubMetarBackend()
+        provider = WeatherProvider(backend, negative_ttl=60, clock=self.clock)
+        metar = await provider.get_metar('RCTP')
+        self.assertEqual(metar.altimeter, 1013)
+        self.clock.now = 59
+        self.assertIs(await provider.get_metar('RCTP'), metar)
+        self.assertEqual(backend.fetch_count, 1)
+        backend.metars['RCTP'] = Metar('RCTP', 50, 8, 1012)
+        self.clock.now = 61
+        self.assertEqual((await provider.get_metar('RCTP')).altimeter, 1012)
+        self.assertEqual(backend.fetch_count, 2)
+
+    def test_backend_is_abstract(self):
+        with self.assertRaises(TypeError):
+            MetarBackend()
+
+    async def test_with_metar(self):
+        received: list[Metar] = []
+        self.provider.with_metar('RCTP', received.append)
+        self.assertEqual(received, [])
+        await asyncio.gather(*self.provider._tasks)
+        self.assertEqual(len(received), 1)
+        # cached METARs are delivered immediately
+        self.provider.with_metar('RCTP', received.append)
+        self.assertEqual(len(received), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()